@@ -8,26 +8,48 @@ Endpoints:
 - POST /next - Answer follow-up question
 - POST /extract_symptoms - Extract symptoms from text
 - POST /report/analyze - Analyze medical report (PDF/image)
+- POST /report/analyze/stream - Same, with the summary streamed as Server-Sent Events
+- POST /ai/chat/stream - AI chat reply streamed as Server-Sent Events
 - GET /session/{session_id} - Get session state
+- GET /metrics - Prometheus metrics (latency histograms, cache and queue stats)
+
+/start and /next honour an optional Idempotency-Key header so proxied
+retries replay the original response.
 
 This service is NOT a diagnostic system - it provides assistive insights only.
 """
 
+import time
+_IMPORT_STARTED = time.perf_counter()
+
 import os
 import uuid
+import logging
 from typing import Optional, List, Dict, Any
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Header
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import redis
 import json
 
 # Import internal modules
-from engines.symptom_elimination import SymptomEliminationEngine
+# (OCR and LLM routing are imported inside their lazy loaders below)
+from engines.symptom_elimination import SAPBERT_RERANK, SymptomEliminationEngine, set_warming
 from engines.explainability import ExplainabilityEngine
-from report_analysis.ocr_engine import OCREngine
 from report_analysis.report_parser import ReportParser
-from model_adapters.model_selector import ModelSelector
+from serving.session_store import SessionStore
+from serving.rate_limit import PROVIDER_LIMITS
+from serving.loaders import lazy_subsystem, import_report
+from serving.idempotency import IdempotencyCache, IdempotencyConflict, IdempotencyInProgress
+from serving.admission import AdmissionController, Overloaded
+from serving.warmup import WarmupManager
+from serving.streaming import SlotStreamingResponse, StreamOutcome, filtered_events, sse_event
+from serving.singleflight import SingleFlight, content_key
+from model_adapters.http_client import HTTP_CLIENTS
+from model_adapters.registry import MODEL_REGISTRY
+from starlette.concurrency import run_in_threadpool
+from observability.metrics import REGISTRY, CONTENT_TYPE
+from observability.middleware import MetricsMiddleware
+from observability.profiling import ProfilingMiddleware, profile_store, authorize as authorize_profiling
 
 app = FastAPI(
     title="AI Telemedicine CDSS",
@@ -41,9 +63,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency histograms for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Opt-in cProfile of single requests (X-Profile + X-Profile-Token headers)
+app.add_middleware(ProfilingMiddleware)
+
 # === SAFETY MIDDLEWARE ===
 from safety_config import safety_filter, UNSAFE_TERMS, validate_safety
 from fastapi import Request, Response
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 
 class SafetyMiddleware(BaseHTTPMiddleware):
@@ -55,34 +84,60 @@ class SafetyMiddleware(BaseHTTPMiddleware):
 # app.add_middleware(SafetyMiddleware)
 
 
-# Initialize engines
+logger = logging.getLogger(__name__)
+
+
+def _build_ocr_engine():
+    from report_analysis.ocr_engine import OCREngine
+    return OCREngine()
+
+
+def _build_model_selector():
+    from model_adapters.model_selector import ModelSelector
+    return ModelSelector(store=session_store)
+
+
+def _build_chat_cache():
+    from engines.symptom_elimination import get_sapbert_adapter
+    from model_adapters.semantic_cache import SemanticChatCache
+
+    def embed(texts):
+        # None while SapBERT is warming up or unavailable: the cache is skipped
+        adapter = get_sapbert_adapter()
+        return adapter.embed_queries(texts) if adapter else None
+
+    return SemanticChatCache(embed=embed)
+
+
+# Initialize engines (heavy subsystems are built on first use)
 elimination_engine = SymptomEliminationEngine()
 explainability_engine = ExplainabilityEngine()
-ocr_engine = OCREngine()
 report_parser = ReportParser()
-model_selector = ModelSelector()
-
-# Session storage (Redis in production, in-memory for dev)
-try:
-    redis_client = redis.Redis(
-        host=os.getenv("REDIS_HOST", "localhost"),
-        port=int(os.getenv("REDIS_PORT", 6379)),
-        decode_responses=True
-    )
-    redis_client.ping()
-    USE_REDIS = True
-except:
-    USE_REDIS = False
-    sessions: Dict[str, dict] = {}
+ocr = lazy_subsystem("ocr", _build_ocr_engine)
+ocr_flight = SingleFlight("ocr")
+llm = lazy_subsystem("model_selector", _build_model_selector)
+chat_cache = lazy_subsystem("chat_semantic_cache", _build_chat_cache)
+CHAT_SEMANTIC_CACHE = os.getenv("CHAT_SEMANTIC_CACHE", "false").lower() == "true"
+
+# Session storage (Redis in production, in-memory for dev).
+# Redis is connected on first use, not at import.
+session_store = SessionStore()
+sessions: Dict[str, dict] = {}
+
+# Provider token buckets live in the same store (shared across workers with Redis)
+PROVIDER_LIMITS.use_store(session_store)
+
+# Replays responses for retried requests carrying an Idempotency-Key header
+idempotency_cache = IdempotencyCache(session_store)
+
+# Concurrency limits + bounded queues: triage > chat > report analysis
+admission = AdmissionController()
+REGISTRY.register_collector(admission.export_metrics)
 
 def get_session(session_id: str) -> Optional[dict]:
     """Helper to retrieve session from Redis or Memory"""
-    if USE_REDIS:
-        try:
-            data = redis_client.get(f"session:{session_id}")
-            return json.loads(data) if data else None
-        except Exception:
-            return None
+    if session_store.use_redis:
+        return session_store.get_json(f"session:{session_id}")
     else:
         return sessions.get(session_id)
 
@@ -110,15 +165,63 @@ class TriageResponse(BaseModel):
     safe_summary: Optional[str] = None # MANDATORY SAFE OUTPUT
     extend_needed: bool = False # Flag to ask user consent for more questions
 
+async def run_admitted(request_class: str, compute):
+    """Run an endpoint body inside an admission slot; shed with 503 when overloaded."""
+    try:
+        async with admission.slot(request_class):
+            return await compute()
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
+async def run_idempotent(key: Optional[str], scope: str, request: BaseModel, compute):
+    """Run an endpoint body through the idempotency cache, mapping its errors to HTTP."""
+    try:
+        return await idempotency_cache.run(key, scope, request.model_dump(), compute)
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IdempotencyInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
+
+
 @app.post("/start", response_model=TriageResponse)
-async def start_triage(request: StartRequest):
+async def start_triage(
+    request: StartRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    try:
+        return await run_idempotent(
+            idempotency_key, "start", request,
+            lambda: run_admitted("triage", lambda: _start_triage(request))
+        )
+    except HTTPException:
+        raise
+    except Exception:
+        # Built outside the idempotency cache, so a retry with the same
+        # Idempotency-Key runs again instead of replaying the failure
+        return TriageResponse(
+            session_id=request.user_id, # Fallback ID
+            probabilities=[],
+            next_question=None,
+            is_complete=True,
+            safe_summary="**System Error:** Unable to process symptoms at this time. Please try again or consult a doctor directly.",
+            extend_needed=False
+        )
+
+
+async def _start_triage(request: StartRequest) -> TriageResponse:
     try:
         session_id = str(uuid.uuid4())
         
         # Extract symptoms
         # Note: validation/extraction happens inside engine or via model_selector
-        # For now, using engine's standard extraction
-        initial_symptoms = elimination_engine.extract_symptoms(request.text)
+        # For now, using engine's standard extraction. Runs off the event loop so
+        # concurrent requests' model lookups can share micro-batches.
+        initial_symptoms = await run_in_threadpool(elimination_engine.extract_symptoms, request.text)
         
         # Start Engine Session
         state = elimination_engine.start(initial_symptoms, session_id=session_id)
@@ -198,22 +301,28 @@ async def start_triage(request: StartRequest):
         
     except Exception as e:
         print(f"Error in start_triage: {e}")
-        # Return safe fallback
-        return TriageResponse(
-            session_id=request.user_id, # Fallback ID
-            probabilities=[],
-            next_question=None,
-            is_complete=True,
-            safe_summary="**System Error:** Unable to process symptoms at this time. Please try again or consult a doctor directly.",
-            extend_needed=False
-        )
+        # start_triage turns this into the safe fallback reply (never cached)
+        raise
 
 
 @app.post("/next", response_model=TriageResponse)
-async def next_question_endpoint(request: NextRequest):
+async def next_question_endpoint(
+    request: NextRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
     """
     Handle follow-up answer and determine next step.
+    
+    Retries carrying the same Idempotency-Key replay the first response
+    instead of applying the answer twice.
     """
+    return await run_idempotent(
+        idempotency_key, "next", request,
+        lambda: run_admitted("triage", lambda: _next_question(request))
+    )
+
+
+async def _next_question(request: NextRequest) -> TriageResponse:
     try:
         session_id = request.session_id
         if session_id not in sessions:
@@ -306,7 +415,7 @@ async def extract_symptoms(request: ExtractRequest):
     Extract symptoms from free text input.
     """
     try:
-        result = elimination_engine.extract_symptoms(request.text)
+        result = await run_in_threadpool(elimination_engine.extract_symptoms, request.text)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -339,25 +448,45 @@ async def analyze_report(
     Analyze uploaded medical report (PDF/image).
     
     Returns extracted text, lab values, abnormal findings, and AI summary.
+    Runs in the lowest admission class; sheds with 503 when the queue is full.
     """
+    content = await file.read()
+    return await run_admitted(
+        "report",
+        lambda: _analyze_report(content, file.content_type, model_provider)
+    )
+
+
+async def _parse_report(content: bytes, content_type: str):
+    """OCR + lab parsing: (extracted_text, lab_values, abnormal_findings, red_flags)."""
+    # Extract text using OCR (off the event loop so triage keeps flowing);
+    # the same upload already being processed is joined, not OCR'd again
+    extracted_text = await ocr_flight.do(
+        content_key(content, content_type),
+        lambda: run_in_threadpool(ocr.get().extract_text, content, content_type)
+    )
+    
+    # Parse lab values
+    lab_values = report_parser.parse_lab_values(extracted_text)
+    
+    # Identify abnormal findings
+    abnormal_findings = report_parser.identify_abnormalities(lab_values)
+    
+    # Check for red flags
+    red_flags = report_parser.check_critical_values(lab_values)
+    
+    return extracted_text, lab_values, abnormal_findings, red_flags
+
+
+async def _analyze_report(content: bytes, content_type: str, model_provider: str) -> dict:
     try:
-        # Read file content
-        content = await file.read()
-        
-        # Extract text using OCR
-        extracted_text = ocr_engine.extract_text(content, file.content_type)
-        
-        # Parse lab values
-        lab_values = report_parser.parse_lab_values(extracted_text)
-        
-        # Identify abnormal findings
-        abnormal_findings = report_parser.identify_abnormalities(lab_values)
-        
-        # Check for red flags
-        red_flags = report_parser.check_critical_values(lab_values)
+        extracted_text, lab_values, abnormal_findings, red_flags = await _parse_report(
+            content, content_type
+        )
         
-        # Generate AI summary (using model selector for API routing)
-        summary = await model_selector.summarize_report(
+        # Generate AI summary (using model selector for API routing;
+        # repeat reports are answered from the summary cache)
+        summary = await llm.get().summarize_report_with_meta(
             extracted_text,
             lab_values,
             abnormal_findings,
@@ -369,13 +498,74 @@ async def analyze_report(
             "lab_values": lab_values,
             "abnormal_findings": abnormal_findings,
             "red_flags": red_flags,
-            "summary": summary
+            "summary": summary["summary"],
+            "summary_cached": summary["cached"]
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def admit_stream(request_class: str) -> None:
+    """Take an admission slot for a streaming response; SlotStreamingResponse releases it."""
+    try:
+        await admission.acquire(request_class)
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
+@app.post("/report/analyze/stream")
+async def analyze_report_stream(
+    file: UploadFile = File(...),
+    user_id: str = Form("anonymous"),
+    model_provider: str = Form("auto")
+):
+    """
+    Streaming variant of /report/analyze (Server-Sent Events).
+    
+    Sends a `report` event with the parsed values as soon as OCR finishes,
+    then the summary as safety-filtered `token` events, then `done`.
+    """
+    content = await file.read()
+    await admit_stream("report")
+    
+    async def events():
+        try:
+            extracted_text, lab_values, abnormal_findings, red_flags = await _parse_report(
+                content, file.content_type
+            )
+            yield sse_event("report", {
+                "extracted_text": extracted_text[:2000],
+                "lab_values": lab_values,
+                "abnormal_findings": abnormal_findings,
+                "red_flags": red_flags,
+            })
+            
+            outcome = StreamOutcome()
+            cached = False
+            
+            async def chunks():
+                nonlocal cached
+                async for chunk, provider, from_cache in llm.get().stream_report_summary(
+                    extracted_text, lab_values, abnormal_findings, provider=model_provider
+                ):
+                    cached = from_cache
+                    yield chunk, provider
+            
+            async for event in filtered_events(chunks(), outcome):
+                yield event
+            yield sse_event("done", {"summary_cached": cached, "provider": outcome.provider})
+        except Exception as e:
+            logger.error(f"Streaming report analysis failed: {e}")
+            yield sse_event("error", {"detail": str(e)})
+    
+    return SlotStreamingResponse(events(), release=lambda: admission.release("report"))
+
+
 
 # === AI CHAT ENDPOINT ===
 class ChatRequest(BaseModel):
@@ -387,6 +577,7 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     reply: str
     safe_disclaimer: str
+    cached: bool = False
 
 @app.post("/ai/chat", response_model=ChatResponse)
 async def chat_with_ai(request: ChatRequest):
@@ -394,18 +585,21 @@ async def chat_with_ai(request: ChatRequest):
     Context-aware AI Health Chat.
     Uses cached session state from Redis/Memory to provide relevant answers.
     """
-    try:
-        session_data = get_session(request.session_id)
-        if not session_data:
-            raise HTTPException(status_code=404, detail="Session not found")
-            
-        # factory prompt
-        context = {
-            "symptoms": session_data["state"].get("observed_symptoms", []),
-            "probabilities": session_data["state"]["probabilities"][:3]
-        }
-        
-        system_prompt = f"""
+    return await run_admitted("chat", lambda: _chat_with_ai(request))
+
+
+CHAT_DISCLAIMER = "This is an AI assistant, not a doctor. Advice is informational only."
+
+
+def _chat_prompt(session_data: dict):
+    """System prompt and compact context for a chat turn: (system_prompt, context)."""
+    # factory prompt
+    context = {
+        "symptoms": session_data["state"].get("observed_symptoms", []),
+        "probabilities": session_data["state"]["probabilities"][:3]
+    }
+    
+    system_prompt = f"""
         You are a helpful AI Health Assistant.
         CONTEXT:
         Patient Symptoms: {', '.join(context['symptoms'])}
@@ -417,11 +611,37 @@ async def chat_with_ai(request: ChatRequest):
         3. If asked "What do I have?", refer to the Triage Report summaries.
         4. Refer to the patient context when relevant (e.g. "Given your fever...").
         """
+    return system_prompt, context
+
+
+async def _chat_cache_lookup(request: ChatRequest, session_data: dict):
+    """(cache context, cached reply or None); context is None when the cache is off."""
+    if not CHAT_SEMANTIC_CACHE:
+        return None, None
+    from model_adapters.semantic_cache import chat_context_key
+    cache_context = chat_context_key(session_data["state"], request.model_provider)
+    hit = await run_in_threadpool(chat_cache.get().lookup, request.message, cache_context)
+    return cache_context, (hit[0] if hit is not None else None)
+
+
+async def _chat_with_ai(request: ChatRequest) -> ChatResponse:
+    try:
+        session_data = get_session(request.session_id)
+        if not session_data:
+            raise HTTPException(status_code=404, detail="Session not found")
+        
+        system_prompt, context = _chat_prompt(session_data)
+        disclaimer = CHAT_DISCLAIMER
+        
+        # Near-duplicate question in the same clinical context: reuse its reply
+        cache_context, cached_reply = await _chat_cache_lookup(request, session_data)
+        if cached_reply is not None:
+            return ChatResponse(reply=cached_reply, safe_disclaimer=disclaimer, cached=True)
         
         # Call LLM (Gemini preferred, or local fallback)
         # Using ModelSelector to handle routing
         
-        reply = await model_selector.generate_chat_response(
+        reply, answered_by = await llm.get().generate_chat_response_with_provider(
             system_prompt=system_prompt,
             user_message=request.message,
             session_context=context,
@@ -431,15 +651,62 @@ async def chat_with_ai(request: ChatRequest):
         # Safety Filter on Output
         safe_reply = validate_safety(reply)
         
-        return ChatResponse(
-            reply=safe_reply,
-            safe_disclaimer="This is an AI assistant, not a doctor. Advice is informational only."
-        )
+        # Cache only real model answers that passed the safety filter
+        if cache_context and answered_by in ("gemini", "openrouter") and safe_reply == reply:
+            await run_in_threadpool(chat_cache.get().store, request.message, cache_context, safe_reply)
+        
+        return ChatResponse(reply=safe_reply, safe_disclaimer=disclaimer)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/ai/chat/stream")
+async def chat_with_ai_stream(request: ChatRequest):
+    """
+    Streaming variant of /ai/chat (Server-Sent Events).
+    
+    The reply arrives as safety-filtered `token` events, then a `done`
+    event with the disclaimer; a `blocked` event replaces an unsafe reply.
+    """
+    session_data = get_session(request.session_id)
+    if not session_data:
+        raise HTTPException(status_code=404, detail="Session not found")
+    await admit_stream("chat")
+    
+    async def events():
+        try:
+            system_prompt, context = _chat_prompt(session_data)
+            cache_context, cached_reply = await _chat_cache_lookup(request, session_data)
+            if cached_reply is not None:
+                yield sse_event("token", {"text": cached_reply})
+                yield sse_event("done", {"cached": True, "safe_disclaimer": CHAT_DISCLAIMER})
+                return
+            
+            outcome = StreamOutcome()
+            chunks = llm.get().stream_chat_response(
+                system_prompt=system_prompt,
+                user_message=request.message,
+                session_context=context,
+                provider=request.model_provider
+            )
+            async for event in filtered_events(chunks, outcome):
+                yield event
+            
+            if cache_context and outcome.provider in ("gemini", "openrouter") and not outcome.blocked:
+                await run_in_threadpool(chat_cache.get().store, request.message, cache_context, outcome.text)
+            yield sse_event("done", {
+                "cached": False,
+                "provider": outcome.provider,
+                "safe_disclaimer": CHAT_DISCLAIMER
+            })
+        except Exception as e:
+            logger.error(f"Streaming chat failed: {e}")
+            yield sse_event("error", {"detail": str(e)})
+    
+    return SlotStreamingResponse(events(), release=lambda: admission.release("chat"))
+
+
 @app.post("/pill/identify")
 async def identify_pill_endpoint(file: UploadFile = File(...)):
     """
@@ -447,12 +714,46 @@ async def identify_pill_endpoint(file: UploadFile = File(...)):
     """
     try:
         content = await file.read()
-        result = await model_selector.identify_pill(content)
+        result = await llm.get().identify_pill(content)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of service metrics."""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+def require_profiling_token(token: Optional[str]):
+    if not authorize_profiling(token):
+        raise HTTPException(status_code=403, detail="Profiling access denied")
+
+
+@app.get("/debug/profiles")
+async def list_profiles(x_profile_token: Optional[str] = Header(None)):
+    """List recently captured request profiles."""
+    require_profiling_token(x_profile_token)
+    return profile_store.list()
+
+
+@app.get("/debug/profiles/{profile_id}")
+async def get_profile(profile_id: str, x_profile_token: Optional[str] = Header(None)):
+    """Per-function breakdown of one profiled request."""
+    require_profiling_token(x_profile_token)
+    report = profile_store.get(profile_id)
+    if not report:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return report
+
+
+@app.get("/admission/stats")
+async def admission_stats():
+    """Per-class running, queued and shed counts."""
+    return admission.get_stats()
+
+
 # Import Token System
 from booking.token_system import token_system
 
@@ -490,6 +791,74 @@ async def complete_appointment(token_id: str):
         return {"status": "success"}
     raise HTTPException(status_code=404, detail="Token not found")
 
+APP_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+
+@app.on_event("startup")
+async def report_import_time():
+    """Log how long the app took to import and which heavy modules came with it."""
+    logger.info(f"Import-time report: {json.dumps(import_report(APP_IMPORT_SECONDS))}")
+
+
+# Build/load SapBERT candidate embeddings off the request path
+SAPBERT_PRECOMPUTE = os.getenv("SAPBERT_PRECOMPUTE", "false").lower() == "true"
+# Load every configured model adapter in the background at startup
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "false").lower() == "true"
+
+# Until a model is warm, requests use the rule-based paths instead of loading it inline
+warmup = WarmupManager(on_change=set_warming)
+
+
+@app.on_event("startup")
+async def warm_up_models():
+    """Optionally load models and run synthetic inferences in the background at startup."""
+    # Re-ranking reads the similarity table prepare_sapbert builds; requests never build it
+    if MODEL_WARMUP or SAPBERT_PRECOMPUTE or SAPBERT_RERANK:
+        warmup.add("sapbert", elimination_engine.prepare_sapbert)
+    if MODEL_WARMUP and elimination_engine.use_bert_nlp:
+        warmup.add("bio_clinicalbert", elimination_engine.prepare_nlp)
+    warmup.start()
+
+
+@app.on_event("startup")
+async def connect_session_store():
+    """Probe Redis off the event loop so no request waits on the connect."""
+    backend = await run_in_threadpool(session_store.connect)
+    logger.info(f"Session store backend: {backend}")
+
+
+@app.on_event("startup")
+async def open_llm_clients():
+    """Create pooled keep-alive HTTP clients for the configured LLM providers."""
+    if os.getenv("USE_OPENROUTER", "false").lower() == "true":
+        await HTTP_CLIENTS.start(["openrouter"])
+
+
+@app.on_event("shutdown")
+async def close_llm_clients():
+    """Close pooled LLM provider connections."""
+    await HTTP_CLIENTS.aclose()
+
+
+@app.get("/ready")
+async def readiness():
+    """Per-subsystem readiness; 503 while any model is still warming up."""
+    report = warmup.report()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+
+@app.get("/startup/report")
+async def startup_report():
+    """Import time plus which lazy subsystems have been built so far."""
+    return import_report(APP_IMPORT_SECONDS)
+
+
+@app.get("/models")
+async def loaded_models():
+    """Models in the shared registry with memory, load time and idle time."""
+    return {"models": MODEL_REGISTRY.stats()}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,34 @@
+"""
+Shared test helpers: a small randomly initialized BERT with a local vocab,
+so model tests run offline. Requires torch and transformers; callers skip
+(pytest.importorskip) before importing this module.
+"""
+
+import os
+import tempfile
+
+import torch
+import transformers
+
+SYMPTOMS = [
+    "fever", "headache", "cough", "fatigue", "nausea", "vomiting", "diarrhea",
+    "chest pain", "shortness of breath", "abdominal pain", "back pain", "joint pain",
+    "dizziness", "rash", "sore throat", "runny nose", "chills", "insomnia",
+]
+
+
+def tiny_bert():
+    torch.manual_seed(0)
+    words = sorted({w for s in SYMPTOMS for w in s.split()} | {"i", "have"})
+    tmp = tempfile.mkdtemp()
+    vocab_file = os.path.join(tmp, "vocab.txt")
+    with open(vocab_file, "w") as f:
+        f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words))
+    tokenizer = transformers.BertTokenizer(vocab_file)
+    config = transformers.BertConfig(
+        vocab_size=len(words) + 5, hidden_size=64, num_hidden_layers=2,
+        num_attention_heads=4, intermediate_size=128, max_position_embeddings=64,
+        # Default 0.02 init makes every CLS embedding near-identical, so top-1 is a coin toss
+        initializer_range=0.2
+    )
+    return transformers.BertModel(config).eval(), tokenizer
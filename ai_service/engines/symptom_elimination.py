@@ -32,11 +32,19 @@ import json
 import math
 import uuid
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+from typing import List, Dict, Any, Optional, Set, Tuple
 from pathlib import Path
 from dataclasses import dataclass, field
 from enum import Enum
 
+try:
+    from observability.metrics import ENGINE_PHASE_SECONDS
+except ImportError:
+    # Imported as ai_service.engines.* with only the repo root on sys.path
+    # (evaluation scripts)
+    from ai_service.observability.metrics import ENGINE_PHASE_SECONDS
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -49,31 +57,65 @@ _nlp_extractor = None
 # Optional SapBERT for symptom normalization
 _sapbert_adapter = None
 
+# Guards first construction of the lazy adapters above against concurrent requests
+_adapter_lock = threading.Lock()
+
+# Re-rank final predictions with the precomputed SapBERT symptom x disease table
+SAPBERT_RERANK = os.getenv("SAPBERT_RERANK", "false").lower() == "true"
+
+# Models ("sapbert", "bio_clinicalbert") being warmed up in the background.
+# Request paths treat them as unavailable and stay on the rule-based path
+# instead of loading them inline.
+_warming: Set[str] = set()
+
+
+def set_warming(name: str, warming: bool):
+    """Mark a model as warming up (request paths skip it) or done."""
+    if warming:
+        _warming.add(name)
+    else:
+        _warming.discard(name)
+
+
 def get_nlp_extractor():
+    """Bio_ClinicalBERT extractor for request paths (None while warming up)."""
+    return None if "bio_clinicalbert" in _warming else _load_nlp_extractor()
+
+
+def get_sapbert_adapter():
+    """SapBERT adapter for request paths (None while warming up)."""
+    return None if "sapbert" in _warming else _load_sapbert_adapter()
+
+
+def _load_nlp_extractor():
     """Lazy-load Bio_ClinicalBERT extractor."""
     global _nlp_extractor
     if _nlp_extractor is None:
-        try:
-            from model_adapters.bio_clinicalbert import BioClinicalBERT
-            _nlp_extractor = BioClinicalBERT(use_api=False)
-            logger.info("Bio_ClinicalBERT NLP extractor loaded")
-        except Exception as e:
-            logger.info(f"Bio_ClinicalBERT not available, using rule-based: {e}")
-            _nlp_extractor = False  # Mark as unavailable
+        with _adapter_lock:
+            if _nlp_extractor is None:
+                try:
+                    from model_adapters.bio_clinicalbert import BioClinicalBERT
+                    _nlp_extractor = BioClinicalBERT(use_api=False)
+                    logger.info("Bio_ClinicalBERT NLP extractor loaded")
+                except Exception as e:
+                    logger.info(f"Bio_ClinicalBERT not available, using rule-based: {e}")
+                    _nlp_extractor = False  # Mark as unavailable
     return _nlp_extractor if _nlp_extractor else None
 
 
-def get_sapbert_adapter():
+def _load_sapbert_adapter():
     """Lazy-load SapBERT adapter for symptom normalization."""
     global _sapbert_adapter
     if _sapbert_adapter is None:
-        try:
-            from model_adapters.sapbert_helper import SapBERTHelper
-            _sapbert_adapter = SapBERTHelper(use_api=False)
-            logger.info("SapBERT adapter loaded for symptom normalization")
-        except Exception as e:
-            logger.info(f"SapBERT not available: {e}. Falling back to fuzzy match.")
-            _sapbert_adapter = False
+        with _adapter_lock:
+            if _sapbert_adapter is None:
+                try:
+                    from model_adapters.sapbert_helper import SapBERTHelper
+                    _sapbert_adapter = SapBERTHelper(use_api=False)
+                    logger.info("SapBERT adapter loaded for symptom normalization")
+                except Exception as e:
+                    logger.info(f"SapBERT not available: {e}. Falling back to fuzzy match.")
+                    _sapbert_adapter = False
     return _sapbert_adapter if _sapbert_adapter else None
 
 
@@ -595,7 +637,46 @@ class SymptomEliminationEngine:
                 matrix[disease][symptom] = match["weight"] if match else self.SMOOTHING_FACTOR
         
         return matrix
-    
+
+    def prepare_sapbert(self) -> bool:
+        """
+        Load SapBERT, the candidate-symptom embedding matrix and the
+        symptom x disease similarity table up front, so no request pays for
+        embedding the whole vocabulary.
+
+        Returns:
+            True if the candidate matrix is ready
+        """
+        sapbert = _load_sapbert_adapter()
+        if not sapbert:
+            return False
+        sapbert.ensure_candidates(self.symptoms)
+        if SAPBERT_RERANK:
+            sapbert.ensure_similarity_table(self.symptoms, self.diseases)
+        if sapbert.candidate_matrix is None:
+            return False
+        # A few synthetic queries so the first patient does not pay for lazy init
+        sapbert.normalize_batch(["fever", "chest hurts", "cant breathe properly"])
+        return True
+
+    def prepare_nlp(self) -> bool:
+        """
+        Load Bio_ClinicalBERT (when use_bert_nlp is on) and run a synthetic
+        extraction through it.
+
+        Returns:
+            True if the extractor is ready
+        """
+        if not self.use_bert_nlp:
+            return False
+        nlp = _load_nlp_extractor()
+        if not nlp:
+            return False
+        nlp.extract_symptoms("I have had a fever and a bad headache for two days")
+        nlp.get_embeddings("fever")
+        return True
+
+    @ENGINE_PHASE_SECONDS.timed(phase="extraction")
     def extract_symptoms(self, text: str) -> Dict[str, Any]:
         """
         Extract symptoms from free-text input.
@@ -663,36 +744,35 @@ class SymptomEliminationEngine:
         if not found_symptoms and len(text) < 100:
             sapbert = get_sapbert_adapter()
             if sapbert:
-                try:
-                    # Provide candidate symptoms for normalization
-                    candidates = self.symptoms 
-                    if not sapbert.candidate_embeddings: 
-                        sapbert.cache_candidates(candidates)
+                with ENGINE_PHASE_SECONDS.time(phase="sapbert_fallback"):
+                    try:
+                        # Candidate matrix is loaded from disk (or built) once
+                        sapbert.ensure_candidates(self.symptoms)
                     
-                    # Try whole sentence matches (e.g., "my head hurts")
-                    # Or simple splitting
-                    potential_phrases = [text]
-                    if " and " in text:
-                        potential_phrases.extend(text.split(" and "))
-                    if "," in text:
-                        potential_phrases.extend(text.split(","))
+                        # Try whole sentence matches (e.g., "my head hurts")
+                        # Or simple splitting
+                        potential_phrases = [text]
+                        if " and " in text:
+                            potential_phrases.extend(text.split(" and "))
+                        if "," in text:
+                            potential_phrases.extend(text.split(","))
                         
-                    for phrase in potential_phrases:
-                        phrase = phrase.strip()
-                        if not phrase: continue
+                        phrases = list(dict.fromkeys(p.strip() for p in potential_phrases if p.strip()))
                         
-                        canonical_match = sapbert.normalize(phrase, candidates=None)
-                        if canonical_match and canonical_match not in found_symptoms:
-                             found_symptoms.append(canonical_match)
-                             # Add synthetic entity
-                             entities.append({
-                                "text": phrase,
-                                "label": canonical_match,
-                                "start": text.find(phrase),
-                                "end": text.find(phrase) + len(phrase)
-                             })
-                except Exception as e:
-                    logger.debug(f"SapBERT fallback failed: {e}")
+                        # One batched embedding + matrix product for all phrases
+                        matches = sapbert.normalize_batch(phrases)
+                        for phrase, canonical_match in zip(phrases, matches):
+                            if canonical_match and canonical_match not in found_symptoms:
+                                 found_symptoms.append(canonical_match)
+                                 # Add synthetic entity
+                                 entities.append({
+                                    "text": phrase,
+                                    "label": canonical_match,
+                                    "start": text.find(phrase),
+                                    "end": text.find(phrase) + len(phrase)
+                                 })
+                    except Exception as e:
+                        logger.debug(f"SapBERT fallback failed: {e}")
         
         return {
             "symptoms": found_symptoms,
@@ -757,11 +837,8 @@ class SymptomEliminationEngine:
             sapbert = get_sapbert_adapter()
             if sapbert:
                 try:
-                    # Provide candidate symptoms for normalization
-                    candidates = self.symptoms 
-                    # If candidates list is huge, we might want to cache it inside the adapter once
-                    if not sapbert.candidate_embeddings: 
-                        sapbert.cache_candidates(candidates)
+                    # Candidate matrix is loaded from disk (or built) once
+                    sapbert.ensure_candidates(self.symptoms)
                         
                     canonical_match = sapbert.normalize(symptom_lower, candidates=None) # Uses cached
                     
@@ -834,6 +911,7 @@ class SymptomEliminationEngine:
             "red_flags": red_flags
         }
     
+    @ENGINE_PHASE_SECONDS.timed(phase="posterior")
     def _compute_posterior(
         self, 
         prior: Dict[str, float], 
@@ -882,6 +960,7 @@ class SymptomEliminationEngine:
         observed_set = set(observed)
         return list(all_symptoms - observed_set)
     
+    @ENGINE_PHASE_SECONDS.timed(phase="ig_selection")
     def _get_best_question(
         self, 
         posterior: Dict[str, float], 
@@ -1066,7 +1145,9 @@ class SymptomEliminationEngine:
         if current_symptom is None:
             # No symptom to update, just return current state
             state["status"] = "FINISHED"
-            state["final_predictions"] = self._generate_predictions(state["posterior"])
+            state["final_predictions"] = self._final_predictions(
+                state["posterior"], state.get("observed_symptoms", [])
+            )
             return state
         
         # Normalize symptom
@@ -1173,7 +1254,7 @@ class SymptomEliminationEngine:
             new_state["status"] = "FINISHED"
             new_state["stop_reason"] = stop_reason
             new_state["next_question"] = None
-            new_state["final_predictions"] = self._generate_predictions(posterior) # predictions already have explanation
+            new_state["final_predictions"] = self._final_predictions(posterior, observed) # predictions already have explanation
         elif extend_needed:
             new_state["status"] = "IN_PROGRESS"
             # Do NOT generate next question yet, wait for user consent (which calls next_step again)
@@ -1192,10 +1273,20 @@ class SymptomEliminationEngine:
                 new_state["status"] = "FINISHED"
                 new_state["stop_reason"] = "All relevant questions exhausted"
                 new_state["next_question"] = None
-                new_state["final_predictions"] = self._generate_predictions(posterior)
+                new_state["final_predictions"] = self._final_predictions(posterior, observed)
         
         return new_state
     
+    def _final_predictions(self, posterior: Dict[str, float], observed: List[str]) -> List[Dict]:
+        """
+        Predictions for a finished session, SapBERT re-ranked when
+        SAPBERT_RERANK is on and the similarity table has been prepared.
+        """
+        predictions = self._generate_predictions(posterior)
+        if SAPBERT_RERANK:
+            predictions = self.enhance_predictions_with_sapbert(observed, predictions)
+        return predictions
+    
     def _generate_predictions(self, posterior: Dict[str, float]) -> List[Dict]:
         """Generate structured predictions with confidence levels and explanations."""
         ranked = sorted(posterior.items(), key=lambda x: x[1], reverse=True)
@@ -1248,7 +1339,9 @@ class SymptomEliminationEngine:
             Enhanced predictions with combined scores
         """
         sapbert = get_sapbert_adapter()
-        if not sapbert or not symptoms:
+        # The table is built by prepare_sapbert at startup; the request path
+        # only reads it and skips re-ranking until it exists
+        if not sapbert or not symptoms or getattr(sapbert, "similarity_table", None) is None:
             return bayesian_predictions
         
         try:
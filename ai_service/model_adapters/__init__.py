@@ -1,15 +1,33 @@
 # Model Adapters Package
 """
 Model adapters for local and API-based AI models.
+
+Exports are resolved lazily so importing one adapter module does not pull
+in every adapter's dependencies.
 """
 
-from .model_selector import ModelSelector
-from .local_model_adapter import LocalModelAdapter
-from .api_model_adapter import GeminiAdapter, OpenRouterAdapter
+import importlib
+
+_EXPORTS = {
+    "ModelSelector": ".model_selector",
+    "LocalModelAdapter": ".local_model_adapter",
+    "GeminiAdapter": ".api_model_adapter",
+    "OpenRouterAdapter": ".api_model_adapter",
+    "SimulatedModelAdapter": ".simulated",
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        module = importlib.import_module(_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "ModelSelector",
     "LocalModelAdapter",
     "GeminiAdapter",
-    "OpenRouterAdapter"
+    "OpenRouterAdapter",
+    "SimulatedModelAdapter"
 ]
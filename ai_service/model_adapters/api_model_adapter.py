@@ -8,10 +8,13 @@ Unified adapter for cloud-based AI APIs:
 
 import os
 import asyncio
-import aiohttp
 from typing import Dict, List, Any, Optional
 from abc import ABC, abstractmethod
 
+from serving.rate_limit import PROVIDER_LIMITS, RateLimited
+from .http_client import HTTP_CLIENTS, RequestDeadline
+from .gemini import generate_content_async
+
 
 class APIAdapter(ABC):
     """Base class for API adapters."""
@@ -82,7 +85,9 @@ class GeminiAdapter(APIAdapter):
         self._initialize()
         
         try:
-            response = self._client.generate_content(
+            await PROVIDER_LIMITS.acquire("gemini")
+            response = await generate_content_async(
+                self._client,
                 prompt,
                 generation_config={
                     "temperature": temperature,
@@ -90,6 +95,8 @@ class GeminiAdapter(APIAdapter):
                 }
             )
             return response.text
+        except RateLimited as e:
+            raise RateLimitError(str(e))
         except Exception as e:
             if "429" in str(e) or "quota" in str(e).lower():
                 raise RateLimitError(f"Gemini rate limit: {e}")
@@ -112,7 +119,7 @@ class OpenRouterAdapter(APIAdapter):
     - Fallback scenarios
     """
     
-    BASE_URL = "https://openrouter.ai/api/v1/chat/completions"
+    BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1") + "/chat/completions"
     
     # Available models (cost-effectiveness ordered)
     MODELS = {
@@ -170,23 +177,29 @@ class OpenRouterAdapter(APIAdapter):
             "max_tokens": max_tokens
         }
         
+        import httpx
+        
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.BASE_URL,
-                    headers=headers,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=60)
-                ) as response:
-                    if response.status == 429:
-                        raise RateLimitError("OpenRouter rate limit exceeded")
-                    
-                    response.raise_for_status()
-                    data = await response.json()
-                    
-                    return data["choices"][0]["message"]["content"]
+            await PROVIDER_LIMITS.acquire("openrouter")
+        except RateLimited as e:
+            raise RateLimitError(str(e))
+        
+        try:
+            # Pooled keep-alive client shared by every call to this provider
+            response = await RequestDeadline().run(HTTP_CLIENTS.get("openrouter").post(
+                self.BASE_URL,
+                headers=headers,
+                json=payload
+            ))
+            if response.status_code == 429:
+                raise RateLimitError("OpenRouter rate limit exceeded")
+            
+            response.raise_for_status()
+            data = response.json()
+            
+            return data["choices"][0]["message"]["content"]
                     
-        except aiohttp.ClientError as e:
+        except httpx.HTTPError as e:
             raise ConnectionError(f"OpenRouter connection error: {e}")
     
     async def generate_with_fallback(
@@ -0,0 +1,146 @@
+"""
+Micro-Batching Inference Worker
+
+Coalesces embedding / NER requests from concurrent callers into padded
+batches so a CPU-bound transformer runs one forward pass per batch instead
+of one per request.
+
+A MicroBatcher owns a single worker thread per model. Callers submit one
+item and get a Future; the worker takes the first queued item, keeps
+collecting until the batch is full or `max_wait` has passed, runs
+`run_batch(items)` once and resolves every caller's Future with its own
+result. Forward passes for a model are therefore also serialized, which
+keeps torch from oversubscribing CPU threads.
+
+Configuration:
+- INFERENCE_BATCHING: "false" runs each call inline (no worker thread)
+- INFERENCE_MAX_BATCH: max items per forward pass
+- INFERENCE_MAX_WAIT_MS: how long the first item may wait for company
+"""
+
+import os
+import time
+import queue
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Sequence
+
+from observability.metrics import (
+    INFERENCE_BATCH_SIZE, INFERENCE_QUEUE_WAIT_SECONDS, INFERENCE_BATCH_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_BATCHING = os.getenv("INFERENCE_BATCHING", "true").lower() == "true"
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", 32))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", 5))
+
+
+class MicroBatcher:
+    """
+    Dynamic batching front-end for one model.
+
+    Usage:
+        batcher = MicroBatcher("sapbert", lambda texts: model_forward(texts))
+        embedding = batcher.run("chest pain")          # blocking
+        embeddings = batcher.run_many(["a", "b"])      # blocking, one batch
+        embedding = await batcher.run_async("cough")   # from the event loop
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run_batch: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: int = INFERENCE_MAX_BATCH,
+        max_wait: float = INFERENCE_MAX_WAIT_MS / 1000,
+        enabled: bool = INFERENCE_BATCHING
+    ):
+        """
+        Args:
+            name: Model label for metrics and the worker thread name
+            run_batch: Runs one forward pass; returns one result per item, in order
+            max_batch_size: Max items per batch
+            max_wait: Seconds the oldest queued item may wait for the batch to fill
+            enabled: False runs every call inline on the caller's thread
+        """
+        self.name = name
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.enabled = enabled
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, item: Any) -> Future:
+        """Queue one item; the Future resolves to its result."""
+        future: Future = Future()
+        if not self.enabled:
+            self._execute([(item, future, time.perf_counter())])
+            return future
+        self._ensure_worker()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def run(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Submit one item and wait for its result."""
+        return self.submit(item).result(timeout=timeout)
+
+    def run_many(self, items: Sequence[Any], timeout: Optional[float] = None) -> List[Any]:
+        """Submit several items (they batch together) and wait for all results."""
+        futures = [self.submit(item) for item in items]
+        return [f.result(timeout=timeout) for f in futures]
+
+    async def run_async(self, item: Any) -> Any:
+        """Await one item's result without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(item))
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(
+                        target=self._loop, name=f"batcher-{self.name}", daemon=True
+                    )
+                    self._worker.start()
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0
+                                 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._execute(batch)
+
+    def _execute(self, batch: List) -> None:
+        # Callers that gave up (cancelled futures) are dropped before the forward pass
+        batch = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        for _, _, enqueued in batch:
+            INFERENCE_QUEUE_WAIT_SECONDS.observe(started - enqueued, model=self.name)
+        INFERENCE_BATCH_SIZE.observe(len(batch), model=self.name)
+
+        try:
+            results = list(self.run_batch([item for item, _, _ in batch]))
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name}: run_batch returned {len(results)} results for {len(batch)} items")
+        except BaseException as e:
+            logger.warning(f"Batched inference failed for {self.name}: {e}")
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        finally:
+            INFERENCE_BATCH_SECONDS.observe(time.perf_counter() - started, model=self.name)
+
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
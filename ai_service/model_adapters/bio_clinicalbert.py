@@ -27,8 +27,14 @@ import logging
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
+from .batching import MicroBatcher
+from .tokenization import bucketed_encode
+from .registry import MODEL_REGISTRY, encoder_key, load_encoder, load_pipeline, pipeline_key
+
 logger = logging.getLogger(__name__)
 
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 64))
+
 # Model configuration
 MODEL_NAME = "emilyalsentzer/Bio_ClinicalBERT"
 HF_API_URL = "https://api-inference.huggingface.co/models/"
@@ -58,6 +64,14 @@ class BioClinicalBERT:
         self.tokenizer = None
         self.model = None
         self.ner_pipeline = None
+        self._model_key: Optional[str] = None
+        
+        # Concurrent callers share forward passes (worker threads start on first use)
+        self._embed_batcher = MicroBatcher("bio_clinicalbert", self._embed_texts)
+        self._ner_batcher = MicroBatcher(
+            "bio_clinicalbert_ner",
+            lambda texts: self.ner_pipeline(texts, batch_size=len(texts))
+        )
         
         # Medical entity patterns for fallback
         self.symptom_patterns = self._load_symptom_patterns()
@@ -71,24 +85,19 @@ class BioClinicalBERT:
     def _init_local_model(self):
         """Initialize local transformers model."""
         try:
-            from transformers import (
-                AutoTokenizer, 
-                AutoModel,
-                AutoModelForTokenClassification,
-                pipeline
-            )
+            import transformers  # noqa: F401 (ImportError selects the API path)
             
             logger.info(f"Loading {MODEL_NAME} locally...")
             
-            self.tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-            self.model = AutoModel.from_pretrained(MODEL_NAME)
+            self.tokenizer, self.model = load_encoder(
+                MODEL_NAME, "bio_clinicalbert", on_evict=self._release_model
+            )
+            self._model_key = encoder_key(MODEL_NAME, "bio_clinicalbert")
             
             # Try to load NER pipeline if available
             try:
-                self.ner_pipeline = pipeline(
-                    "ner",
-                    model=MODEL_NAME,
-                    tokenizer=self.tokenizer,
+                self.ner_pipeline = load_pipeline(
+                    "ner", MODEL_NAME, on_evict=self._release_model,
                     aggregation_strategy="simple"
                 )
             except Exception:
@@ -103,6 +112,15 @@ class BioClinicalBERT:
         except Exception as e:
             logger.warning(f"Local model load failed: {e}. Using fallback.")
     
+    def _release_model(self):
+        """Registry eviction callback; the model reloads on next use."""
+        self.tokenizer = self.model = self.ner_pipeline = None
+    
+    def _ensure_model(self):
+        """Reload after an idle eviction (only if a local load succeeded before)."""
+        if self._model_key and self.model is None and not self.use_api:
+            self._init_local_model()
+    
     def _init_api_client(self):
         """Initialize HuggingFace Inference API client."""
         if self.hf_token:
@@ -149,6 +167,7 @@ class BioClinicalBERT:
             Dict with symptoms, entities, and confidence scores
         """
         text_lower = text.lower()
+        self._ensure_model()
         
         # Try NER pipeline first
         if self.ner_pipeline:
@@ -166,7 +185,8 @@ class BioClinicalBERT:
     def _extract_with_ner(self, text: str) -> Dict[str, Any]:
         """Extract symptoms using NER pipeline."""
         try:
-            entities = self.ner_pipeline(text)
+            MODEL_REGISTRY.touch(pipeline_key("ner", MODEL_NAME))
+            entities = self._ner_batcher.run(text)
             
             symptoms = []
             extracted_entities = []
@@ -275,30 +295,37 @@ class BioClinicalBERT:
         
         Useful for semantic similarity matching.
         """
+        self._ensure_model()
         if not self.model or not self.tokenizer:
             return None
         
         try:
-            import torch
-            
-            inputs = self.tokenizer(
-                text, 
-                return_tensors="pt", 
-                truncation=True, 
-                max_length=512
-            )
-            
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                # Use CLS token embedding
-                embeddings = outputs.last_hidden_state[:, 0, :].squeeze().tolist()
-            
-            return embeddings
-            
+            return self._embed_batcher.run(text)
         except Exception as e:
             logger.warning(f"Embedding extraction failed: {e}")
             return None
     
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Length-bucketed forward passes; CLS embedding per text, in input order."""
+        import torch
+        
+        MODEL_REGISTRY.touch(self._model_key)
+        # Locals keep the weights alive if the registry evicts them mid-batch
+        tokenizer, model = self.tokenizer, self.model
+        if tokenizer is None or model is None:
+            raise RuntimeError("Bio_ClinicalBERT model was evicted")
+        
+        def forward(inputs):
+            with torch.no_grad():
+                outputs = model(**inputs)
+                # Use CLS token embedding
+                return outputs.last_hidden_state[:, 0, :].tolist()
+        
+        # Pads each length bucket to its own longest text, not to 512
+        return bucketed_encode(
+            tokenizer, texts, forward, batch_size=EMBED_BATCH_SIZE, max_length=512
+        )
+    
     def fill_mask(self, text: str) -> List[Dict[str, Any]]:
         """
         Use Bio_ClinicalBERT for masked language modeling.
@@ -348,9 +375,8 @@ class BioClinicalBERT:
     def _fill_mask_local(self, text: str) -> List[Dict[str, Any]]:
         """Fill mask using local model."""
         try:
-            from transformers import pipeline
-            
-            fill_mask = pipeline("fill-mask", model=MODEL_NAME)
+            # Built once and shared, instead of a fresh pipeline per call
+            fill_mask = load_pipeline("fill-mask", MODEL_NAME)
             results = fill_mask(text)
             return results
             
@@ -361,7 +387,7 @@ class BioClinicalBERT:
 
 # Convenience function
 def get_nlp_extractor(use_api: bool = False) -> BioClinicalBERT:
-    """Get a Bio_ClinicalBERT instance for symptom extraction."""
+    """Get a Bio_ClinicalBERT instance for symptom extraction (weights are shared via the model registry)."""
     return BioClinicalBERT(use_api=use_api)
 
 
@@ -0,0 +1,185 @@
+"""
+Provider Circuit Breakers
+=========================
+
+Stops sending requests to an LLM provider that is failing, so an outage
+costs a few probe requests instead of a full timeout on every call.
+
+- closed: calls go through; outcomes land in a rolling window of the last
+  LLM_BREAKER_WINDOW_SECONDS. Once the window holds LLM_BREAKER_MIN_REQUESTS
+  calls and the share of failed or slow (> LLM_BREAKER_SLOW_CALL_SECONDS)
+  calls reaches LLM_BREAKER_FAILURE_RATE, the breaker opens.
+- open: calls are refused immediately with `CircuitOpenError` for
+  LLM_BREAKER_OPEN_SECONDS.
+- half-open: up to LLM_BREAKER_HALF_OPEN_PROBES calls are let through as
+  probes. A successful probe closes the breaker; a failed one re-opens it.
+
+Each breaker also reports a health score in [0, 1] (success rate, discounted
+for latency) that auto mode uses to order providers: a provider falls behind
+the preference order once its health is more than LLM_HEALTH_MARGIN below
+the healthiest one. A breaker that is due for a probe keeps its place, so
+the probe is real traffic (still bounded by the hedge delay).
+
+Metrics: llm_breaker_state (0 closed, 1 half-open, 2 open),
+llm_provider_health and llm_breaker_transitions_total, labelled by provider.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from observability.metrics import (
+    LLM_BREAKER_STATE,
+    LLM_BREAKER_TRANSITIONS_TOTAL,
+    LLM_PROVIDER_HEALTH,
+)
+
+LLM_BREAKER_WINDOW_SECONDS = float(os.getenv("LLM_BREAKER_WINDOW_SECONDS", 60))
+LLM_BREAKER_MIN_REQUESTS = int(os.getenv("LLM_BREAKER_MIN_REQUESTS", 5))
+LLM_BREAKER_FAILURE_RATE = float(os.getenv("LLM_BREAKER_FAILURE_RATE", 0.5))
+LLM_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("LLM_BREAKER_SLOW_CALL_SECONDS", 20))
+LLM_BREAKER_OPEN_SECONDS = float(os.getenv("LLM_BREAKER_OPEN_SECONDS", 30))
+LLM_BREAKER_HALF_OPEN_PROBES = int(os.getenv("LLM_BREAKER_HALF_OPEN_PROBES", 1))
+LLM_HEALTH_MARGIN = float(os.getenv("LLM_HEALTH_MARGIN", 0.2))
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"{provider} circuit open; next probe in {retry_after:.0f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker for one provider.
+
+    Usage:
+        breaker.before_call()                 # raises CircuitOpenError
+        ...
+        breaker.record(ok=True, seconds=elapsed)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = LLM_BREAKER_WINDOW_SECONDS,
+        min_requests: int = LLM_BREAKER_MIN_REQUESTS,
+        failure_rate: float = LLM_BREAKER_FAILURE_RATE,
+        slow_call_seconds: float = LLM_BREAKER_SLOW_CALL_SECONDS,
+        open_seconds: float = LLM_BREAKER_OPEN_SECONDS,
+        half_open_probes: int = LLM_BREAKER_HALF_OPEN_PROBES,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.clock = clock
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        # (timestamp, ok, seconds)
+        self._calls: Deque[Tuple[float, bool, float]] = deque()
+        self._lock = threading.Lock()
+        self._export()
+
+    def _trim(self, now: float) -> None:
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        self.state = state
+        self._probes = 0
+        if state == OPEN:
+            self._opened_at = self.clock()
+        elif state == CLOSED:
+            self._calls.clear()
+        LLM_BREAKER_TRANSITIONS_TOTAL.inc(provider=self.name, state=state)
+
+    def before_call(self) -> None:
+        """Admit a call, or raise CircuitOpenError if the provider should be skipped."""
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self._opened_at + self.open_seconds - self.clock()
+                if remaining > 0:
+                    raise CircuitOpenError(self.name, remaining)
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_probes:
+                    raise CircuitOpenError(self.name, 0.0)
+                self._probes += 1
+        self._export()
+
+    def probe_due(self) -> bool:
+        """True when the breaker would let a probe call through right now."""
+        with self._lock:
+            if self.state == OPEN:
+                return self.clock() >= self._opened_at + self.open_seconds
+            return self.state == HALF_OPEN and self._probes < self.half_open_probes
+
+    def record(self, ok: Optional[bool], seconds: float) -> None:
+        """
+        Record a call outcome.
+
+        ok=None (cancelled, rate limited locally) says nothing about the
+        provider's health and only frees a half-open probe slot.
+        """
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if ok is not None:
+                    self._transition(CLOSED if ok else OPEN)
+            if ok is not None and self.state == CLOSED:
+                now = self.clock()
+                self._calls.append((now, ok, seconds))
+                self._trim(now)
+                if len(self._calls) >= self.min_requests and self._bad_rate() >= self.failure_rate:
+                    self._transition(OPEN)
+        self._export()
+
+    def _bad_rate(self) -> float:
+        if not self._calls:
+            return 0.0
+        bad = sum(1 for _, ok, seconds in self._calls if not ok or seconds > self.slow_call_seconds)
+        return bad / len(self._calls)
+
+    def health(self) -> float:
+        """
+        0 when open; otherwise success rate discounted by up to half for
+        latency approaching the slow-call threshold. 1.0 with no data.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                return 0.0
+            self._trim(self.clock())
+            calls = list(self._calls)
+        if not calls:
+            score = 1.0
+        else:
+            success_rate = sum(1 for _, ok, _ in calls if ok) / len(calls)
+            mean_seconds = sum(seconds for _, _, seconds in calls) / len(calls)
+            score = success_rate * (1.0 - 0.5 * min(1.0, mean_seconds / self.slow_call_seconds))
+        return score * 0.5 if self.state == HALF_OPEN else score
+
+    def _export(self) -> None:
+        LLM_BREAKER_STATE.set(_STATE_VALUES[self.state], provider=self.name)
+        LLM_PROVIDER_HEALTH.set(round(self.health(), 4), provider=self.name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"state": self.state, "health": round(self.health(), 3)}
@@ -0,0 +1,333 @@
+"""
+Concept Index
+=============
+
+Approximate nearest-neighbour search over concept embeddings (symptoms,
+drug names, UMLS-scale vocabularies), in pure NumPy.
+
+IVF (inverted file) layout:
+- Vectors are L2-normalized and clustered with spherical k-means into
+  `n_lists` lists; each list is stored contiguously.
+- A query scores the list centroids, then scans only the `n_probe` best
+  lists. Raising `n_probe` trades speed for recall (n_probe == n_lists is
+  exact search).
+- Optional product quantization (`pq_subvectors > 0`) stores each vector as
+  one uint8 code per subvector and scans with lookup tables, so the hot data
+  is ~4 * dim / pq_subvectors times smaller. The best `k * refine` PQ hits are
+  then re-ranked exactly against the full vectors (memory-mapped, so only the
+  rows touched are paged in); pass `store_vectors=False` to drop them.
+
+Indexes are saved as a directory of .npy files and memory-mapped on load.
+
+Usage:
+    index = ConceptIndex(n_probe=8).build(embeddings, names)
+    index.save("knowledge/embeddings/symptoms.ivf")
+    index = ConceptIndex.load("knowledge/embeddings/symptoms.ivf")
+    index.query(query_embedding, k=5)  # [(name, cosine), ...]
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+
+
+def _unit(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def _kmeans(data: np.ndarray, k: int, iterations: int, rng: np.random.Generator,
+            spherical: bool = True, chunk: int = 8192) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Lloyd's k-means (cosine when `spherical`).
+
+    Returns:
+        (centroids [k, dim], assignment [n])
+    """
+    n = data.shape[0]
+    k = min(k, n)
+    centroids = data[rng.choice(n, size=k, replace=False)].copy()
+    assignment = np.zeros(n, dtype=np.int64)
+
+    for _ in range(iterations):
+        assignment = _assign(data, centroids, spherical, chunk)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, data)
+        counts = np.bincount(assignment, minlength=k)
+
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty clusters from random points
+            sums[empty] = data[rng.choice(n, size=int(empty.sum()), replace=False)]
+            counts[empty] = 1
+        centroids = sums / counts[:, None]
+        if spherical:
+            centroids = _unit(centroids)
+
+    return centroids.astype(np.float32), _assign(data, centroids, spherical, chunk)
+
+
+def _assign(data: np.ndarray, centroids: np.ndarray, spherical: bool, chunk: int) -> np.ndarray:
+    """Nearest centroid per row, computed in chunks to bound memory."""
+    out = np.empty(data.shape[0], dtype=np.int64)
+    if not spherical:
+        c_sq = (centroids ** 2).sum(axis=1)
+    for start in range(0, data.shape[0], chunk):
+        block = data[start:start + chunk]
+        if spherical:
+            out[start:start + chunk] = (block @ centroids.T).argmax(axis=1)
+        else:
+            # argmin ||x - c||^2 == argmin (||c||^2 - 2 x.c)
+            out[start:start + chunk] = (c_sq - 2 * block @ centroids.T).argmin(axis=1)
+    return out
+
+
+def brute_force_topk(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Exact top-k row ids by cosine similarity, best first. Shape [n_queries, k]."""
+    scores = _unit(np.atleast_2d(queries)) @ _unit(vectors).T
+    k = min(k, scores.shape[1])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+class ConceptIndex:
+    """
+    IVF (optionally IVF-PQ) cosine-similarity index over named vectors.
+    """
+
+    def __init__(
+        self,
+        n_lists: Optional[int] = None,
+        n_probe: int = 8,
+        pq_subvectors: int = 0,
+        refine: int = 4,
+        store_vectors: bool = True,
+        kmeans_iterations: int = 10,
+        train_sample: int = 50000,
+        seed: int = 0
+    ):
+        """
+        Args:
+            n_lists: Number of inverted lists (default ~4 * sqrt(N))
+            n_probe: Lists scanned per query (recall/speed knob)
+            pq_subvectors: Product-quantization subvectors; 0 scans full float32 vectors
+            refine: With PQ, re-rank this many times k candidates exactly
+            store_vectors: With PQ, keep full vectors for re-ranking
+            kmeans_iterations: Lloyd iterations for list and PQ training
+            train_sample: Max vectors used to train centroids
+            seed: RNG seed, so rebuilding the same data gives the same index
+        """
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.pq_subvectors = pq_subvectors
+        self.refine = refine
+        self.store_vectors = store_vectors
+        self.kmeans_iterations = kmeans_iterations
+        self.train_sample = train_sample
+        self.seed = seed
+
+        self.names: List[str] = []
+        self.centroids: Optional[np.ndarray] = None   # [n_lists, dim]
+        self.offsets: Optional[np.ndarray] = None     # [n_lists + 1], list l is rows offsets[l]:offsets[l+1]
+        self.ids: Optional[np.ndarray] = None         # [N], stored row -> original position
+        self.vectors: Optional[np.ndarray] = None     # [N, dim] unit vectors in list order
+        self.codebooks: Optional[np.ndarray] = None   # [m, 256, dim / m] (PQ)
+        self.codes: Optional[np.ndarray] = None       # [N, m] uint8 in list order (PQ)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def dim(self) -> int:
+        return 0 if self.centroids is None else self.centroids.shape[1]
+
+    # ------------------------------------------------------------------
+    # Build
+    # ------------------------------------------------------------------
+
+    def build(self, embeddings: np.ndarray, names: List[str]) -> "ConceptIndex":
+        """
+        Train lists (and PQ codebooks) and add all vectors.
+
+        Args:
+            embeddings: [N, dim] concept embeddings (normalized internally)
+            names: Concept name per row
+
+        Returns:
+            self
+        """
+        data = _unit(embeddings)
+        n, dim = data.shape
+        if n != len(names):
+            raise ValueError("embeddings and names must have the same length")
+        if self.pq_subvectors and dim % self.pq_subvectors:
+            raise ValueError(f"dim {dim} is not divisible by pq_subvectors={self.pq_subvectors}")
+
+        rng = np.random.default_rng(self.seed)
+        n_lists = self.n_lists or max(1, int(4 * np.sqrt(n)))
+        n_lists = min(n_lists, n)
+
+        sample = data if n <= self.train_sample else data[rng.choice(n, self.train_sample, replace=False)]
+        self.centroids, _ = _kmeans(sample, n_lists, self.kmeans_iterations, rng)
+        self.n_lists = self.centroids.shape[0]
+        assignment = _assign(data, self.centroids, True, 8192)
+
+        order = np.argsort(assignment, kind="stable")
+        counts = np.bincount(assignment, minlength=self.n_lists)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self.ids = order.astype(np.int64)
+        self.names = list(names)
+        ordered = data[order]
+
+        if self.pq_subvectors:
+            self._train_pq(sample, rng)
+            self.codes = self._encode(ordered)
+        self.vectors = ordered if (self.store_vectors or not self.pq_subvectors) else None
+
+        logger.info(f"Built concept index: {n} vectors, {self.n_lists} lists"
+                    + (f", PQ m={self.pq_subvectors}" if self.pq_subvectors else ""))
+        return self
+
+    def _train_pq(self, sample: np.ndarray, rng: np.random.Generator):
+        m = self.pq_subvectors
+        sub = sample.shape[1] // m
+        books = []
+        for j in range(m):
+            part = np.ascontiguousarray(sample[:, j * sub:(j + 1) * sub])
+            book, _ = _kmeans(part, 256, self.kmeans_iterations, rng, spherical=False)
+            if book.shape[0] < 256:
+                # Small training sets: pad so codes stay valid uint8 indices
+                book = np.vstack([book, np.repeat(book[-1:], 256 - book.shape[0], axis=0)])
+            books.append(book)
+        self.codebooks = np.stack(books).astype(np.float32)
+
+    def _encode(self, data: np.ndarray) -> np.ndarray:
+        m, _, sub = self.codebooks.shape
+        codes = np.empty((data.shape[0], m), dtype=np.uint8)
+        for j in range(m):
+            part = np.ascontiguousarray(data[:, j * sub:(j + 1) * sub])
+            codes[:, j] = _assign(part, self.codebooks[j], False, 8192)
+        return codes
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    def search(self, query: np.ndarray, k: int = 5, n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k for one query vector.
+
+        Returns:
+            (original row ids, cosine scores), best first
+        """
+        q = _unit(query).reshape(-1)
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+
+        centroid_scores = self.centroids @ q
+        lists = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+
+        rows = np.concatenate([
+            np.arange(self.offsets[l], self.offsets[l + 1]) for l in lists
+        ]) if n_probe < self.n_lists else np.arange(len(self.names))
+        if rows.size == 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+
+        if self.codes is not None:
+            m, _, sub = self.codebooks.shape
+            # Lookup table: dot product of each query subvector with every codeword
+            table = np.einsum("mcs,ms->mc", self.codebooks, q.reshape(m, sub))
+            scores = table[np.arange(m), self.codes[rows]].sum(axis=1)
+            if self.vectors is not None and self.refine:
+                keep = min(k * self.refine, rows.size)
+                shortlist = np.sort(np.argpartition(-scores, keep - 1)[:keep])
+                rows = rows[shortlist]
+                scores = self.vectors[rows] @ q
+        else:
+            scores = self.vectors[rows] @ q
+
+        k = min(k, rows.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return self.ids[rows[top]], scores[top].astype(np.float32)
+
+    def query(self, query: np.ndarray, k: int = 5, n_probe: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Approximate top-k as (name, cosine similarity), best first."""
+        ids, scores = self.search(query, k=k, n_probe=n_probe)
+        return [(self.names[i], float(s)) for i, s in zip(ids, scores)]
+
+    def query_batch(self, queries: np.ndarray, k: int = 5, n_probe: Optional[int] = None) -> List[List[Tuple[str, float]]]:
+        return [self.query(q, k=k, n_probe=n_probe) for q in np.atleast_2d(queries)]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """Write the index to a directory of .npy files plus meta.json."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        arrays = {"centroids": self.centroids, "offsets": self.offsets, "ids": self.ids}
+        if self.codes is not None:
+            arrays.update(codes=self.codes, codebooks=self.codebooks)
+        if self.vectors is not None:
+            arrays.update(vectors=self.vectors)
+        for name, array in arrays.items():
+            np.save(path / f"{name}.npy", np.asarray(array))
+
+        meta = {
+            "version": INDEX_FORMAT_VERSION,
+            "n_lists": self.n_lists,
+            "n_probe": self.n_probe,
+            "pq_subvectors": self.pq_subvectors,
+            "refine": self.refine,
+            "seed": self.seed,
+        }
+        (path / "meta.json").write_text(json.dumps(meta, indent=2))
+        (path / "names.json").write_text(json.dumps(self.names))
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> "ConceptIndex":
+        """Load a saved index; the large arrays are memory-mapped by default."""
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text())
+        if meta.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported concept index version: {meta.get('version')}")
+
+        index = cls(
+            n_lists=meta["n_lists"], n_probe=meta["n_probe"],
+            pq_subvectors=meta["pq_subvectors"], refine=meta["refine"], seed=meta["seed"]
+        )
+        mode = "r" if mmap else None
+        index.centroids = np.load(path / "centroids.npy")
+        index.offsets = np.load(path / "offsets.npy")
+        index.ids = np.load(path / "ids.npy")
+        index.names = json.loads((path / "names.json").read_text())
+        if index.pq_subvectors:
+            index.codebooks = np.load(path / "codebooks.npy")
+            index.codes = np.load(path / "codes.npy", mmap_mode=mode)
+        if (path / "vectors.npy").exists():
+            index.vectors = np.load(path / "vectors.npy", mmap_mode=mode)
+        index.store_vectors = index.vectors is not None
+        return index
+
+
+def recall_at_k(index: ConceptIndex, vectors: np.ndarray, queries: np.ndarray,
+                k: int = 10, n_probe: Optional[int] = None) -> float:
+    """Fraction of the exact top-k neighbours the index returns."""
+    exact = brute_force_topk(vectors, queries, k)
+    hits = 0
+    for q, truth in zip(np.atleast_2d(queries), exact):
+        found, _ = index.search(q, k=k, n_probe=n_probe)
+        hits += len(set(found.tolist()) & set(truth.tolist()))
+    return hits / exact.size
@@ -0,0 +1,263 @@
+"""
+Bounded Embedding Cache
+=======================
+
+LRU cache for per-text embeddings with a hard byte budget. Request-time
+lookups cache arbitrary user phrases, so an unbounded dict grows for the
+life of the worker; this keeps memory flat while repeated phrases are
+still served without a forward pass.
+
+- Entries are evicted least-recently-used once EMBEDDING_CACHE_MAX_BYTES
+  (vector bytes + key bytes) is exceeded.
+- Vectors are stored as float16 by default (half the memory of float32;
+  cosine similarity is unaffected at the precision we rank with) and
+  returned as float32.
+- An optional SQLite tier under EMBEDDING_CACHE_DISK_DIR keeps entries
+  across restarts; a memory miss falls through to disk and promotes the
+  entry. The disk tier is trimmed to EMBEDDING_CACHE_DISK_MAX_ENTRIES by
+  last use.
+- Keys are scoped by a namespace (the encoder's model id and inference
+  backend), so vectors from different models or backends never mix, in
+  memory or on disk. Changing the namespace drops the memory tier.
+
+Metrics: cache_requests_total{cache, result=hit|disk_hit|miss},
+embedding_cache_bytes, embedding_cache_entries and
+embedding_cache_evictions_total, labelled by cache name.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from observability.metrics import (
+    CACHE_REQUESTS_TOTAL,
+    EMBEDDING_CACHE_BYTES,
+    EMBEDDING_CACHE_ENTRIES,
+    EMBEDDING_CACHE_EVICTIONS_TOTAL,
+)
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", 64 * 2 ** 20))
+EMBEDDING_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float16")
+EMBEDDING_CACHE_DISK_DIR = os.getenv("EMBEDDING_CACHE_DISK_DIR", "")
+EMBEDDING_CACHE_DISK_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_DISK_MAX_ENTRIES", 200000))
+
+# Rough per-entry bookkeeping (dict slot, OrderedDict links, ndarray header)
+_ENTRY_OVERHEAD = 200
+
+
+class EmbeddingCache:
+    """
+    Thread-safe, byte-bounded LRU of text -> embedding vector.
+
+    Usage:
+        cache = EmbeddingCache("sapbert_embedding")
+        cache.set_namespace("model-id|fp32")  # once the encoder is known
+        rows = cache.get_many(texts)          # None where missing
+        cache.put_many(missing_texts, vectors)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_bytes: int = EMBEDDING_CACHE_MAX_BYTES,
+        dtype: str = EMBEDDING_CACHE_DTYPE,
+        disk_dir: Optional[str] = EMBEDDING_CACHE_DISK_DIR,
+        disk_max_entries: int = EMBEDDING_CACHE_DISK_MAX_ENTRIES,
+        namespace: str = ""
+    ):
+        self.name = name
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.dtype = np.dtype(dtype)
+        self.disk_max_entries = disk_max_entries
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # SQLite I/O is serialized separately so it never holds up memory hits
+        self._disk_lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_writes = 0
+        if disk_dir:
+            self._open_disk(Path(disk_dir))
+
+    def set_namespace(self, namespace: str) -> None:
+        """Scope entries to an encoder (model id + backend); a change drops the memory tier."""
+        if namespace != self.namespace:
+            self.namespace = namespace
+            self.clear()
+
+    def _key(self, text: str) -> str:
+        return f"{self.namespace}\x1f{text}" if self.namespace else text
+
+    # ----- memory tier -----
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    @staticmethod
+    def _entry_bytes(text: str, vector: np.ndarray) -> int:
+        return vector.nbytes + len(text.encode("utf-8")) + _ENTRY_OVERHEAD
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up texts; returns float32 vectors, None for misses."""
+        texts = [self._key(text) for text in texts]
+        results: List[Optional[np.ndarray]] = []
+        missing = []
+        with self._lock:
+            for i, text in enumerate(texts):
+                vector = self._entries.get(text)
+                if vector is not None:
+                    self._entries.move_to_end(text)
+                    results.append(vector.astype(np.float32))
+                else:
+                    results.append(None)
+                    missing.append(i)
+        hits = len(texts) - len(missing)
+
+        disk_hits = 0
+        if missing and self._disk is not None:
+            found = self._disk_get([texts[i] for i in missing])
+            for i in missing:
+                vector = found.get(texts[i])
+                if vector is not None:
+                    results[i] = vector.astype(np.float32)
+                    disk_hits += 1
+            if found:
+                self._insert(found.items())
+
+        CACHE_REQUESTS_TOTAL.inc(hits, cache=self.name, result="hit")
+        CACHE_REQUESTS_TOTAL.inc(disk_hits, cache=self.name, result="disk_hit")
+        CACHE_REQUESTS_TOTAL.inc(len(missing) - disk_hits, cache=self.name, result="miss")
+        return results
+
+    def put_many(self, texts: Sequence[str], vectors) -> None:
+        """Store freshly computed vectors (one row per text)."""
+        items = [
+            (self._key(text), np.asarray(vector).astype(self.dtype))
+            for text, vector in zip(texts, vectors)
+        ]
+        self._insert(items)
+        if self._disk is not None:
+            self._disk_put(items)
+
+    def put(self, text: str, vector) -> None:
+        self.put_many([text], [vector])
+
+    def _insert(self, items) -> None:
+        evicted = 0
+        with self._lock:
+            for text, vector in items:
+                vector = vector.astype(self.dtype, copy=False)
+                size = self._entry_bytes(text, vector)
+                if size > self.max_bytes:
+                    continue
+                previous = self._entries.pop(text, None)
+                if previous is not None:
+                    self._bytes -= self._entry_bytes(text, previous)
+                self._entries[text] = vector
+                self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                text, vector = self._entries.popitem(last=False)
+                self._bytes -= self._entry_bytes(text, vector)
+                evicted += 1
+            entries, nbytes = len(self._entries), self._bytes
+
+        if evicted:
+            EMBEDDING_CACHE_EVICTIONS_TOTAL.inc(evicted, cache=self.name)
+        EMBEDDING_CACHE_ENTRIES.set(entries, cache=self.name)
+        EMBEDDING_CACHE_BYTES.set(nbytes, cache=self.name)
+
+    def clear(self) -> None:
+        """Drop the memory tier (the disk tier is kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        EMBEDDING_CACHE_ENTRIES.set(0, cache=self.name)
+        EMBEDDING_CACHE_BYTES.set(0, cache=self.name)
+
+    # ----- disk tier -----
+
+    def _open_disk(self, directory: Path) -> None:
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", self.name)
+            self._disk = sqlite3.connect(
+                str(directory / f"{safe_name}.sqlite"), check_same_thread=False
+            )
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(text TEXT PRIMARY KEY, dtype TEXT, vector BLOB, last_used REAL)"
+            )
+            self._disk.commit()
+            logger.info(f"Embedding cache '{self.name}': disk tier at {directory}")
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache '{self.name}': disk tier disabled ({e})")
+            self._disk = None
+
+    def _disk_get(self, texts: List[str]) -> "OrderedDict[str, np.ndarray]":
+        found: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        try:
+            with self._disk_lock:
+                for start in range(0, len(texts), 500):
+                    chunk = texts[start:start + 500]
+                    rows = self._disk.execute(
+                        "SELECT text, dtype, vector FROM embeddings WHERE text IN "
+                        f"({','.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    for text, dtype, blob in rows:
+                        found[text] = np.frombuffer(blob, dtype=dtype)
+                if found:
+                    now = time.time()
+                    self._disk.executemany(
+                        "UPDATE embeddings SET last_used = ? WHERE text = ?",
+                        [(now, text) for text in found]
+                    )
+                    self._disk.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache '{self.name}': disk read failed ({e})")
+        return found
+
+    def _disk_put(self, items) -> None:
+        now = time.time()
+        try:
+            with self._disk_lock:
+                self._disk.executemany(
+                    "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)",
+                    [(text, vector.dtype.str, vector.tobytes(), now) for text, vector in items]
+                )
+                self._disk_writes += len(items)
+                # Trim by last use every so often rather than on every write
+                if self._disk_writes >= max(self.disk_max_entries // 10, 1):
+                    self._disk_writes = 0
+                    self._disk.execute(
+                        "DELETE FROM embeddings WHERE text NOT IN "
+                        "(SELECT text FROM embeddings ORDER BY last_used DESC LIMIT ?)",
+                        (self.disk_max_entries,)
+                    )
+                self._disk.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache '{self.name}': disk write failed ({e})")
+
+    def close(self) -> None:
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.close()
+                self._disk = None
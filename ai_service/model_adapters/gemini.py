@@ -0,0 +1,43 @@
+"""
+Gemini SDK Helpers
+
+The google-generativeai `GenerativeModel.generate_content` call is
+synchronous; awaiting it from a request handler would block the worker's
+event loop (and every other request on it) for the whole LLM round trip.
+"""
+
+import asyncio
+from typing import Any, AsyncIterator
+
+
+async def generate_content_async(client: Any, prompt: str, **kwargs) -> Any:
+    """
+    Call Gemini without blocking the event loop.
+
+    Uses the SDK's native `generate_content_async` when the installed version
+    has it, otherwise runs the blocking `generate_content` in a worker thread.
+    """
+    native = getattr(client, "generate_content_async", None)
+    if native is not None:
+        return await native(prompt, **kwargs)
+    return await asyncio.to_thread(client.generate_content, prompt, **kwargs)
+
+
+async def stream_content_async(client: Any, prompt: str, **kwargs) -> AsyncIterator[str]:
+    """
+    Stream Gemini output as text chunks.
+
+    Only the SDK's async API streams without tying up the event loop; with
+    the blocking client the whole answer is produced in a worker thread and
+    yielded as a single chunk.
+    """
+    native = getattr(client, "generate_content_async", None)
+    if native is not None:
+        response = await native(prompt, stream=True, **kwargs)
+        async for chunk in response:
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+        return
+    response = await asyncio.to_thread(client.generate_content, prompt, **kwargs)
+    yield response.text
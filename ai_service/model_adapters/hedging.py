@@ -0,0 +1,159 @@
+"""
+Hedged LLM Requests
+===================
+
+Races remote providers instead of trying them strictly one after another,
+so a slow primary costs one hedge delay rather than its full timeout.
+
+- The primary is called first. If it has not answered after its hedge delay
+  (the LLM_HEDGE_PERCENTILE latency of its recent successful calls, clamped
+  to [LLM_HEDGE_MIN_DELAY, LLM_HEDGE_MAX_DELAY]), the next provider is
+  started too. The first successful answer wins; the others are cancelled.
+- A provider that fails starts the next one immediately.
+- LLM_REQUEST_BUDGET_SECONDS caps the whole race; when it runs out every
+  call still in flight is cancelled and `ProvidersExhausted` is raised.
+- Until a provider has LLM_HEDGE_MIN_SAMPLES latencies, LLM_HEDGE_DEFAULT_DELAY
+  is used.
+- LLM_HEDGING=false keeps the old strictly sequential fallback (a provider
+  is only started once the previous one failed), still under the budget.
+"""
+
+import os
+import math
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+LLM_HEDGING = os.getenv("LLM_HEDGING", "true").lower() == "true"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", 95))
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", 0.5))
+LLM_HEDGE_MAX_DELAY = float(os.getenv("LLM_HEDGE_MAX_DELAY", 10))
+LLM_HEDGE_DEFAULT_DELAY = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY", 3))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", 20))
+LLM_REQUEST_BUDGET_SECONDS = float(os.getenv("LLM_REQUEST_BUDGET_SECONDS", 30))
+
+
+class ProvidersExhausted(Exception):
+    """Every raced provider failed, or the request budget ran out first."""
+
+    def __init__(self, errors: List[Tuple[str, BaseException]], timed_out: bool = False):
+        reason = "request budget exhausted" if timed_out else "all providers failed"
+        details = "; ".join(f"{name}: {error}" for name, error in errors)
+        super().__init__(f"{reason}{' (' + details + ')' if details else ''}")
+        self.errors = errors
+        self.timed_out = timed_out
+
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies per provider."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, provider: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.setdefault(provider, deque(maxlen=self.window))
+            samples.append(seconds)
+
+    def count(self, provider: str) -> int:
+        return len(self._samples.get(provider, ()))
+
+    def percentile(self, provider: str, pct: float) -> Optional[float]:
+        """Nearest-rank percentile, or None without samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(provider, ()))
+        if not samples:
+            return None
+        rank = max(1, math.ceil(pct / 100.0 * len(samples)))
+        return samples[rank - 1]
+
+
+class HedgePolicy:
+    """When to start the next provider, and how long a request may take overall."""
+
+    def __init__(
+        self,
+        tracker: Optional[LatencyTracker] = None,
+        percentile: float = LLM_HEDGE_PERCENTILE,
+        min_delay: float = LLM_HEDGE_MIN_DELAY,
+        max_delay: float = LLM_HEDGE_MAX_DELAY,
+        default_delay: float = LLM_HEDGE_DEFAULT_DELAY,
+        min_samples: int = LLM_HEDGE_MIN_SAMPLES,
+        budget: float = LLM_REQUEST_BUDGET_SECONDS,
+        enabled: bool = LLM_HEDGING
+    ):
+        self.tracker = tracker or LatencyTracker()
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.budget = budget
+        self.enabled = enabled
+
+    def delay_for(self, provider: str) -> float:
+        """Seconds to give `provider` before hedging to the next one."""
+        if not self.enabled:
+            return math.inf
+        if self.tracker.count(provider) < self.min_samples:
+            return self.default_delay
+        delay = self.tracker.percentile(provider, self.percentile)
+        return min(self.max_delay, max(self.min_delay, delay))
+
+
+async def race(
+    attempts: Sequence[Tuple[str, Callable[[], Awaitable[Any]]]],
+    policy: HedgePolicy,
+    budget: Optional[float] = None
+) -> Tuple[str, Any]:
+    """
+    Run `attempts` (name, coroutine factory) in preference order with hedging.
+
+    Returns:
+        (provider name, result) of the first successful attempt
+
+    Raises:
+        ProvidersExhausted: if all attempts fail or the budget runs out
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + (policy.budget if budget is None else budget)
+    queue = list(attempts)
+    pending: Dict[asyncio.Task, str] = {}
+    errors: List[Tuple[str, BaseException]] = []
+    hedge_at = 0.0
+
+    def launch() -> None:
+        nonlocal hedge_at
+        name, factory = queue.pop(0)
+        pending[asyncio.ensure_future(factory())] = name
+        hedge_at = loop.time() + policy.delay_for(name)
+
+    try:
+        while queue or pending:
+            if loop.time() >= deadline:
+                raise ProvidersExhausted(errors, timed_out=True)
+            if queue and (not pending or loop.time() >= hedge_at):
+                launch()
+
+            now = loop.time()
+            timeout = deadline - now
+            if queue:
+                timeout = min(timeout, max(0.0, hedge_at - now))
+
+            done, _ = await asyncio.wait(
+                list(pending), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                name = pending.pop(task)
+                if task.exception() is None:
+                    return name, task.result()
+                errors.append((name, task.exception()))
+        raise ProvidersExhausted(errors)
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
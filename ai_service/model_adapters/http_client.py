@@ -0,0 +1,180 @@
+"""
+Pooled HTTP Clients for LLM Providers
+=====================================
+
+One long-lived `httpx.AsyncClient` per provider, so chat and report-summary
+calls reuse warm keep-alive connections instead of paying TCP + TLS setup
+on every request.
+
+- Created on app startup (`start`) or first use, closed on shutdown (`aclose`).
+- A client belongs to the event loop it was created on; calls from another
+  loop (tests, scripts using asyncio.run) get a fresh client for that loop,
+  and the stale client is closed rather than left holding its pool.
+- HTTP/2 is used when LLM_HTTP2=true and the `h2` package is installed.
+
+Configuration:
+- LLM_HTTP_MAX_CONNECTIONS / LLM_HTTP_MAX_KEEPALIVE: pool limits per provider
+- LLM_HTTP_KEEPALIVE_SECONDS: idle time before a pooled connection is closed
+- LLM_HTTP_CONNECT_TIMEOUT / LLM_HTTP_READ_TIMEOUT / LLM_HTTP_WRITE_TIMEOUT /
+  LLM_HTTP_POOL_TIMEOUT: per-phase timeouts in seconds
+- LLM_HTTP_TOTAL_TIMEOUT: overall deadline for one call, streamed or not
+  (`RequestDeadline`). Per-phase timeouts alone let a provider that keeps
+  trickling bytes hold the request, its admission slot and a pooled
+  connection indefinitely.
+"""
+
+import os
+import asyncio
+import logging
+import importlib.util
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterable, Set, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", 20))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", 10))
+LLM_HTTP_KEEPALIVE_SECONDS = float(os.getenv("LLM_HTTP_KEEPALIVE_SECONDS", 60))
+LLM_HTTP_CONNECT_TIMEOUT = float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT", 5))
+LLM_HTTP_READ_TIMEOUT = float(os.getenv("LLM_HTTP_READ_TIMEOUT", 60))
+LLM_HTTP_WRITE_TIMEOUT = float(os.getenv("LLM_HTTP_WRITE_TIMEOUT", 10))
+LLM_HTTP_POOL_TIMEOUT = float(os.getenv("LLM_HTTP_POOL_TIMEOUT", 5))
+LLM_HTTP_TOTAL_TIMEOUT = float(os.getenv("LLM_HTTP_TOTAL_TIMEOUT", 60))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "false").lower() == "true"
+
+T = TypeVar("T")
+
+
+class RequestDeadline:
+    """
+    Overall deadline for one provider call, on top of the per-phase timeouts.
+
+    Usage:
+        deadline = RequestDeadline()
+        response = await deadline.run(client.send(request, stream=True))
+        async for line in deadline.iterate(response.aiter_lines()):
+            ...
+
+    Raises asyncio.TimeoutError once `seconds` have passed in total.
+    """
+
+    def __init__(self, seconds: float = None):
+        self.seconds = LLM_HTTP_TOTAL_TIMEOUT if seconds is None else seconds
+        self._loop = asyncio.get_running_loop()
+        self._expires = self._loop.time() + self.seconds
+
+    def remaining(self) -> float:
+        remaining = self._expires - self._loop.time()
+        if remaining <= 0:
+            raise asyncio.TimeoutError(f"Provider call exceeded {self.seconds:.0f}s")
+        return remaining
+
+    async def run(self, awaitable: Awaitable[T]) -> T:
+        return await asyncio.wait_for(awaitable, timeout=self.remaining())
+
+    async def iterate(self, chunks: AsyncIterator[T]) -> AsyncIterator[T]:
+        iterator = chunks.__aiter__()
+        while True:
+            try:
+                item = await self.run(iterator.__anext__())
+            except StopAsyncIteration:
+                return
+            yield item
+
+
+class ProviderClients:
+    """
+    Per-provider pooled async HTTP clients.
+
+    Usage:
+        client = HTTP_CLIENTS.get("openrouter")
+        response = await client.post(url, json=payload, headers=headers)
+    """
+
+    def __init__(
+        self,
+        max_connections: int = LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive: int = LLM_HTTP_MAX_KEEPALIVE,
+        keepalive_seconds: float = LLM_HTTP_KEEPALIVE_SECONDS,
+        http2: bool = LLM_HTTP2
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_seconds = keepalive_seconds
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        if http2 and not self.http2:
+            logger.warning("LLM_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+        # provider -> (client, loop it was created on)
+        self._clients: Dict[str, Tuple[Any, asyncio.AbstractEventLoop]] = {}
+        # Closes of stale clients scheduled on the running loop
+        self._closing: Set[asyncio.Task] = set()
+
+    def _build(self):
+        import httpx
+
+        return httpx.AsyncClient(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_seconds,
+            ),
+            timeout=httpx.Timeout(
+                connect=LLM_HTTP_CONNECT_TIMEOUT,
+                read=LLM_HTTP_READ_TIMEOUT,
+                write=LLM_HTTP_WRITE_TIMEOUT,
+                pool=LLM_HTTP_POOL_TIMEOUT,
+            ),
+        )
+
+    def get(self, provider: str):
+        """Pooled client for a provider on the running event loop."""
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(provider)
+        if entry is not None and entry[1] is loop and not entry[0].is_closed:
+            return entry[0]
+        if entry is not None:
+            self._retire(provider, *entry)
+        client = self._build()
+        self._clients[provider] = (client, loop)
+        return client
+
+    async def start(self, providers: Iterable[str]) -> None:
+        """Create clients up front (app startup)."""
+        for provider in providers:
+            self.get(provider)
+
+    def _retire(self, provider: str, client, client_loop: asyncio.AbstractEventLoop) -> None:
+        """Close a client that is being replaced, on its own loop when that loop still runs."""
+        if client.is_closed:
+            return
+        if client_loop is not asyncio.get_running_loop() and client_loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), client_loop)
+            return
+        # Its loop has stopped: close from here, which releases the pool even
+        # if the connections' transports can no longer shut down cleanly
+        task = asyncio.get_running_loop().create_task(self._close_stale(provider, client))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close_stale(provider: str, client) -> None:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Closing stale {provider} HTTP client failed: {e}")
+
+    async def aclose(self) -> None:
+        """Close every client (app shutdown), including ones left from other loops."""
+        loop = asyncio.get_running_loop()
+        for provider, (client, client_loop) in list(self._clients.items()):
+            del self._clients[provider]
+            if client_loop is loop:
+                await client.aclose()
+            else:
+                self._retire(provider, client, client_loop)
+        pending = [t for t in self._closing if t.get_loop() is loop]
+        if pending:
+            await asyncio.gather(*pending)
+
+
+HTTP_CLIENTS = ProviderClients()
@@ -7,20 +7,21 @@ Adapter for running local pretrained models:
 """
 
 import os
+import importlib.util
 from typing import Dict, List, Any, Optional
 
-# Try importing transformers
-try:
-    from transformers import (
-        AutoTokenizer, 
-        AutoModel, 
-        AutoModelForTokenClassification,
-        pipeline
-    )
-    import torch
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
+from .batching import MicroBatcher
+from .tokenization import bucketed_encode
+from .registry import MODEL_REGISTRY, encoder_key, load_encoder, load_pipeline, pipeline_key
+
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 64))
+
+# transformers/torch are imported on first model load, not at module import;
+# availability is probed without importing them.
+TRANSFORMERS_AVAILABLE = (
+    importlib.util.find_spec("transformers") is not None
+    and importlib.util.find_spec("torch") is not None
+)
 
 
 class LocalModelAdapter:
@@ -51,7 +52,15 @@ class LocalModelAdapter:
         self._model = None
         self._tokenizer = None
         self._ner_pipeline = None
-        self._device = "cuda" if torch.cuda.is_available() else "cpu" if TRANSFORMERS_AVAILABLE else None
+        self._device = None
+        self._model_key: Optional[str] = None
+        
+        # Concurrent callers share forward passes
+        self._embed_batcher = MicroBatcher("local_model", self._embed_texts)
+        self._ner_batcher = MicroBatcher(
+            "local_model_ner",
+            lambda texts: self._ner_pipeline(texts, batch_size=len(texts))
+        )
     
     def is_available(self) -> bool:
         """Check if transformers is available."""
@@ -71,19 +80,24 @@ class LocalModelAdapter:
             return True
         
         try:
-            print(f"Loading model: {self.model_name}")
-            self._tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            self._model = AutoModel.from_pretrained(self.model_name)
+            import torch
             
-            if self._device == "cuda":
-                self._model = self._model.cuda()
-            
-            self._model.eval()
+            self._device = "cuda" if torch.cuda.is_available() else "cpu"
+            print(f"Loading model: {self.model_name}")
+            # Shared registry: other adapters on the same weights reuse this load
+            self._tokenizer, self._model = load_encoder(
+                self.model_name, "local_model", self._device, on_evict=self._release_model
+            )
+            self._model_key = encoder_key(self.model_name, "local_model", self._device)
             return True
         except Exception as e:
             print(f"Failed to load model {self.model_name}: {e}")
             return False
     
+    def _release_model(self):
+        """Registry eviction callback; load_model() reloads on next use."""
+        self._model = self._tokenizer = self._ner_pipeline = None
+    
     def get_embeddings(self, text: str) -> Optional[List[float]]:
         """
         Get text embeddings using the model.
@@ -98,29 +112,36 @@ class LocalModelAdapter:
             return None
         
         try:
-            # Tokenize
-            inputs = self._tokenizer(
-                text, 
-                return_tensors="pt", 
-                truncation=True, 
-                max_length=512,
-                padding=True
-            )
-            
+            return self._embed_batcher.run(text)
+        except Exception as e:
+            print(f"Embedding error: {e}")
+            return None
+    
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Length-bucketed forward passes; CLS embedding per text, in input order."""
+        import torch
+        
+        MODEL_REGISTRY.touch(self._model_key)
+        # Locals keep the weights alive if the registry evicts them mid-batch
+        tokenizer, model = self._tokenizer, self._model
+        if tokenizer is None or model is None:
+            raise RuntimeError(f"{self.model_name} was evicted")
+        
+        def forward(inputs):
             if self._device == "cuda":
                 inputs = {k: v.cuda() for k, v in inputs.items()}
             
             # Get embeddings
             with torch.no_grad():
-                outputs = self._model(**inputs)
+                outputs = model(**inputs)
             
             # Use CLS token embedding
-            embeddings = outputs.last_hidden_state[:, 0, :].squeeze().cpu().numpy()
-            return embeddings.tolist()
-            
-        except Exception as e:
-            print(f"Embedding error: {e}")
-            return None
+            return outputs.last_hidden_state[:, 0, :].cpu().numpy().tolist()
+        
+        # Sorted by token length so short phrases are not padded to long ones
+        return bucketed_encode(
+            tokenizer, texts, forward, batch_size=EMBED_BATCH_SIZE, max_length=512
+        )
     
     def extract_entities(self, text: str) -> List[Dict[str, Any]]:
         """
@@ -137,14 +158,15 @@ class LocalModelAdapter:
         
         try:
             # Use NER pipeline
+            ner_model = self.MODELS.get("ner_disease", "distilbert-base-uncased")
             if self._ner_pipeline is None:
-                self._ner_pipeline = pipeline(
-                    "ner",
-                    model=self.MODELS.get("ner_disease", "distilbert-base-uncased"),
+                self._ner_pipeline = load_pipeline(
+                    "ner", ner_model, on_evict=self._release_model,
                     aggregation_strategy="simple"
                 )
+            MODEL_REGISTRY.touch(pipeline_key("ner", ner_model))
             
-            results = self._ner_pipeline(text)
+            results = self._ner_batcher.run(text)
             
             return [
                 {
@@ -202,14 +224,19 @@ class LocalModelAdapter:
         Returns:
             Dict mapping symptom to confidence score
         """
-        text_emb = self.get_embeddings(text)
-        if text_emb is None:
+        if not self.load_model():
+            return {}
+        
+        # Text and all symptoms go through the batcher together
+        try:
+            text_emb, *symptom_embs = self._embed_batcher.run_many([text] + list(symptom_list))
+        except Exception as e:
+            print(f"Embedding error: {e}")
             return {}
         
         results = {}
         
-        for symptom in symptom_list:
-            symptom_emb = self.get_embeddings(symptom)
+        for symptom, symptom_emb in zip(symptom_list, symptom_embs):
             if symptom_emb:
                 import numpy as np
                 
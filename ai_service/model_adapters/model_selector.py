@@ -10,22 +10,49 @@ Handles rate limiting, fallbacks, and cost optimization.
 """
 
 import os
+import json
+import time
 import asyncio
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
 from abc import ABC, abstractmethod
 
+from observability.metrics import LLM_REQUEST_SECONDS, LLM_REQUESTS_TOTAL, LLM_TIME_TO_FIRST_TOKEN_SECONDS
+from serving.rate_limit import PROVIDER_LIMITS, RateLimited
+from serving.singleflight import SingleFlight, content_key
+from report_analysis.chunking import split_report
+from .http_client import HTTP_CLIENTS, RequestDeadline
+from .gemini import generate_content_async, stream_content_async
+from .hedging import HedgePolicy, ProvidersExhausted, race
+from .circuit_breaker import CircuitBreaker, LLM_HEALTH_MARGIN
+from .response_cache import ResponseCache
+
 # Environment variables for API configuration
 USE_LOCAL = os.getenv("USE_LOCAL_AI", "true").lower() == "true"
 USE_GEMINI = os.getenv("USE_GEMINI", "true").lower() == "true"
 USE_OPENROUTER = os.getenv("USE_OPENROUTER", "false").lower() == "true"
+# Offline simulated providers in place of Gemini/OpenRouter (see simulated.py)
+LLM_SIMULATED = os.getenv("LLM_SIMULATED", "false").lower() == "true"
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "")
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+
+# Sampling settings for report summaries (part of the summary cache key)
+SUMMARY_GENERATION_PARAMS = {"temperature": 0.3, "max_tokens": 1024}
+CHUNK_NOTES_GENERATION_PARAMS = {"temperature": 0.3, "max_tokens": 512}
+
+# Map-reduce summarization of long reports (see _report_summary_prompt)
+REPORT_MAP_REDUCE = os.getenv("REPORT_MAP_REDUCE", "true").lower() == "true"
+REPORT_CHUNK_MAX_CHARS = int(os.getenv("REPORT_CHUNK_MAX_CHARS", 4000))
+REPORT_MAP_CONCURRENCY = int(os.getenv("REPORT_MAP_CONCURRENCY", 4))
 
 
 class BaseModelAdapter(ABC):
     """Abstract base class for model adapters."""
     
+    # Model identity, part of response cache keys
+    model_name: str = ""
+    
     @abstractmethod
     async def generate(self, prompt: str, **kwargs) -> str:
         """Generate response from model."""
@@ -35,6 +62,13 @@ class BaseModelAdapter(ABC):
     def is_available(self) -> bool:
         """Check if this adapter is available."""
         pass
+    
+    async def stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Stream the response as text chunks. Adapters without provider-side
+        streaming yield the complete response as one chunk.
+        """
+        yield await self.generate(prompt, **kwargs)
 
 
 class LocalModelAdapter(BaseModelAdapter):
@@ -88,9 +122,8 @@ class GeminiModelAdapter(BaseModelAdapter):
     
     def __init__(self, api_key: str = None):
         self.api_key = api_key or GEMINI_API_KEY
+        self.model_name = "gemini-pro"
         self._client = None
-        self._rate_limit_remaining = 100
-        self._last_request_time = 0
     
     def is_available(self) -> bool:
         """Check if Gemini API is configured."""
@@ -102,7 +135,7 @@ class GeminiModelAdapter(BaseModelAdapter):
             try:
                 import google.generativeai as genai
                 genai.configure(api_key=self.api_key)
-                self._client = genai.GenerativeModel('gemini-pro')
+                self._client = genai.GenerativeModel(self.model_name)
             except ImportError:
                 print("google-generativeai not installed")
                 self._client = "unavailable"
@@ -119,15 +152,16 @@ class GeminiModelAdapter(BaseModelAdapter):
             raise Exception("Gemini client unavailable")
         
         try:
-            # Rate limiting
-            await self._rate_limit()
+            # Shared per-provider quota (all workers draw from one bucket)
+            await PROVIDER_LIMITS.acquire("gemini")
             
             # Prepend Mandatory System Prompt
             from safety_config import SYSTEM_PROMPT
             full_prompt = f"{SYSTEM_PROMPT}\n\nTask: {prompt}"
 
-            # Generate response
-            response = client.generate_content(
+            # Generate response without blocking the event loop
+            response = await generate_content_async(
+                client,
                 full_prompt,
                 generation_config={
                     "temperature": kwargs.get("temperature", 0.3),
@@ -137,22 +171,42 @@ class GeminiModelAdapter(BaseModelAdapter):
             
             return response.text
             
+        except RateLimited as e:
+            raise RateLimitError(str(e))
         except Exception as e:
             if "429" in str(e) or "rate" in str(e).lower():
                 raise RateLimitError(f"Gemini rate limit: {e}")
             raise
     
-    async def _rate_limit(self):
-        """Simple rate limiting."""
-        import time
-        current_time = time.time()
+    async def stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Stream response chunks from Gemini."""
+        client = self._get_client()
+        
+        if client == "unavailable" or client is None:
+            raise Exception("Gemini client unavailable")
         
-        # Minimum 100ms between requests
-        time_since_last = current_time - self._last_request_time
-        if time_since_last < 0.1:
-            await asyncio.sleep(0.1 - time_since_last)
+        try:
+            await PROVIDER_LIMITS.acquire("gemini")
+            
+            from safety_config import SYSTEM_PROMPT
+            full_prompt = f"{SYSTEM_PROMPT}\n\nTask: {prompt}"
+            
+            async for text in stream_content_async(
+                client,
+                full_prompt,
+                generation_config={
+                    "temperature": kwargs.get("temperature", 0.3),
+                    "max_output_tokens": kwargs.get("max_tokens", 1024),
+                }
+            ):
+                yield text
         
-        self._last_request_time = time.time()
+        except RateLimited as e:
+            raise RateLimitError(str(e))
+        except Exception as e:
+            if "429" in str(e) or "rate" in str(e).lower():
+                raise RateLimitError(f"Gemini rate limit: {e}")
+            raise
 
 
 class OpenRouterModelAdapter(BaseModelAdapter):
@@ -160,56 +214,103 @@ class OpenRouterModelAdapter(BaseModelAdapter):
     
     def __init__(self, api_key: str = None):
         self.api_key = api_key or OPENROUTER_API_KEY
-        self.base_url = "https://openrouter.ai/api/v1"
+        self.base_url = OPENROUTER_BASE_URL
         self.default_model = "anthropic/claude-3-haiku"  # Cost-effective default
     
+    @property
+    def model_name(self) -> str:
+        return self.default_model
+    
     def is_available(self) -> bool:
         """Check if OpenRouter API is configured."""
         return bool(self.api_key)
     
+    def _request(self, prompt: str, stream: bool = False, **kwargs) -> Tuple[str, Dict, Dict]:
+        """URL, headers and payload for a chat completion."""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://telemedicine-cdss.local",
+        }
+        
+        from safety_config import SYSTEM_PROMPT
+        
+        payload = {
+            "model": kwargs.get("model", self.default_model),
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": kwargs.get("temperature", 0.3),
+            "max_tokens": kwargs.get("max_tokens", 1024),
+        }
+        if stream:
+            payload["stream"] = True
+        return f"{self.base_url}/chat/completions", headers, payload
+    
     async def generate(self, prompt: str, **kwargs) -> str:
         """Generate response using OpenRouter."""
         if not self.api_key:
             raise Exception("OpenRouter API key not configured")
         
         try:
-            import aiohttp
+            await PROVIDER_LIMITS.acquire("openrouter")
+            url, headers, payload = self._request(prompt, **kwargs)
             
-            model = kwargs.get("model", self.default_model)
+            # Pooled keep-alive client shared by every call to this provider
+            response = await RequestDeadline().run(HTTP_CLIENTS.get("openrouter").post(
+                url,
+                headers=headers,
+                json=payload
+            ))
+            if response.status_code == 429:
+                raise RateLimitError("OpenRouter rate limit exceeded")
             
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://telemedicine-cdss.local",
-            }
+            response.raise_for_status()
+            data = response.json()
             
-            from safety_config import SYSTEM_PROMPT
+            return data["choices"][0]["message"]["content"]
             
-            payload = {
-                "model": model,
-                "messages": [
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": kwargs.get("temperature", 0.3),
-                "max_tokens": kwargs.get("max_tokens", 1024),
-            }
+        except RateLimited as e:
+            raise RateLimitError(str(e))
+        except Exception as e:
+            if "429" in str(e):
+                raise RateLimitError(f"OpenRouter rate limit: {e}")
+            raise
+    
+    async def stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Stream response chunks (OpenAI-style server-sent events)."""
+        if not self.api_key:
+            raise Exception("OpenRouter API key not configured")
+        
+        try:
+            await PROVIDER_LIMITS.acquire("openrouter")
+            url, headers, payload = self._request(prompt, stream=True, **kwargs)
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/chat/completions",
-                    headers=headers,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    if response.status == 429:
-                        raise RateLimitError("OpenRouter rate limit exceeded")
-                    
-                    response.raise_for_status()
-                    data = await response.json()
-                    
-                    return data["choices"][0]["message"]["content"]
-                    
+            client = HTTP_CLIENTS.get("openrouter")
+            deadline = RequestDeadline()
+            response = await deadline.run(client.send(
+                client.build_request("POST", url, headers=headers, json=payload), stream=True
+            ))
+            try:
+                if response.status_code == 429:
+                    raise RateLimitError("OpenRouter rate limit exceeded")
+                response.raise_for_status()
+                
+                async for line in deadline.iterate(response.aiter_lines()):
+                    if not line.startswith("data:"):
+                        continue  # blank separators and ": keep-alive" comments
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    delta = json.loads(data)["choices"][0].get("delta", {})
+                    if delta.get("content"):
+                        yield delta["content"]
+            finally:
+                await response.aclose()
+        
+        except RateLimited as e:
+            raise RateLimitError(str(e))
         except Exception as e:
             if "429" in str(e):
                 raise RateLimitError(f"OpenRouter rate limit: {e}")
@@ -228,19 +329,109 @@ class ModelSelector:
     Decision rules:
     1. Use local models for simple tasks (symptom extraction)
     2. Use Gemini Pro for summaries and reasoning (when available)
-    3. Fall back to OpenRouter on Gemini rate limit
+    3. Hedge to OpenRouter when Gemini fails or is slower than usual;
+       providers are ordered by circuit-breaker health
     4. Use templates as final fallback
     """
     
-    def __init__(self):
+    def __init__(self, store=None):
         self.local_adapter = LocalModelAdapter()
         self.gemini_adapter = GeminiModelAdapter()
         self.openrouter_adapter = OpenRouterModelAdapter()
+        if LLM_SIMULATED:
+            from .simulated import SimulatedModelAdapter
+            self.gemini_adapter = SimulatedModelAdapter.from_env("gemini")
+            self.openrouter_adapter = SimulatedModelAdapter.from_env("openrouter")
         
         # Configure based on environment
         self.use_local = USE_LOCAL
         self.use_gemini = USE_GEMINI and self.gemini_adapter.is_available()
         self.use_openrouter = USE_OPENROUTER and self.openrouter_adapter.is_available()
+        
+        # Hedge delays come from each provider's recent latencies
+        self.hedge_policy = HedgePolicy()
+        
+        # Remote providers are skipped while their breaker is open
+        self.breakers = {
+            "gemini": CircuitBreaker("gemini"),
+            "openrouter": CircuitBreaker("openrouter"),
+        }
+        
+        # Identical reports build identical prompts; reuse their summaries
+        self.summary_cache = ResponseCache("summary", store=store)
+        # Identical summaries / chat prompts already in flight are joined
+        self.summary_flight = SingleFlight("summary")
+        self.chat_flight = SingleFlight("chat")
+    
+    async def _call_provider(
+        self,
+        name: str,
+        adapter: BaseModelAdapter,
+        prompt: str,
+        **kwargs
+    ) -> str:
+        """
+        Call one adapter through its circuit breaker, recording latency and
+        outcome metrics.
+        
+        Raises:
+            CircuitOpenError: if the provider's breaker is open (no call made)
+        """
+        breaker = self.breakers.get(name)
+        if breaker is not None:
+            breaker.before_call()
+        
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await adapter.generate(prompt, **kwargs)
+            outcome = "ok"
+            self.hedge_policy.tracker.observe(name, time.perf_counter() - start)
+            return result
+        except RateLimitError:
+            outcome = "rate_limited"
+            raise
+        except asyncio.CancelledError:
+            # Lost a hedged race, or the request budget ran out
+            outcome = "cancelled"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            LLM_REQUEST_SECONDS.observe(elapsed, provider=name)
+            LLM_REQUESTS_TOTAL.inc(provider=name, outcome=outcome)
+            if breaker is not None:
+                breaker.record(self._breaker_outcome(breaker, outcome, elapsed), elapsed)
+    
+    @staticmethod
+    def _breaker_outcome(breaker: CircuitBreaker, outcome: str, elapsed: float) -> Optional[bool]:
+        """
+        Map a call outcome onto the breaker: rate limits are the limiter's
+        business, and a cancelled call only counts against the provider if
+        it had already been running for longer than a slow call.
+        """
+        if outcome == "ok":
+            return True
+        if outcome == "error":
+            return False
+        if outcome == "cancelled" and elapsed > breaker.slow_call_seconds:
+            return False
+        return None
+    
+    def _by_health(self, providers: List[tuple]) -> List[tuple]:
+        """
+        Order (name, adapter) pairs for auto mode: providers within
+        LLM_HEALTH_MARGIN of the healthiest keep their preference order,
+        degraded ones follow, healthiest first. A provider due for a
+        half-open probe keeps its place so it can recover.
+        """
+        health = {
+            name: 1.0 if self.breakers[name].probe_due() else self.breakers[name].health()
+            for name, _ in providers
+        }
+        best = max(health.values(), default=0.0)
+        healthy = [p for p in providers if health[p[0]] >= best - LLM_HEALTH_MARGIN]
+        degraded = [p for p in providers if health[p[0]] < best - LLM_HEALTH_MARGIN]
+        return healthy + sorted(degraded, key=lambda p: -health[p[0]])
     
     async def generate(
         self,
@@ -261,63 +452,199 @@ class ModelSelector:
         Returns:
             Generated response string
         """
+        text, _ = await self.generate_with_provider(prompt, task_type, provider, **kwargs)
+        return text
+    
+    async def generate_with_provider(
+        self,
+        prompt: str,
+        task_type: str = "general",
+        provider: str = "auto",
+        **kwargs
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Same routing as `generate`, also reporting who answered.
+        
+        Returns:
+            (response, provider name), with provider None when the response
+            is an error/unavailability message rather than a model answer
+        """
         # Explicit Provider Selection
         if provider == "gemini":
             if self.use_gemini:
                 try:
-                    return await self.gemini_adapter.generate(prompt, **kwargs)
+                    return await self._call_provider("gemini", self.gemini_adapter, prompt, **kwargs), "gemini"
                 except Exception as e:
-                    return f"[Error using Gemini: {str(e)}]"
+                    return f"[Error using Gemini: {str(e)}]", None
             else:
-                return "[Gemini is not configured or available]"
+                return "[Gemini is not configured or available]", None
 
         if provider == "openrouter":
             if self.use_openrouter:
                 try:
-                    return await self.openrouter_adapter.generate(prompt, **kwargs)
+                    return await self._call_provider("openrouter", self.openrouter_adapter, prompt, **kwargs), "openrouter"
                 except Exception as e:
-                    return f"[Error using OpenRouter: {str(e)}]"
+                    return f"[Error using OpenRouter: {str(e)}]", None
             else:
-                return "[OpenRouter is not configured or available]"
+                return "[OpenRouter is not configured or available]", None
                 
         if provider == "local":
              if self.use_local:
-                 return await self.local_adapter.generate(prompt, **kwargs)
+                 return await self._call_provider("local", self.local_adapter, prompt, **kwargs), "local"
              else:
-                 return "[Local model is not enabled]"
+                 return "[Local model is not enabled]", None
 
         # === AUTO MODE (Fallback Logic) ===
         
         # For simple extraction tasks, prefer local
         if task_type == "extraction" and self.use_local:
             try:
-                return await self.local_adapter.generate(prompt, **kwargs)
+                return await self._call_provider("local", self.local_adapter, prompt, **kwargs), "local"
             except Exception:
                 pass
         
-        # For summaries and reasoning, prefer Gemini
+        # For summaries and reasoning, prefer Gemini, hedged with OpenRouter
+        remote = []
         if self.use_gemini:
+            remote.append(("gemini", self.gemini_adapter))
+        if self.use_openrouter:
+            remote.append(("openrouter", self.openrouter_adapter))
+        if remote:
             try:
-                return await self.gemini_adapter.generate(prompt, **kwargs)
-            except RateLimitError:
-                print("Gemini rate limited, trying fallback...")
+                name, text = await self._race_providers(self._by_health(remote), prompt, **kwargs)
+                return text, name
+            except ProvidersExhausted as e:
+                print(f"Remote providers unavailable, using fallback: {e}")
+        
+        # Final fallback to local/template
+        if self.use_local:
+            return await self._call_provider("local", self.local_adapter, prompt, **kwargs), "local"
+        
+        return "[AI service temporarily unavailable. Please try again later.]", None
+    
+    async def _stream_provider(
+        self,
+        name: str,
+        adapter: BaseModelAdapter,
+        prompt: str,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream from one adapter through its circuit breaker, with latency metrics."""
+        breaker = self.breakers.get(name)
+        if breaker is not None:
+            breaker.before_call()
+        
+        start = time.perf_counter()
+        outcome = "error"
+        first = True
+        try:
+            async for chunk in adapter.stream(prompt, **kwargs):
+                if first:
+                    LLM_TIME_TO_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - start, provider=name)
+                    first = False
+                yield chunk
+            outcome = "ok"
+        except RateLimitError:
+            outcome = "rate_limited"
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            # Client went away mid-stream
+            outcome = "cancelled"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            LLM_REQUEST_SECONDS.observe(elapsed, provider=name)
+            LLM_REQUESTS_TOTAL.inc(provider=name, outcome=outcome)
+            if breaker is not None:
+                breaker.record(self._breaker_outcome(breaker, outcome, elapsed), elapsed)
+    
+    async def stream_with_provider(
+        self,
+        prompt: str,
+        task_type: str = "general",
+        provider: str = "auto",
+        **kwargs
+    ) -> AsyncIterator[Tuple[str, Optional[str]]]:
+        """
+        Streaming counterpart of `generate_with_provider`: yields
+        (chunk, provider) pairs as they arrive.
+        
+        Auto mode tries providers in health order and only moves on if a
+        provider fails before its first chunk; once text has been sent the
+        answer is committed to that provider. Providers without streaming
+        support answer in a single chunk.
+        """
+        explicit = {
+            "gemini": (self.use_gemini, self.gemini_adapter, "Gemini"),
+            "openrouter": (self.use_openrouter, self.openrouter_adapter, "OpenRouter"),
+        }
+        if provider in explicit:
+            enabled, adapter, label = explicit[provider]
+            if not enabled:
+                yield f"[{label} is not configured or available]", None
+                return
+            started = False
+            try:
+                async for chunk in self._stream_provider(provider, adapter, prompt, **kwargs):
+                    started = True
+                    yield chunk, provider
             except Exception as e:
-                print(f"Gemini error: {e}")
+                if started:
+                    raise
+                yield f"[Error using {label}: {str(e)}]", None
+            return
+        
+        if provider == "local" or (task_type == "extraction" and self.use_local):
+            if self.use_local:
+                async for chunk in self._stream_provider("local", self.local_adapter, prompt, **kwargs):
+                    yield chunk, "local"
+            else:
+                yield "[Local model is not enabled]", None
+            return
         
-        # Fallback to OpenRouter
+        remote = []
+        if self.use_gemini:
+            remote.append(("gemini", self.gemini_adapter))
         if self.use_openrouter:
+            remote.append(("openrouter", self.openrouter_adapter))
+        for name, adapter in self._by_health(remote):
+            started = False
             try:
-                return await self.openrouter_adapter.generate(prompt, **kwargs)
-            except RateLimitError:
-                print("OpenRouter rate limited")
+                async for chunk in self._stream_provider(name, adapter, prompt, **kwargs):
+                    started = True
+                    yield chunk, name
+                return
             except Exception as e:
-                print(f"OpenRouter error: {e}")
+                if started:
+                    raise
+                print(f"{name} stream failed before first chunk, trying fallback: {e}")
         
-        # Final fallback to local/template
         if self.use_local:
-            return await self.local_adapter.generate(prompt, **kwargs)
+            async for chunk in self._stream_provider("local", self.local_adapter, prompt, **kwargs):
+                yield chunk, "local"
+            return
+        
+        yield "[AI service temporarily unavailable. Please try again later.]", None
+    
+    async def _race_providers(
+        self,
+        providers: List[tuple],
+        prompt: str,
+        **kwargs
+    ) -> Tuple[str, str]:
+        """
+        Call (name, adapter) pairs in preference order with hedging: the next
+        provider starts when the current one fails or exceeds its hedge delay,
+        the first answer wins and the rest are cancelled.
         
-        return "[AI service temporarily unavailable. Please try again later.]"
+        Returns:
+            (provider name, response) of the winner
+        """
+        attempts = [
+            (name, lambda name=name, adapter=adapter: self._call_provider(name, adapter, prompt, **kwargs))
+            for name, adapter in providers
+        ]
+        return await race(attempts, self.hedge_policy)
     
     async def summarize_report(
         self,
@@ -329,24 +656,164 @@ class ModelSelector:
         """
         Generate AI summary of medical report.
         """
-        # Build prompt
-        prompt = self._build_report_summary_prompt(
+        result = await self.summarize_report_with_meta(
+            extracted_text,
+            lab_values,
+            abnormal_findings,
+            provider=provider
+        )
+        return result["summary"]
+    
+    async def summarize_report_with_meta(
+        self,
+        extracted_text: str,
+        lab_values: List[Dict],
+        abnormal_findings: List[Dict],
+        provider: str = "auto"
+    ) -> Dict[str, Any]:
+        """
+        Generate AI summary of medical report, served from the response
+        cache when the same report was summarized before. Concurrent
+        requests for the same summary share one LLM call.
+        
+        Returns:
+            {"summary": str, "cached": bool, "provider": str or None}
+        """
+        prompt = await self._report_summary_prompt(
             extracted_text,
             lab_values,
-            abnormal_findings
+            abnormal_findings,
+            provider
         )
+        return await self._cached_summary(prompt, provider, SUMMARY_GENERATION_PARAMS)
+    
+    async def _cached_summary(
+        self,
+        prompt: str,
+        provider: str,
+        params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Summary for one prompt via the response cache and singleflight."""
+        params = dict(params)
+        key = self.summary_cache.key(prompt, provider, self._model_fingerprint(provider), params)
+        cached = await self.summary_cache.aget(key)
+        if cached is not None:
+            entry = json.loads(cached)
+            return {"summary": entry["summary"], "cached": True, "provider": entry["provider"]}
+        
+        async def compute():
+            summary, answered_by = await self.generate_with_provider(
+                prompt, task_type="summary", provider=provider, **params
+            )
+            # Only real model answers are cached, never templates or error messages
+            if answered_by in ("gemini", "openrouter"):
+                await self.summary_cache.aput(key, json.dumps({"summary": summary, "provider": answered_by}))
+            return {"summary": summary, "cached": False, "provider": answered_by}
         
-        return await self.generate(prompt, task_type="summary", provider=provider)
+        return dict(await self.summary_flight.do(key, compute))
+    
+    async def _report_summary_prompt(
+        self,
+        extracted_text: str,
+        lab_values: List[Dict],
+        abnormal_findings: List[Dict],
+        provider: str
+    ) -> str:
+        """
+        Final summary prompt for a report.
+        
+        Reports that fit in one chunk get the single-pass prompt. Longer
+        ones are summarized map-reduce style: each chunk of pages/sections
+        is condensed into notes concurrently (at most REPORT_MAP_CONCURRENCY
+        at a time, each cached by chunk content), and the returned prompt
+        combines those notes. If any chunk cannot be condensed by a remote
+        model, the single-pass prompt is used instead.
+        """
+        if not REPORT_MAP_REDUCE:
+            return self._build_report_summary_prompt(extracted_text, lab_values, abnormal_findings)
+        
+        chunks = (
+            split_report(extracted_text, REPORT_CHUNK_MAX_CHARS)
+            if len(extracted_text) > REPORT_CHUNK_MAX_CHARS else []
+        )
+        if len(chunks) <= 1:
+            return self._build_report_summary_prompt(
+                extracted_text, lab_values, abnormal_findings, preview_chars=REPORT_CHUNK_MAX_CHARS
+            )
+        
+        semaphore = asyncio.Semaphore(REPORT_MAP_CONCURRENCY)
+        
+        async def condense(chunk: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._cached_summary(
+                    self._build_chunk_notes_prompt(chunk), provider, CHUNK_NOTES_GENERATION_PARAMS
+                )
+        
+        notes = await asyncio.gather(*(condense(chunk) for chunk in chunks))
+        if any(n["provider"] not in ("gemini", "openrouter") for n in notes):
+            print("Chunked report summary unavailable, using single-pass prompt")
+            return self._build_report_summary_prompt(extracted_text, lab_values, abnormal_findings)
+        return self._build_reduce_prompt([n["summary"] for n in notes], lab_values, abnormal_findings)
+    
+    async def stream_report_summary(
+        self,
+        extracted_text: str,
+        lab_values: List[Dict],
+        abnormal_findings: List[Dict],
+        provider: str = "auto"
+    ) -> AsyncIterator[Tuple[str, Optional[str], bool]]:
+        """
+        Stream a report summary as (chunk, provider, cached) triples.
+        
+        A cached summary is sent as one chunk; a freshly streamed one is
+        cached once complete, under the same key as summarize_report_with_meta.
+        For long reports the per-chunk notes are gathered first and only
+        the final step is streamed.
+        """
+        prompt = await self._report_summary_prompt(
+            extracted_text,
+            lab_values,
+            abnormal_findings,
+            provider
+        )
+        
+        params = dict(SUMMARY_GENERATION_PARAMS)
+        key = self.summary_cache.key(prompt, provider, self._model_fingerprint(provider), params)
+        cached = await self.summary_cache.aget(key)
+        if cached is not None:
+            entry = json.loads(cached)
+            yield entry["summary"], entry["provider"], True
+            return
+        
+        parts, answered_by = [], None
+        async for chunk, answered_by in self.stream_with_provider(
+            prompt, task_type="summary", provider=provider, **params
+        ):
+            parts.append(chunk)
+            yield chunk, answered_by, False
+        if answered_by in ("gemini", "openrouter"):
+            await self.summary_cache.aput(key, json.dumps({"summary": "".join(parts), "provider": answered_by}))
+    
+    def _model_fingerprint(self, provider: str) -> str:
+        """Models that could answer for `provider`, for cache keys."""
+        models = {
+            "gemini": self.gemini_adapter.model_name,
+            "openrouter": self.openrouter_adapter.model_name,
+        }
+        if provider in models:
+            return models[provider]
+        return "+".join(models.values())
     
     def _build_report_summary_prompt(
         self,
         extracted_text: str,
         lab_values: List[Dict],
-        abnormal_findings: List[Dict]
+        abnormal_findings: List[Dict],
+        preview_chars: int = 1000
     ) -> str:
         """Build prompt for report summarization."""
         # Truncate text if too long
-        text_preview = extracted_text[:1000] if len(extracted_text) > 1000 else extracted_text
+        text_preview = extracted_text[:preview_chars]
         
         # Format lab values
         lab_summary = "\n".join([
@@ -382,6 +849,56 @@ Please provide a brief, professional summary suitable for pre-consultation revie
 
         return prompt
     
+    def _build_chunk_notes_prompt(self, chunk: str) -> str:
+        """Map step: condense one page/section of a long report into notes."""
+        # No page counts or positions here, so the prompt (and its cache key)
+        # depends only on the chunk's own text
+        return f"""Condense this section of a medical lab report into short factual notes.
+
+IMPORTANT GUIDELINES:
+- List every test result with its value, unit and any flag or reference range
+- Keep clinically relevant comments; drop headers, addresses and boilerplate
+- Do NOT provide diagnosis or treatment recommendations
+- Do NOT suggest specific medications or dosages
+
+REPORT SECTION:
+{chunk}"""
+    
+    def _build_reduce_prompt(
+        self,
+        chunk_notes: List[str],
+        lab_values: List[Dict],
+        abnormal_findings: List[Dict]
+    ) -> str:
+        """Reduce step: combine per-section notes into the report summary prompt."""
+        notes = "\n\n".join(
+            f"[Section {i + 1}]\n{note.strip()}" for i, note in enumerate(chunk_notes)
+        )
+        abnormal_summary = "\n".join([
+            f"- {f['test_name']}: {f['value']} {f['unit']} ({f['direction']}, {f['severity']})"
+            for f in abnormal_findings
+        ])
+        
+        return f"""Summarize the following medical lab report into a concise clinical note.
+The report was long, so each section has already been condensed into notes.
+
+IMPORTANT GUIDELINES:
+- Highlight abnormal values and their clinical significance
+- Do NOT provide diagnosis or treatment recommendations
+- Do NOT suggest specific medications or dosages
+- Keep the summary factual and objective
+- Recommend consulting a healthcare provider
+
+SECTION NOTES:
+{notes}
+
+PARSED LAB VALUES: {len(lab_values)} extracted, {len(abnormal_findings)} abnormal
+
+ABNORMAL FINDINGS:
+{abnormal_summary if abnormal_summary else "No abnormal findings detected"}
+
+Please provide a brief, professional summary suitable for pre-consultation review."""
+    
     async def extract_symptoms_ai(self, text: str) -> Dict[str, Any]:
         """
         Use AI to extract symptoms from text (enhanced extraction).
@@ -426,10 +943,41 @@ Return ONLY valid JSON, no other text."""
         """
         Generate chat response using Gemini or fallback.
         """
+        reply, _ = await self.generate_chat_response_with_provider(
+            system_prompt, user_message, session_context, provider
+        )
+        return reply
+    
+    async def generate_chat_response_with_provider(
+        self,
+        system_prompt: str,
+        user_message: str,
+        session_context: Dict[str, Any],
+        provider: str = "auto"
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Chat response plus the provider that answered (see generate_with_provider).
+        Concurrent identical prompts share one LLM call.
+        """
         full_prompt = f"{system_prompt}\n\nUSER QUESTION: {user_message}"
         
         # We can pass context as kwargs if adapters supported it, but for now simple concatenation
-        return await self.generate(full_prompt, task_type="reasoning", provider=provider)
+        return await self.chat_flight.do(
+            content_key(full_prompt, provider),
+            lambda: self.generate_with_provider(full_prompt, task_type="reasoning", provider=provider)
+        )
+    
+    async def stream_chat_response(
+        self,
+        system_prompt: str,
+        user_message: str,
+        session_context: Dict[str, Any],
+        provider: str = "auto"
+    ) -> AsyncIterator[Tuple[str, Optional[str]]]:
+        """Stream a chat response as (chunk, provider) pairs."""
+        full_prompt = f"{system_prompt}\n\nUSER QUESTION: {user_message}"
+        async for item in self.stream_with_provider(full_prompt, task_type="reasoning", provider=provider):
+            yield item
     
     async def identify_pill(self, image_bytes: bytes) -> Dict[str, Any]:
         """
@@ -481,10 +1029,12 @@ Return ONLY valid JSON, no other text."""
             },
             "gemini": {
                 "enabled": self.use_gemini,
-                "available": self.gemini_adapter.is_available()
+                "available": self.gemini_adapter.is_available(),
+                **self.breakers["gemini"].snapshot()
             },
             "openrouter": {
                 "enabled": self.use_openrouter,
-                "available": self.openrouter_adapter.is_available()
+                "available": self.openrouter_adapter.is_available(),
+                **self.breakers["openrouter"].snapshot()
             }
         }
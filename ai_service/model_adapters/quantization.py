@@ -0,0 +1,242 @@
+"""
+Quantized CPU Inference Backends
+================================
+
+Alternative execution backends for the BERT-family encoders (SapBERT,
+Bio_ClinicalBERT, local models). Production runs on CPU only, where int8
+weights cut both latency and resident memory per worker.
+
+Backends:
+- "fp32":      the PyTorch model as loaded (default)
+- "int8":      PyTorch dynamic quantization of every nn.Linear
+               (int8 weights, activations quantized on the fly)
+- "onnx-int8": ONNX export + onnxruntime dynamic int8 quantization;
+               needs `onnx` and `onnxruntime`, otherwise falls back to "int8"
+
+Selection: INFERENCE_BACKEND sets the default for every adapter; a per-adapter
+variable overrides it, e.g. SAPBERT_BACKEND=onnx-int8. Exported ONNX graphs
+are cached under ONNX_CACHE_DIR, keyed by model name.
+
+Check accuracy with `parity_report` (top-1 normalization agreement against
+fp32) and speed/memory with `evaluation/benchmark_quantization.py`.
+"""
+
+import os
+import re
+import logging
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("fp32", "int8", "onnx-int8")
+
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "fp32").lower()
+ONNX_CACHE_DIR = Path(os.getenv(
+    "ONNX_CACHE_DIR",
+    Path(__file__).parent.parent / "knowledge" / "onnx"
+))
+
+
+def backend_for(adapter: str) -> str:
+    """Configured backend for an adapter: <ADAPTER>_BACKEND, else INFERENCE_BACKEND."""
+    backend = os.getenv(f"{adapter.upper()}_BACKEND", INFERENCE_BACKEND).lower()
+    if backend not in BACKENDS:
+        logger.warning(f"Unknown inference backend '{backend}' for {adapter}; using fp32")
+        return "fp32"
+    return backend
+
+
+def onnx_available() -> bool:
+    import importlib.util
+    return (
+        importlib.util.find_spec("onnx") is not None
+        and importlib.util.find_spec("onnxruntime") is not None
+    )
+
+
+def quantize_int8(model):
+    """PyTorch dynamic int8 quantization of all Linear layers."""
+    import torch
+    return torch.ao.quantization.quantize_dynamic(
+        model.eval(), {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+class OnnxEncoder:
+    """
+    onnxruntime session that quacks like a transformers encoder:
+    `encoder(**tokenizer_output).last_hidden_state` is a torch tensor.
+    """
+
+    def __init__(self, path: Path, threads: Optional[int] = None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.path = Path(path)
+        self.session = ort.InferenceSession(
+            str(self.path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def __call__(self, input_ids=None, attention_mask=None, **_):
+        import torch
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if feeds["attention_mask"] is None:
+            feeds["attention_mask"] = torch.ones_like(input_ids)
+        feeds = {
+            name: feeds[name].cpu().numpy().astype(np.int64)
+            for name in self.input_names
+        }
+        hidden = self.session.run(None, feeds)[0]
+        return SimpleNamespace(last_hidden_state=torch.from_numpy(hidden))
+
+    # Adapters call these on torch modules; they are no-ops here
+    def to(self, *_args, **_kwargs):
+        return self
+
+    def eval(self):
+        return self
+
+
+def export_onnx_int8(model, path: Path) -> Path:
+    """Export an encoder to ONNX (dynamic batch/sequence axes) and quantize it to int8."""
+    import torch
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    class _Encoder(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, input_ids, attention_mask):
+            return self.inner(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fp32_path = path.with_name(path.stem + ".fp32.onnx")
+    dummy = torch.ones((1, 8), dtype=torch.long)
+    axes = {0: "batch", 1: "sequence"}
+
+    # The wrapper must be in eval mode too: export restores the wrapper's
+    # original mode on the whole tree afterwards
+    torch.onnx.export(
+        _Encoder(model).eval(), (dummy, dummy), str(fp32_path),
+        input_names=["input_ids", "attention_mask"],
+        output_names=["last_hidden_state"],
+        dynamic_axes={"input_ids": axes, "attention_mask": axes, "last_hidden_state": axes},
+        opset_version=17,
+        dynamo=False
+    )
+    quantize_dynamic(str(fp32_path), str(path), weight_type=QuantType.QInt8)
+    fp32_path.unlink(missing_ok=True)
+    return path
+
+
+def onnx_cache_path(model_name: str) -> Path:
+    safe_model = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+    return ONNX_CACHE_DIR / f"{safe_model}.int8.onnx"
+
+
+def apply_backend(model, backend: str, model_name: str = "model"):
+    """
+    Convert a loaded fp32 encoder to the requested backend.
+
+    Falls back to the next simpler backend (onnx-int8 -> int8 -> fp32) when a
+    conversion is unavailable or fails, so a bad setting never stops the
+    service from loading a model.
+    """
+    if backend == "fp32" or model is None:
+        return model
+
+    try:
+        if next(model.parameters()).is_cuda:
+            logger.info(f"{model_name}: quantized backends are CPU-only; keeping fp32 on GPU")
+            return model
+    except (AttributeError, StopIteration):
+        pass
+
+    if backend == "onnx-int8":
+        if onnx_available():
+            try:
+                path = onnx_cache_path(model_name)
+                if not path.exists():
+                    logger.info(f"Exporting {model_name} to {path}")
+                    export_onnx_int8(model, path)
+                encoder = OnnxEncoder(path)
+                logger.info(f"✅ {model_name}: onnx-int8 backend")
+                return encoder
+            except Exception as e:
+                logger.warning(f"{model_name}: ONNX backend failed ({e}); using int8")
+        else:
+            logger.warning(f"{model_name}: onnx/onnxruntime not installed; using int8")
+
+    try:
+        quantized = quantize_int8(model)
+        logger.info(f"✅ {model_name}: int8 backend")
+        return quantized
+    except Exception as e:
+        logger.warning(f"{model_name}: int8 quantization failed ({e}); using fp32")
+        return model
+
+
+def cls_encoder(model, tokenizer, max_length: int = 32) -> Callable[[List[str]], np.ndarray]:
+    """Text -> CLS embedding function for a model/tokenizer pair (used by parity checks)."""
+    def encode(texts: List[str]) -> np.ndarray:
+        import torch
+
+        inputs = tokenizer(texts, return_tensors="pt", padding=True, truncation=True, max_length=max_length)
+        with torch.no_grad():
+            outputs = model(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"])
+        return outputs.last_hidden_state[:, 0, :].numpy().astype(np.float32)
+    return encode
+
+
+def parity_report(
+    reference: Callable[[List[str]], np.ndarray],
+    candidate: Callable[[List[str]], np.ndarray],
+    vocabulary: List[str],
+    queries: Optional[List[str]] = None,
+    batch_size: int = 64
+) -> Dict[str, Any]:
+    """
+    Compare a quantized encoder against the fp32 reference on normalization.
+
+    Each query is normalized to its nearest vocabulary term (cosine, as in
+    SapBERTHelper.normalize) using each encoder's own embeddings.
+
+    Args:
+        reference: fp32 text -> embedding function
+        candidate: quantized text -> embedding function
+        vocabulary: Canonical terms (e.g. the KB symptom list)
+        queries: Phrases to normalize (default: "i have <term>" per term)
+
+    Returns:
+        top1_agreement, mean/min query-embedding cosine and counts
+    """
+    queries = queries or [f"i have {term}" for term in vocabulary]
+
+    def embed(fn, texts):
+        rows = np.vstack([fn(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)])
+        return rows / np.maximum(np.linalg.norm(rows, axis=1, keepdims=True), 1e-12)
+
+    ref_vocab, cand_vocab = embed(reference, vocabulary), embed(candidate, vocabulary)
+    ref_q, cand_q = embed(reference, queries), embed(candidate, queries)
+
+    ref_top1 = (ref_q @ ref_vocab.T).argmax(axis=1)
+    cand_top1 = (cand_q @ cand_vocab.T).argmax(axis=1)
+    cosines = (ref_q * cand_q).sum(axis=1)
+
+    return {
+        "queries": len(queries),
+        "vocabulary": len(vocabulary),
+        "top1_agreement": float((ref_top1 == cand_top1).mean()),
+        "mean_cosine": float(cosines.mean()),
+        "min_cosine": float(cosines.min()),
+    }
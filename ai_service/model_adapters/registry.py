@@ -0,0 +1,256 @@
+"""
+Shared Model Registry
+=====================
+
+Process-wide owner of loaded transformer weights. Adapters ask the registry
+for a model instead of calling `from_pretrained` themselves, so:
+
+- the same weights are loaded once per worker, however many adapters use
+  them (SapBERTHelper and the SapBERT-DDXPlus fallback share
+  cambridgeltl/SapBERT when their backends match);
+- loads happen once behind a per-model lock, even when several requests
+  hit a cold model at the same moment;
+- per-model memory and load time are reported (`stats()`, /models, and the
+  model_memory_bytes / model_load_seconds metrics);
+- models unused for MODEL_IDLE_EVICT_SECONDS are dropped. Adapters register
+  an eviction callback that clears their references and reload through the
+  registry on next use. 0 (default) disables idle eviction.
+"""
+
+import os
+import time
+import logging
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from observability.metrics import MODEL_LOAD_SECONDS, MODEL_MEMORY_BYTES, MODEL_EVICTIONS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+MODEL_IDLE_EVICT_SECONDS = float(os.getenv("MODEL_IDLE_EVICT_SECONDS", 0))
+
+
+def model_memory_bytes(value: Any) -> int:
+    """Approximate weight memory of a model, pipeline, or (tokenizer, model) tuple."""
+    if isinstance(value, (tuple, list)):
+        return sum(model_memory_bytes(v) for v in value)
+    if hasattr(value, "model") and not hasattr(value, "state_dict"):
+        # transformers pipeline
+        return model_memory_bytes(value.model)
+    if hasattr(value, "path") and hasattr(value, "session"):
+        # OnnxEncoder: weights live in the onnxruntime session
+        try:
+            return value.path.stat().st_size
+        except OSError:
+            return 0
+    if not hasattr(value, "state_dict"):
+        return 0
+
+    def tensor_bytes(obj) -> int:
+        if isinstance(obj, (tuple, list)):
+            return sum(tensor_bytes(o) for o in obj)
+        if hasattr(obj, "element_size") and hasattr(obj, "numel"):
+            return obj.element_size() * obj.numel()
+        return 0
+
+    try:
+        return sum(tensor_bytes(v) for v in value.state_dict().values())
+    except Exception:
+        return 0
+
+
+@dataclass
+class _Entry:
+    value: Any
+    load_seconds: float
+    memory_bytes: int
+    last_used: float
+    on_evict: List[Any] = field(default_factory=list)
+
+
+class ModelRegistry:
+    """
+    Load-once cache of models keyed by model id (plus backend/device).
+
+    Usage:
+        tokenizer, model = MODEL_REGISTRY.get(key, loader, on_evict=self._release)
+        MODEL_REGISTRY.touch(key)   # on each use, for idle tracking
+
+    Eviction callbacks can run while a forward pass is in flight, so
+    inference code copies the model and tokenizer into locals before use.
+    """
+
+    def __init__(self, idle_seconds: float = MODEL_IDLE_EVICT_SECONDS):
+        self.idle_seconds = idle_seconds
+        self._entries: Dict[str, _Entry] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._sweeper: Optional[threading.Thread] = None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str, loader: Callable[[], Any],
+            on_evict: Optional[Callable[[], None]] = None) -> Any:
+        """
+        Return the loaded model for `key`, calling `loader` only if absent.
+
+        Concurrent callers for the same key wait for a single load; a failed
+        load raises to every waiter and is not cached.
+        """
+        entry = self._lookup(key, on_evict)
+        if entry is not None:
+            return entry.value
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            entry = self._lookup(key, on_evict)
+            if entry is not None:
+                return entry.value
+
+            start = time.perf_counter()
+            value = loader()
+            seconds = time.perf_counter() - start
+            entry = _Entry(value, seconds, model_memory_bytes(value), time.monotonic())
+            self._add_callback(entry, on_evict)
+            with self._lock:
+                self._entries[key] = entry
+
+        MODEL_LOAD_SECONDS.observe(seconds, model=key)
+        MODEL_MEMORY_BYTES.set(entry.memory_bytes, model=key)
+        logger.info(f"Loaded {key} in {seconds:.1f}s ({entry.memory_bytes / 2 ** 20:.0f} MB)")
+        self._start_sweeper()
+        return value
+
+    def _lookup(self, key: str, on_evict) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.last_used = time.monotonic()
+                self._add_callback(entry, on_evict)
+            return entry
+
+    @staticmethod
+    def _add_callback(entry: _Entry, on_evict) -> None:
+        if on_evict is None:
+            return
+        # Weak refs so registering an adapter does not keep it alive
+        ref = weakref.WeakMethod(on_evict) if hasattr(on_evict, "__self__") else (lambda: on_evict)
+        if not any(r() == on_evict for r in entry.on_evict):
+            entry.on_evict.append(ref)
+
+    def touch(self, key: Optional[str]) -> None:
+        """Mark a model as used now (called from adapters' inference paths)."""
+        entry = self._entries.get(key) if key else None
+        if entry is not None:
+            entry.last_used = time.monotonic()
+
+    def evict(self, key: str, max_idle: Optional[float] = None) -> bool:
+        """
+        Drop a model and tell every adapter holding it to release its references.
+
+        With `max_idle`, the model is only dropped if it is still idle when the
+        lock is taken, so a request that used it since the idle scan keeps it.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            if max_idle is not None and time.monotonic() - entry.last_used < max_idle:
+                return False
+            del self._entries[key]
+        for ref in entry.on_evict:
+            callback = ref()
+            if callback is not None:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.warning(f"Eviction callback for {key} failed: {e}")
+        MODEL_EVICTIONS_TOTAL.inc(model=key)
+        MODEL_MEMORY_BYTES.set(0, model=key)
+        logger.info(f"Evicted {key} ({entry.memory_bytes / 2 ** 20:.0f} MB)")
+        return True
+
+    def evict_idle(self, max_idle: Optional[float] = None) -> List[str]:
+        """Evict models unused for `max_idle` seconds (default: idle_seconds)."""
+        max_idle = self.idle_seconds if max_idle is None else max_idle
+        now = time.monotonic()
+        with self._lock:
+            idle = [k for k, e in self._entries.items() if now - e.last_used >= max_idle]
+        return [key for key in idle if self.evict(key, max_idle)]
+
+    def _start_sweeper(self) -> None:
+        if self.idle_seconds <= 0 or self._sweeper is not None:
+            return
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._sweeper = threading.Thread(
+                target=self._sweep, name="model-registry-sweeper", daemon=True
+            )
+            self._sweeper.start()
+
+    def _sweep(self) -> None:
+        interval = min(60.0, max(self.idle_seconds / 2, 1.0))
+        while True:
+            time.sleep(interval)
+            self.evict_idle()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Loaded models with memory, load time and idle time."""
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self._entries.items())
+        return [
+            {
+                "model": key,
+                "memory_mb": round(entry.memory_bytes / 2 ** 20, 1),
+                "load_seconds": round(entry.load_seconds, 3),
+                "idle_seconds": round(now - entry.last_used, 1),
+                "users": sum(1 for ref in entry.on_evict if ref() is not None),
+            }
+            for key, entry in entries
+        ]
+
+
+MODEL_REGISTRY = ModelRegistry()
+
+
+def encoder_key(model_id: str, adapter: str, device: str = "cpu") -> str:
+    """Registry key for an encoder: weights are shared only when backend and device match."""
+    from .quantization import backend_for
+    return f"{model_id}|{backend_for(adapter)}|{device}"
+
+
+def load_encoder(model_id: str, adapter: str, device: str = "cpu",
+                 on_evict: Optional[Callable[[], None]] = None) -> Tuple[Any, Any]:
+    """
+    Shared (tokenizer, model) for a HuggingFace encoder, in eval mode on
+    `device`, converted to the adapter's configured inference backend.
+    """
+    def loader():
+        from transformers import AutoTokenizer, AutoModel
+        from .quantization import apply_backend, backend_for
+
+        tokenizer = AutoTokenizer.from_pretrained(model_id)
+        model = AutoModel.from_pretrained(model_id).to(device).eval()
+        return tokenizer, apply_backend(model, backend_for(adapter), model_id)
+
+    return MODEL_REGISTRY.get(encoder_key(model_id, adapter, device), loader, on_evict)
+
+
+def pipeline_key(task: str, model_id: str) -> str:
+    return f"{model_id}|{task}"
+
+
+def load_pipeline(task: str, model_id: str, on_evict: Optional[Callable[[], None]] = None,
+                  **kwargs) -> Any:
+    """Shared transformers pipeline for (task, model id)."""
+    def loader():
+        from transformers import pipeline
+        return pipeline(task, model=model_id, **kwargs)
+
+    return MODEL_REGISTRY.get(pipeline_key(task, model_id), loader, on_evict)
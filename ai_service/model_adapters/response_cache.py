@@ -0,0 +1,158 @@
+"""
+LLM Response Cache
+==================
+
+Content-addressed cache for deterministic LLM prompts (report summaries).
+Re-uploaded or identical reports build the exact same prompt, so the
+answer can be served without another provider round trip or quota spend.
+
+- Key: sha256 over (whitespace-normalized prompt, provider, model,
+  generation params); any change to the prompt template, routing or
+  sampling settings misses naturally.
+- Entries expire after LLM_CACHE_TTL_SECONDS.
+- LLM_CACHE_BACKEND=memory keeps a per-worker LRU bounded to
+  LLM_CACHE_MAX_ENTRIES. LLM_CACHE_BACKEND=session_store shares entries
+  across workers through Redis (bounded by TTL and Redis maxmemory); when
+  Redis is unreachable it falls back to the local LRU.
+- Async callers use `aget` / `aput`, which run the session-store round
+  trip (and a first Redis connect) in a worker thread instead of on the
+  event loop.
+
+Metrics: cache_requests_total{cache="llm_<name>"}.
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from observability.metrics import record_cache
+from serving.session_store import SessionStore
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", 24 * 3600))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1000))
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so formatting-only differences share an entry."""
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache of LLM responses keyed by prompt content.
+
+    Usage:
+        key = cache.key(prompt, provider, model, params)
+        answer = await cache.aget(key)
+        if answer is None:
+            answer = await call_llm()
+            await cache.aput(key, answer)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float = LLM_CACHE_TTL_SECONDS,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        backend: str = LLM_CACHE_BACKEND,
+        store: Optional[SessionStore] = None,
+        enabled: bool = LLM_CACHE_ENABLED
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.backend = backend
+        self.enabled = enabled
+        self._store = store
+        # key -> (response, expires_at)
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(prompt: str, provider: str, model: str, params: Dict[str, Any]) -> str:
+        body = json.dumps(
+            [normalize_prompt(prompt), provider, model, params], sort_keys=True, default=str
+        )
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    @property
+    def _shared(self) -> bool:
+        if self.backend != "session_store":
+            return False
+        if self._store is None:
+            self._store = SessionStore()
+        return self._store.use_redis
+
+    def _store_key(self, key: str) -> str:
+        return f"llmcache:{self.name}:{key}"
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        if self._shared:
+            value = self._store.get(self._store_key(key))
+        else:
+            value = self._get_local(key)
+        record_cache(f"llm_{self.name}", value is not None)
+        return value
+
+    def _get_local(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        if not self.enabled:
+            return
+        if self._shared:
+            self._store.set(self._store_key(key), value, ttl=self.ttl)
+            return
+        with self._lock:
+            self._entries[key] = (value, time.time() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _local_only(self) -> bool:
+        """True when no call can reach Redis, so there is nothing to take off the loop."""
+        return (
+            not self.enabled
+            or self.backend != "session_store"
+            or (self._store is not None and self._store.connected and not self._store.use_redis)
+        )
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get() for async callers."""
+        if self._local_only():
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, value: str) -> None:
+        """put() for async callers."""
+        if self._local_only():
+            self.put(key, value)
+        else:
+            await asyncio.to_thread(self.put, key, value)
+
+    def clear(self) -> None:
+        """Drop the local entries (shared entries expire by TTL)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -15,19 +15,33 @@ biomedical entity representation and is particularly effective for:
 - Medical concept normalization
 - Symptom-disease semantic matching
 - Clinical entity linking
+
+Large concept vocabularies are searched through a persisted ConceptIndex
+(see concept_index.py) instead of embedding the whole pool per query.
 """
 
 import os
 import logging
+import threading
 from typing import List, Dict, Optional, Union
 import numpy as np
 
+from .concept_index import ConceptIndex
+from .embedding_cache import EmbeddingCache
+from .batching import MicroBatcher
+from .tokenization import bucketed_encode
+from .registry import MODEL_REGISTRY, encoder_key, load_encoder, load_pipeline
+from .quantization import backend_for
+
 logger = logging.getLogger(__name__)
 
 # Model configuration
 SAPBERT_MODEL = "acharya-jyu/sapbert-pubmedbert-ddxplus-10k"
 FALLBACK_MODEL = "cambridgeltl/SapBERT-from-PubMedBERT-fulltext"
 
+# Prebuilt concept index used when find_similar_concepts gets no explicit pool
+CONCEPT_INDEX_PATH = os.getenv("CONCEPT_INDEX_PATH", "")
+
 
 class SapBERTDDXPlusAdapter:
     """
@@ -69,9 +83,19 @@ class SapBERTDDXPlusAdapter:
         self.tokenizer = None
         self.pipeline = None
         self._initialized = False
+        self._model_key: Optional[str] = None
         
-        # Medical concept cache for faster lookups
-        self._embedding_cache = {}
+        # Byte-bounded LRU of per-text embeddings (float16, optional disk tier)
+        self._embedding_cache = EmbeddingCache("sapbert_embedding")
+        
+        # Small request-time lookups from concurrent callers share forward passes
+        self._batcher = MicroBatcher(
+            "sapbert_ddxplus", lambda texts: list(self._get_embeddings_local(texts, len(texts)))
+        )
+        
+        # ANN index over a large concept vocabulary (loaded on first use)
+        self.concept_index: Optional[ConceptIndex] = None
+        self._concept_index_checked = False
         
     def initialize(self) -> bool:
         """
@@ -95,18 +119,13 @@ class SapBERTDDXPlusAdapter:
     def _init_local(self) -> bool:
         """Initialize model locally using transformers."""
         try:
-            from transformers import AutoTokenizer, AutoModel
             import torch
             
             logger.info(f"Loading SapBERT model: {SAPBERT_MODEL}")
             
-            self.tokenizer = AutoTokenizer.from_pretrained(SAPBERT_MODEL)
-            self.model = AutoModel.from_pretrained(SAPBERT_MODEL)
-            
             # Move to GPU if available
             self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-            self.model.to(self.device)
-            self.model.eval()
+            self.tokenizer, self.model = self._load_encoder(SAPBERT_MODEL)
             
             self._initialized = True
             logger.info(f"✅ SapBERT loaded successfully on {self.device}")
@@ -117,14 +136,8 @@ class SapBERTDDXPlusAdapter:
             logger.info(f"Trying fallback model: {FALLBACK_MODEL}")
             
             try:
-                from transformers import AutoTokenizer, AutoModel
-                import torch
-                
-                self.tokenizer = AutoTokenizer.from_pretrained(FALLBACK_MODEL)
-                self.model = AutoModel.from_pretrained(FALLBACK_MODEL)
-                self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-                self.model.to(self.device)
-                self.model.eval()
+                # Same weights as SapBERTHelper: shared through the model registry
+                self.tokenizer, self.model = self._load_encoder(FALLBACK_MODEL)
                 
                 self._initialized = True
                 logger.info(f"✅ Fallback SapBERT loaded on {self.device}")
@@ -134,19 +147,27 @@ class SapBERTDDXPlusAdapter:
                 logger.error(f"Failed to load fallback model: {e2}")
                 return False
     
+    def _load_encoder(self, model_id: str):
+        device = str(self.device)
+        encoder = load_encoder(model_id, "sapbert_ddxplus", device, on_evict=self._release_model)
+        self._model_key = encoder_key(model_id, "sapbert_ddxplus", device)
+        # Cached vectors are only valid for the encoder that produced them
+        self._embedding_cache.set_namespace(f"{model_id}|{backend_for('sapbert_ddxplus')}")
+        return encoder
+    
+    def _release_model(self):
+        """Registry eviction callback; initialize() reloads on next use."""
+        self.tokenizer = self.model = None
+        self._initialized = False
+    
     def _init_api(self) -> bool:
         """Initialize using HuggingFace Inference API."""
         try:
-            from transformers import pipeline
-            
             if not self.hf_token:
                 logger.warning("No HF_TOKEN provided for API access")
             
-            self.pipeline = pipeline(
-                "feature-extraction",
-                model=SAPBERT_MODEL,
-                token=self.hf_token
-            )
+            self.pipeline = load_pipeline("feature-extraction", SAPBERT_MODEL, token=self.hf_token)
+            self._embedding_cache.set_namespace(f"{SAPBERT_MODEL}|api")
             
             self._initialized = True
             logger.info("✅ SapBERT API pipeline initialized")
@@ -187,16 +208,16 @@ class SapBERTDDXPlusAdapter:
             uncached_texts = []
             uncached_indices = []
             
-            for i, text in enumerate(texts):
-                if text in self._embedding_cache:
-                    cached_embeddings.append((i, self._embedding_cache[text]))
+            for i, (text, emb) in enumerate(zip(texts, self._embedding_cache.get_many(texts))):
+                if emb is not None:
+                    cached_embeddings.append((i, emb))
                 else:
                     uncached_texts.append(text)
                     uncached_indices.append(i)
             
             if not uncached_texts:
                 # All cached
-                embeddings = np.zeros((len(texts), cached_embeddings[0][1].shape[0]))
+                embeddings = np.zeros((len(texts), cached_embeddings[0][1].shape[0]), dtype=np.float32)
                 for i, emb in cached_embeddings:
                     embeddings[i] = emb
                 return embeddings
@@ -206,19 +227,20 @@ class SapBERTDDXPlusAdapter:
             cached_embeddings = []
         
         # Generate new embeddings
-        if self.use_local:
+        if self.use_local and len(uncached_texts) <= self._batcher.max_batch_size:
+            new_embeddings = np.vstack(self._batcher.run_many(uncached_texts))
+        elif self.use_local:
             new_embeddings = self._get_embeddings_local(uncached_texts, batch_size)
         else:
             new_embeddings = self._get_embeddings_api(uncached_texts)
         
         # Update cache
         if use_cache:
-            for text, emb in zip(uncached_texts, new_embeddings):
-                self._embedding_cache[text] = emb
+            self._embedding_cache.put_many(uncached_texts, new_embeddings)
         
         # Combine cached and new embeddings
         if cached_embeddings:
-            embeddings = np.zeros((len(texts), new_embeddings.shape[1]))
+            embeddings = np.zeros((len(texts), new_embeddings.shape[1]), dtype=np.float32)
             for i, emb in cached_embeddings:
                 embeddings[i] = emb
             for idx, emb in zip(uncached_indices, new_embeddings):
@@ -231,28 +253,21 @@ class SapBERTDDXPlusAdapter:
         """Get embeddings using local model."""
         import torch
         
-        all_embeddings = []
+        MODEL_REGISTRY.touch(self._model_key)
+        # Locals keep the weights alive if the registry evicts them mid-batch
+        tokenizer, model = self.tokenizer, self.model
+        if tokenizer is None or model is None:
+            raise RuntimeError("SapBERT model was evicted")
         
-        for i in range(0, len(texts), batch_size):
-            batch_texts = texts[i:i + batch_size]
-            
-            # Tokenize
-            inputs = self.tokenizer(
-                batch_texts,
-                padding=True,
-                truncation=True,
-                max_length=512,
-                return_tensors="pt"
-            ).to(self.device)
-            
+        def forward(inputs):
             # Get embeddings
             with torch.no_grad():
-                outputs = self.model(**inputs)
+                outputs = model(**inputs.to(self.device))
                 # Use CLS token embedding
-                embeddings = outputs.last_hidden_state[:, 0, :].cpu().numpy()
-                all_embeddings.append(embeddings)
+                return outputs.last_hidden_state[:, 0, :].cpu().numpy()
         
-        return np.vstack(all_embeddings)
+        # Concept strings are short: sort by length and pad per batch
+        return np.vstack(bucketed_encode(tokenizer, texts, forward, batch_size=batch_size))
     
     def _get_embeddings_api(self, texts: List[str]) -> np.ndarray:
         """Get embeddings using HuggingFace API."""
@@ -277,12 +292,22 @@ class SapBERTDDXPlusAdapter:
         
         Args:
             query: Query medical concept
-            concept_pool: Pool of concepts to search (default: common symptoms)
+            concept_pool: Pool of concepts to search (default: the loaded concept
+                index, else common symptoms)
             top_k: Number of top results to return
             
         Returns:
             List of dicts with 'concept' and 'similarity' keys
         """
+        if concept_pool is None and self._get_concept_index() is not None:
+            query_emb = self.get_embeddings(query)
+            if query_emb.size == 0:
+                return []
+            return [
+                {"concept": concept, "similarity": score}
+                for concept, score in self.concept_index.query(query_emb[0], k=top_k)
+            ]
+        
         if concept_pool is None:
             # Default to common symptoms from DDXPlus
             concept_pool = [
@@ -309,6 +334,49 @@ class SapBERTDDXPlusAdapter:
             for i in indices
         ]
     
+    def build_concept_index(
+        self,
+        concepts: List[str],
+        path: Optional[str] = None,
+        batch_size: int = 64,
+        **index_kwargs
+    ) -> ConceptIndex:
+        """
+        Embed a concept vocabulary and build an ANN index over it.
+        
+        Args:
+            concepts: Concept names (symptoms, drug names, UMLS terms, ...)
+            path: Directory to save the index to (optional)
+            batch_size: Embedding batch size
+            **index_kwargs: ConceptIndex options (n_lists, n_probe, pq_subvectors, ...)
+            
+        Returns:
+            The built index, also set as this adapter's concept index
+        """
+        concepts = list(dict.fromkeys(concepts))
+        embeddings = self.get_embeddings(concepts, batch_size=batch_size, use_cache=False)
+        self.concept_index = ConceptIndex(**index_kwargs).build(embeddings, concepts)
+        self._concept_index_checked = True
+        if path:
+            self.concept_index.save(path)
+        return self.concept_index
+    
+    def load_concept_index(self, path: str) -> ConceptIndex:
+        """Load a saved concept index (memory-mapped)."""
+        self.concept_index = ConceptIndex.load(path)
+        self._concept_index_checked = True
+        return self.concept_index
+    
+    def _get_concept_index(self) -> Optional[ConceptIndex]:
+        if not self._concept_index_checked:
+            self._concept_index_checked = True
+            if CONCEPT_INDEX_PATH and os.path.isdir(CONCEPT_INDEX_PATH):
+                try:
+                    self.load_concept_index(CONCEPT_INDEX_PATH)
+                except Exception as e:
+                    logger.warning(f"Could not load concept index {CONCEPT_INDEX_PATH}: {e}")
+        return self.concept_index
+    
     def symptom_disease_similarity(
         self,
         symptoms: List[str],
@@ -421,13 +489,14 @@ class SapBERTDDXPlusAdapter:
         }
     
     def clear_cache(self):
-        """Clear the embedding cache."""
+        """Clear the in-memory embedding cache."""
         self._embedding_cache.clear()
         logger.info("Embedding cache cleared")
 
 
 # Singleton instance for easy access
 _sapbert_instance: Optional[SapBERTDDXPlusAdapter] = None
+_sapbert_lock = threading.Lock()
 
 
 def get_sapbert_adapter(use_local: bool = True) -> SapBERTDDXPlusAdapter:
@@ -443,7 +512,9 @@ def get_sapbert_adapter(use_local: bool = True) -> SapBERTDDXPlusAdapter:
     global _sapbert_instance
     
     if _sapbert_instance is None:
-        _sapbert_instance = SapBERTDDXPlusAdapter(use_local=use_local)
+        with _sapbert_lock:
+            if _sapbert_instance is None:
+                _sapbert_instance = SapBERTDDXPlusAdapter(use_local=use_local)
     
     return _sapbert_instance
 
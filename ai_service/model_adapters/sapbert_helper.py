@@ -7,19 +7,70 @@ Model: cambridgeltl/SapBERT-from-PubMedBERT-fulltext
 
 This model is fine-tuned for medical entity alignment, making it superior for generic
 semantic similarity in the biomedical domain.
+
+Candidate embeddings are computed in padded batches, L2-normalized and persisted
+to an on-disk float32 matrix keyed by model name, inference backend (fp32,
+int8, onnx, or the HF API) and candidate-list hash, then
+memory-mapped on later starts. Build ahead of time with
+`python training/precompute_embeddings.py`. Matching a query is a single
+matrix-vector product against that matrix.
 """
 
 import os
+import re
+import hashlib
 import logging
 import numpy as np
+from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 
+from .batching import MicroBatcher
+from .tokenization import bucketed_encode
+from .quantization import backend_for
+from .registry import MODEL_REGISTRY, encoder_key, load_encoder
+
 logger = logging.getLogger(__name__)
 
 # Model configuration
 MODEL_NAME = "cambridgeltl/SapBERT-from-PubMedBERT-fulltext"
 HF_API_URL = f"https://api-inference.huggingface.co/models/{MODEL_NAME}"
 
+# Where precomputed candidate matrices live
+EMBEDDING_CACHE_DIR = Path(os.getenv(
+    "EMBEDDING_CACHE_DIR",
+    Path(__file__).parent.parent / "knowledge" / "embeddings"
+))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", 64))
+
+
+def _encoder_tag(model_name: str, backend: Optional[str]) -> str:
+    """Filename prefix for one encoder: vectors from different backends never mix."""
+    backend = backend or backend_for("sapbert")
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", f"{model_name}-{backend}")
+
+
+def candidate_cache_path(candidates: List[str], model_name: str = MODEL_NAME,
+                         cache_dir: Path = None, backend: str = None) -> Path:
+    """Path of the persisted matrix for this model + backend + (sorted) candidate list."""
+    digest = hashlib.sha256("\n".join(sorted(candidates)).encode("utf-8")).hexdigest()[:16]
+    return Path(cache_dir or EMBEDDING_CACHE_DIR) / f"{_encoder_tag(model_name, backend)}-{digest}.unit.npy"
+
+
+def similarity_table_path(symptoms: List[str], diseases: List[str], model_name: str = MODEL_NAME,
+                          cache_dir: Path = None, backend: str = None) -> Path:
+    """Path of the persisted symptom x disease cosine table for this model + backend + both lists."""
+    key = "\n".join(sorted(symptoms)) + "\0" + "\n".join(sorted(diseases))
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return Path(cache_dir or EMBEDDING_CACHE_DIR) / f"{_encoder_tag(model_name, backend)}-{digest}.table.npy"
+
+
+def unit_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows as float32 (zero rows stay zero)."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
 class SapBERTHelper:
     """
     Helper to normalize medical terms using SapBERT embeddings.
@@ -30,47 +81,118 @@ class SapBERTHelper:
         self.hf_token = hf_token or os.environ.get("HF_TOKEN")
         self.tokenizer = None
         self.model = None
+        self._model_key: Optional[str] = None
+        
+        # Cached candidates: sorted names and their unit-norm embedding rows
+        self.candidate_names: List[str] = []
+        self.candidate_index: Dict[str, int] = {}
+        self.candidate_matrix: Optional[np.ndarray] = None
+        self._candidate_key: Optional[Path] = None
+        
+        # Canonical diseases and the symptom x disease cosine table (rows follow candidate_names)
+        self.disease_names: List[str] = []
+        self.disease_index: Dict[str, int] = {}
+        self.disease_matrix: Optional[np.ndarray] = None
+        self.similarity_table: Optional[np.ndarray] = None
+        self._table_key: Optional[Path] = None
         
-        # Cache for candidate embeddings
-        self.candidate_embeddings = {}
+        # Coalesces request-time queries from concurrent callers (worker starts on first use)
+        self._batcher = MicroBatcher("sapbert", lambda texts: list(self._encode(texts)))
         
         if not self.use_api:
             self._init_local_model()
             
     def _init_local_model(self):
         try:
-            from transformers import AutoTokenizer, AutoModel
             logger.info(f"Loading {MODEL_NAME} locally...")
-            self.tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-            self.model = AutoModel.from_pretrained(MODEL_NAME)
+            # Shared with any other adapter using the same weights and backend
+            self.tokenizer, self.model = load_encoder(MODEL_NAME, "sapbert", on_evict=self._release_model)
+            self._model_key = encoder_key(MODEL_NAME, "sapbert")
             logger.info("✅ SapBERT loaded successfully")
         except Exception as e:
             logger.warning(f"SapBERT local load failed: {e}. Switching to API/Fallback.")
             self.use_api = True
 
+    @property
+    def backend(self) -> str:
+        """Encoder that produces this helper's vectors, for keying persisted matrices."""
+        return "api" if self.use_api else backend_for("sapbert")
+
+    def _release_model(self):
+        """Registry eviction callback; the model reloads on next use."""
+        self.tokenizer = self.model = None
+
+    def _backend_ready(self) -> bool:
+        if not self.use_api and self.model is None and self._model_key:
+            self._init_local_model()
+        return bool((self.use_api and self.hf_token) or (self.model and self.tokenizer))
+
     def get_embedding(self, text: str) -> Optional[np.ndarray]:
         """Get embedding for a single text string."""
-        if self.use_api and self.hf_token:
-            return self._get_embedding_api(text)
-        
-        if self.model and self.tokenizer:
-            return self._get_embedding_local(text)
-            
-        return None
+        embeddings = self.embed_queries([text])
+        return None if embeddings is None else embeddings[0]
 
-    def _get_embedding_local(self, text: str) -> Optional[np.ndarray]:
+    def embed_queries(self, texts: List[str]) -> Optional[np.ndarray]:
+        """
+        Embed a few request-time texts.
+        
+        Local inference goes through the shared micro-batcher, so queries from
+        concurrent requests share forward passes.
+        
+        Returns:
+            float32 array [len(texts), dim], or None if no backend is available
+        """
+        if not texts or not self._backend_ready():
+            return None
+        if self.use_api:
+            return self._encode(texts)
         try:
-            import torch
-            inputs = self.tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=128)
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                # SapBERT uses CLS token as the representation
-                cls_embedding = outputs.last_hidden_state[:, 0, :].numpy()
-                return cls_embedding.flatten()
+            return np.vstack(self._batcher.run_many(texts))
         except Exception as e:
             logger.error(f"Local embedding failed: {e}")
             return None
 
+    def embed_batch(self, texts: List[str], batch_size: int = EMBED_BATCH_SIZE) -> Optional[np.ndarray]:
+        """
+        Embed many texts (bulk/precompute), one padded forward pass per
+        length-bucketed batch.
+        
+        Returns:
+            float32 array [len(texts), dim], or None if no backend is available
+        """
+        if not texts or not self._backend_ready():
+            return None
+        try:
+            return self._encode(texts, batch_size=batch_size)
+        except Exception as e:
+            logger.error(f"Batch embedding failed: {e}")
+            return None
+
+    def _encode(self, texts: List[str], batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
+        """Forward passes (or API calls) for a list of texts -> [n, dim] float32, in input order."""
+        if self.use_api:
+            rows = [self._get_embedding_api(t) for t in texts]
+            if any(r is None for r in rows):
+                raise RuntimeError("SapBERT API embedding failed")
+            return np.vstack(rows).astype(np.float32)
+        
+        import torch
+        
+        MODEL_REGISTRY.touch(self._model_key)
+        # Locals keep the weights alive if the registry evicts them mid-batch
+        tokenizer, model = self.tokenizer, self.model
+        if tokenizer is None or model is None:
+            raise RuntimeError("SapBERT model was evicted")
+        
+        def forward(inputs):
+            with torch.no_grad():
+                outputs = model(**inputs)
+            # SapBERT uses CLS token as the representation
+            return outputs.last_hidden_state[:, 0, :].numpy()
+        
+        rows = bucketed_encode(tokenizer, texts, forward, batch_size=batch_size)
+        return np.vstack(rows).astype(np.float32)
+
     def _get_embedding_api(self, text: str) -> Optional[np.ndarray]:
         try:
             import requests
@@ -99,52 +221,225 @@ class SapBERTHelper:
             logger.error(f"API embedding failed: {e}")
             return None
 
-    def cache_candidates(self, candidates: List[str]):
-        """Pre-compute embeddings for a list of candidate symptoms."""
-        self.candidate_embeddings = {}
-        for cand in candidates:
-            emb = self.get_embedding(cand)
-            if emb is not None:
-                self.candidate_embeddings[cand] = emb
+    def cache_candidates(self, candidates: List[str], batch_size: int = EMBED_BATCH_SIZE,
+                         persist: bool = True):
+        """
+        Pre-compute embeddings for a list of candidate symptoms.
+        
+        Loads the persisted unit-norm matrix (memory-mapped) when one exists
+        for this model and candidate list; otherwise embeds in batches,
+        normalizes and saves it.
+        """
+        names = sorted(set(candidates))
+        path = candidate_cache_path(names, backend=self.backend)
+        matrix = self._load_or_embed(names, path, batch_size, persist)
+        if matrix is None:
+            return
+        
+        self.candidate_names = names
+        self.candidate_matrix = matrix
+        self.candidate_index = {name: i for i, name in enumerate(names)}
+        self._candidate_key = path
+    
+    def ensure_candidates(self, candidates: List[str]):
+        """Cache candidates unless this exact candidate list is already loaded."""
+        if self._candidate_key != candidate_cache_path(sorted(set(candidates)), backend=self.backend):
+            self.cache_candidates(candidates)
+    
+    def _load_or_embed(self, names: List[str], path: Path, batch_size: int,
+                       persist: bool) -> Optional[np.ndarray]:
+        """Memory-map a persisted unit-norm matrix for `names`, or embed and save one."""
+        if persist and path.exists():
+            try:
+                matrix = np.load(path, mmap_mode="r")
+                if matrix.shape[0] == len(names):
+                    logger.info(f"Loaded {len(names)} embeddings from {path.name}")
+                    return matrix
+            except Exception as e:
+                logger.warning(f"Could not load embedding cache {path}: {e}")
+        
+        matrix = self.embed_batch(names, batch_size=batch_size)
+        if matrix is None:
+            return None
+        matrix = unit_rows(matrix)
+        if persist:
+            self._save_matrix(path, matrix)
+        return matrix
+    
+    def cache_similarity_table(self, symptoms: List[str], diseases: List[str],
+                               batch_size: int = EMBED_BATCH_SIZE, persist: bool = True):
+        """
+        Pre-compute canonical disease embeddings and the symptom x disease
+        cosine table, so re-ranking known symptoms needs no forward pass.
+        
+        Symptom rows come from the candidate matrix (cached first if needed);
+        both the disease matrix and the table are persisted next to it.
+        """
+        self.ensure_candidates(symptoms)
+        if self.candidate_matrix is None:
+            return
+        
+        names = sorted(set(diseases))
+        matrix = self._load_or_embed(names, candidate_cache_path(names, backend=self.backend), batch_size, persist)
+        if matrix is None:
+            return
+        
+        path = similarity_table_path(self.candidate_names, names, backend=self.backend)
+        table = None
+        if persist and path.exists():
+            try:
+                table = np.load(path, mmap_mode="r")
+                if table.shape != (len(self.candidate_names), len(names)):
+                    table = None
+            except Exception as e:
+                logger.warning(f"Could not load similarity table {path}: {e}")
+        if table is None:
+            table = np.asarray(self.candidate_matrix) @ np.asarray(matrix).T
+            if persist:
+                self._save_matrix(path, table)
+        
+        self.disease_names = names
+        self.disease_matrix = matrix
+        self.disease_index = {name: i for i, name in enumerate(names)}
+        self.similarity_table = table
+        self._table_key = path
+    
+    def ensure_similarity_table(self, symptoms: List[str], diseases: List[str]):
+        """Build/load the table unless it is already loaded for these lists."""
+        if self._table_key != similarity_table_path(sorted(set(symptoms)), sorted(set(diseases)), backend=self.backend):
+            self.cache_similarity_table(symptoms, diseases)
+    
+    def _unit_vectors(self, texts: List[str], index: Dict[str, int],
+                      matrix: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """Unit rows for texts: cached rows where known, one embedding batch for the rest."""
+        rows = [index.get(t) if matrix is not None else None for t in texts]
+        missing = [t for t, r in zip(texts, rows) if r is None]
+        extra = {}
+        if missing:
+            embedded = self.embed_queries(missing)
+            if embedded is None:
+                return None
+            extra = dict(zip(missing, unit_rows(embedded)))
+        return np.vstack([
+            matrix[r] if r is not None else extra[t]
+            for t, r in zip(texts, rows)
+        ])
+    
+    def encode_differential_diagnosis(self, patient_symptoms: List[str],
+                                      candidate_diseases: List[str]) -> List[Dict]:
+        """
+        Rank candidate diseases by cosine similarity to the mean symptom vector.
+        
+        When every symptom and disease is canonical this is a lookup in the
+        precomputed table: cos(mean(s), d) = mean(cos(s, d)) / |mean(s)| for
+        unit s and d. Anything else is embedded on the fly.
+        
+        Returns:
+            [{"disease", "score"}] best first
+        """
+        if not patient_symptoms or not candidate_diseases:
+            return []
+        
+        s_rows = [self.candidate_index.get(s) for s in patient_symptoms]
+        d_rows = [self.disease_index.get(d) for d in candidate_diseases]
+        if (self.similarity_table is not None
+                and None not in s_rows and None not in d_rows):
+            profile = np.asarray(self.candidate_matrix[s_rows]).mean(axis=0)
+            pair_scores = np.asarray(self.similarity_table[np.ix_(s_rows, d_rows)])
+            scores = pair_scores.mean(axis=0) / max(float(np.linalg.norm(profile)), 1e-12)
+        else:
+            symptoms = self._unit_vectors(patient_symptoms, self.candidate_index, self.candidate_matrix)
+            diseases = self._unit_vectors(candidate_diseases, self.disease_index, self.disease_matrix)
+            if symptoms is None or diseases is None:
+                return []
+            scores = diseases @ unit_rows(symptoms.mean(axis=0))
+        
+        ranked = sorted(zip(candidate_diseases, scores), key=lambda x: x[1], reverse=True)
+        return [{"disease": disease, "score": float(score)} for disease, score in ranked]
+    
+    @staticmethod
+    def _save_matrix(path: Path, matrix: np.ndarray):
+        """Write atomically so concurrent workers never read a partial file."""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, np.ascontiguousarray(matrix, dtype=np.float32))
+            os.replace(tmp, path)
+            logger.info(f"Saved embeddings to {path}")
+        except Exception as e:
+            logger.warning(f"Could not persist candidate embeddings: {e}")
+    
+    def _candidate_set(self, candidates: List[str] = None) -> Tuple[List[str], Optional[np.ndarray]]:
+        """Names and unit-norm matrix to search: the cache, or an explicit list."""
+        if not candidates:
+            return self.candidate_names, self.candidate_matrix
+        
+        rows = [self.candidate_index.get(c) for c in candidates]
+        missing = [c for c, r in zip(candidates, rows) if r is None]
+        extra = {}
+        if missing:
+            # Uncached candidates are embedded together in one batch
+            embedded = self.embed_queries(missing)
+            if embedded is not None:
+                extra = dict(zip(missing, unit_rows(embedded)))
+        
+        names, vectors = [], []
+        for c, r in zip(candidates, rows):
+            if r is not None:
+                names.append(c)
+                vectors.append(self.candidate_matrix[r])
+            elif c in extra:
+                names.append(c)
+                vectors.append(extra[c])
+        if not vectors:
+            return [], None
+        return names, np.vstack(vectors)
+    
+    def normalize_batch(self, texts: List[str], candidates: List[str] = None,
+                        threshold: float = 0.65) -> List[Optional[str]]:
+        """
+        Find the best matching candidate for each text.
+        
+        All texts are embedded in one batch and scored with a single matrix
+        product against the candidate matrix.
+        
+        Returns:
+            One canonical name (or None below threshold) per input text
+        """
+        if not texts:
+            return []
+        names, matrix = self._candidate_set(candidates)
+        queries = self.embed_queries(list(texts))
+        if matrix is None or queries is None:
+            return [None] * len(texts)
+        
+        scores = unit_rows(queries) @ matrix.T
+        best = scores.argmax(axis=1)
+        return [
+            names[j] if scores[i, j] >= threshold else None
+            for i, j in enumerate(best)
+        ]
+    
+    def top_k(self, text: str, k: int = 5, candidates: List[str] = None) -> List[Tuple[str, float]]:
+        """Top-k candidates by cosine similarity, best first."""
+        names, matrix = self._candidate_set(candidates)
+        query = self.get_embedding(text)
+        if matrix is None or query is None:
+            return []
+        
+        scores = matrix @ unit_rows(query)
+        k = min(k, len(names))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(names[j], float(scores[j])) for j in top]
     
     def normalize(self, text: str, candidates: List[str] = None, threshold: float = 0.65) -> Optional[str]:
         """
         Find best matching candidate for the input text.
         If candidates provided, uses them. Otherwise uses cached candidates.
         """
-        query_emb = self.get_embedding(text)
-        if query_emb is None:
-            return None
-        
-        best_score = -1
-        best_cand = None
-        
-        # Determine which set of candidates to check
-        # If candidates are passed, we might fallback to computing them on fly or checking cache
-        # For efficiency, assume candidates are usually the cached ones.
-        target_map = self.candidate_embeddings
-        if candidates:
-            # If candidates provided are different from cache, compute specifically
-            # This is slow if list is long. Ideally rely on cache.
-            # Check if we have them in cache
-            target_map = {}
-            for c in candidates:
-                if c in self.candidate_embeddings:
-                     target_map[c] = self.candidate_embeddings[c]
-                else:
-                     # Compute on fly (slow)
-                     emb = self.get_embedding(c)
-                     if emb is not None:
-                         target_map[c] = emb
-
-        for cand, cand_emb in target_map.items():
-            # Cosine similarity
-            score = np.dot(query_emb, cand_emb) / (np.linalg.norm(query_emb) * np.linalg.norm(cand_emb))
-            if score > best_score:
-                best_score = score
-                best_cand = cand
-        
-        if best_score >= threshold:
-            return best_cand
-        
+        matches = self.top_k(text, k=1, candidates=candidates)
+        if matches and matches[0][1] >= threshold:
+            return matches[0][0]
         return None
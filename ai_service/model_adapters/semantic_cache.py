@@ -0,0 +1,183 @@
+"""
+Semantic Chat Cache
+===================
+
+Opt-in (CHAT_SEMANTIC_CACHE=true) answer cache for /ai/chat. Patients ask
+the same few questions ("is this contagious?", "should I go to the ER?")
+in many phrasings; a near-duplicate question asked in the same coarse
+clinical context gets the stored, already safety-filtered reply instead of
+a new LLM call.
+
+- Questions are embedded with the SapBERT adapter (unit vectors, cosine).
+- Entries are partitioned by a context key (provider, top condition,
+  red-flag state, observed symptoms), so an answer given for one clinical
+  picture is never served for another. The chat prompt quotes the
+  patient's symptoms, so replies are only shared between sessions that
+  report the same set. Only same-context entries are compared.
+- A hit needs cosine >= CHAT_CACHE_THRESHOLD.
+- Entries expire after CHAT_CACHE_TTL_SECONDS. The table holds at most
+  CHAT_CACHE_MAX_ENTRIES; when full, an expired slot is reused, otherwise
+  the least recently used one. A context is forgotten when its last slot
+  is reused, so the context map never outgrows the slot table.
+
+The index is an exact (flat) scan over a fixed slot table: at a few
+thousand entries one matrix-vector product is well under a millisecond,
+and slots can be replaced in place, which the build-once IVF ConceptIndex
+does not support.
+
+Metrics: cache_requests_total{cache="chat_semantic"}.
+"""
+
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from observability.metrics import record_cache
+
+CHAT_SEMANTIC_CACHE = os.getenv("CHAT_SEMANTIC_CACHE", "false").lower() == "true"
+CHAT_CACHE_THRESHOLD = float(os.getenv("CHAT_CACHE_THRESHOLD", 0.92))
+CHAT_CACHE_TTL_SECONDS = float(os.getenv("CHAT_CACHE_TTL_SECONDS", 6 * 3600))
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", 2000))
+
+
+def chat_context_key(session_state: Dict[str, Any], provider: str = "auto") -> str:
+    """
+    Context a cached answer is valid for: requested provider, the top-ranked
+    condition, whether any red flag has fired, and the observed symptoms
+    (order-insensitive), which the chat prompt shows the model.
+    """
+    probabilities = session_state.get("probabilities") or []
+    top = probabilities[0].get("disease", "") if probabilities else ""
+    red_flag = "red_flag" if session_state.get("red_flags") else "no_red_flag"
+    symptoms = ",".join(sorted({s.lower() for s in session_state.get("observed_symptoms") or []}))
+    return f"{provider}|{top.lower()}|{red_flag}|{symptoms}"
+
+
+def _normalize_question(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class SemanticChatCache:
+    """
+    Near-duplicate question -> reply cache.
+
+    Usage:
+        cache = SemanticChatCache(embed=lambda texts: sapbert.embed_queries(texts))
+        hit = cache.lookup(message, context)      # (reply, similarity) or None
+        ...
+        cache.store(message, context, safe_reply)
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[List[str]], Optional[np.ndarray]],
+        threshold: float = CHAT_CACHE_THRESHOLD,
+        ttl: float = CHAT_CACHE_TTL_SECONDS,
+        max_entries: int = CHAT_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.embed = embed
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        # context key <-> small int id stored per slot
+        self._contexts: Dict[str, int] = {}
+        self._context_names: Dict[int, str] = {}
+        self._next_context_id = 0
+        # Slot table, allocated on the first store (dim comes from the encoder)
+        self._vectors: Optional[np.ndarray] = None
+        self._context_ids = np.full(max_entries, -1, dtype=np.int32)
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._replies: List[Optional[str]] = [None] * max_entries
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero((self._context_ids >= 0) & (self._expires > self.clock())))
+
+    def _embed_one(self, text: str) -> Optional[np.ndarray]:
+        vectors = self.embed([_normalize_question(text)])
+        if vectors is None or len(vectors) == 0:
+            return None
+        vector = np.asarray(vectors[0], dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def lookup(self, message: str, context: str) -> Optional[Tuple[str, float]]:
+        """Stored reply for a near-duplicate question in the same context, if any."""
+        context_id = self._contexts.get(context)
+        if context_id is None or self._vectors is None:
+            record_cache("chat_semantic", False)
+            return None
+        query = self._embed_one(message)
+        if query is None:
+            return None
+
+        now = self.clock()
+        with self._lock:
+            slots = np.flatnonzero((self._context_ids == context_id) & (self._expires > now))
+            if slots.size == 0:
+                hit = None
+            else:
+                similarities = self._vectors[slots] @ query
+                best = int(np.argmax(similarities))
+                similarity = float(similarities[best])
+                if similarity >= self.threshold:
+                    slot = slots[best]
+                    self._last_used[slot] = now
+                    hit = (self._replies[slot], similarity)
+                else:
+                    hit = None
+        record_cache("chat_semantic", hit is not None)
+        return hit
+
+    def store(self, message: str, context: str, reply: str) -> bool:
+        """Remember a (safety-filtered) reply. Returns False if nothing was stored."""
+        vector = self._embed_one(message)
+        if vector is None:
+            return False
+        now = self.clock()
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            slot = self._free_slot(now)
+            self._release_slot(slot)
+            context_id = self._context_id(context)
+            self._vectors[slot] = vector
+            self._context_ids[slot] = context_id
+            self._expires[slot] = now + self.ttl
+            self._last_used[slot] = now
+            self._replies[slot] = reply
+        return True
+
+    def _free_slot(self, now: float) -> int:
+        """An empty or expired slot, else the least recently used one."""
+        free = np.flatnonzero((self._context_ids < 0) | (self._expires <= now))
+        if free.size:
+            return int(free[0])
+        return int(np.argmin(self._last_used))
+
+    def _release_slot(self, slot: int) -> None:
+        """Empty a slot, dropping its context if no other slot uses it."""
+        old = int(self._context_ids[slot])
+        self._context_ids[slot] = -1
+        if old >= 0 and not np.any(self._context_ids == old):
+            del self._contexts[self._context_names.pop(old)]
+
+    def _context_id(self, context: str) -> int:
+        context_id = self._contexts.get(context)
+        if context_id is None:
+            context_id = self._contexts[context] = self._next_context_id
+            self._context_names[context_id] = context
+            self._next_context_id += 1
+        return context_id
+
+    def clear(self) -> None:
+        with self._lock:
+            self._contexts.clear()
+            self._context_names.clear()
+            self._context_ids[:] = -1
+            self._replies = [None] * self.max_entries
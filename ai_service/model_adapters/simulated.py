@@ -0,0 +1,201 @@
+"""
+Simulated LLM Provider
+======================
+
+Offline stand-in for the Gemini / OpenRouter adapters, for load tests,
+latency benchmarks and tests of ModelSelector routing, hedging, caching
+and circuit breakers without network access or API keys.
+
+Enable with LLM_SIMULATED=true: both remote adapters are replaced by
+simulated ones (USE_GEMINI / USE_OPENROUTER still decide which are used).
+
+Each call:
+- waits a time-to-first-token drawn from the latency distribution
+  (fixed, or lognormal given a median and p95),
+- fails with a 429 (RateLimitError) or a 5xx (SimulatedServerError) at the
+  configured rates, or with a 429 once the simulated requests-per-minute
+  quota is spent,
+- otherwise answers with a deterministic, safety-clean text of
+  `response_tokens` words, streamed at `tokens_per_second`.
+
+Rate-limit headers a real provider would send are exposed on
+`last_headers`. Latencies and failures come from a seeded RNG, so a run
+is reproducible for a given seed and call order.
+
+Settings are read from LLM_SIM_<KEY>, overridable per provider with
+LLM_SIM_<PROVIDER>_<KEY> (e.g. LLM_SIM_GEMINI_LATENCY_MEDIAN_MS=4000 for
+a slow primary that triggers hedging).
+"""
+
+import os
+import math
+import time
+import random
+import asyncio
+import hashlib
+from collections import deque
+from typing import AsyncIterator, Callable, Dict, Optional
+
+from serving.rate_limit import PROVIDER_LIMITS, RateLimited
+from .model_selector import BaseModelAdapter, RateLimitError
+
+# Benign filler for simulated answers (nothing here trips safety_filter)
+_WORDS = (
+    "the results show values within the expected range while some markers "
+    "are slightly outside it and should be reviewed with a healthcare "
+    "professional at the next visit"
+).split()
+
+# z-score of the 95th percentile of a standard normal
+_Z95 = 1.6449
+
+
+class SimulatedServerError(Exception):
+    """Simulated 5xx from the provider."""
+
+    def __init__(self, provider: str, status: int = 503):
+        super().__init__(f"{provider}: HTTP {status} (simulated)")
+        self.status = status
+
+
+def _setting(provider: str, key: str, default: str) -> str:
+    return os.getenv(f"LLM_SIM_{provider.upper()}_{key}", os.getenv(f"LLM_SIM_{key}", default))
+
+
+class SimulatedModelAdapter(BaseModelAdapter):
+    """
+    Simulated remote LLM.
+
+    Usage:
+        adapter = SimulatedModelAdapter("gemini", latency_median=0.8, latency_p95=2.5, seed=1)
+        text = await adapter.generate(prompt)
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        latency: str = "lognormal",
+        latency_median: float = 0.8,
+        latency_p95: float = 2.5,
+        tokens_per_second: float = 50.0,
+        response_tokens: int = 120,
+        rate_429: float = 0.0,
+        rate_5xx: float = 0.0,
+        rpm: int = 0,
+        seed: Optional[int] = 0,
+        provider_limits: bool = True,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if latency not in ("fixed", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {latency}")
+        self.provider = provider
+        self.model_name = f"simulated-{provider}"
+        self.latency = latency
+        self.latency_median = latency_median
+        self.latency_p95 = max(latency_p95, latency_median)
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.rpm = rpm
+        self.provider_limits = provider_limits
+        self.clock = clock
+        self.last_headers: Dict[str, str] = {}
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._window: deque = deque()
+
+    @classmethod
+    def from_env(cls, provider: str) -> "SimulatedModelAdapter":
+        # An empty LLM_SIM_SEED opts into an unseeded (non-reproducible) run
+        seed = _setting(provider, "SEED", "0")
+        return cls(
+            provider,
+            latency=_setting(provider, "LATENCY", "lognormal"),
+            latency_median=float(_setting(provider, "LATENCY_MEDIAN_MS", "800")) / 1000,
+            latency_p95=float(_setting(provider, "LATENCY_P95_MS", "2500")) / 1000,
+            tokens_per_second=float(_setting(provider, "TOKENS_PER_SECOND", "50")),
+            response_tokens=int(_setting(provider, "RESPONSE_TOKENS", "120")),
+            rate_429=float(_setting(provider, "RATE_429", "0")),
+            rate_5xx=float(_setting(provider, "RATE_5XX", "0")),
+            rpm=int(_setting(provider, "RPM", "0")),
+            seed=int(seed) if seed else None,
+        )
+
+    def is_available(self) -> bool:
+        return True
+
+    def sample_latency(self) -> float:
+        """Time to first token (seconds) for the next call."""
+        if self.latency == "fixed" or self.latency_p95 <= self.latency_median:
+            return self.latency_median
+        sigma = math.log(self.latency_p95 / self.latency_median) / _Z95
+        return self._rng.lognormvariate(math.log(self.latency_median), sigma)
+
+    def response_text(self, prompt: str) -> str:
+        """Deterministic answer for a prompt."""
+        offset = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+        words = [_WORDS[(offset + i) % len(_WORDS)] for i in range(self.response_tokens)]
+        return f"Simulated {self.provider} summary: " + " ".join(words) + "."
+
+    def _check_quota(self) -> None:
+        """Apply the simulated per-minute quota and set the rate-limit headers."""
+        now = self.clock()
+        while self._window and self._window[0] <= now - 60:
+            self._window.popleft()
+        if not self.rpm:
+            self.last_headers = {}
+            return
+        reset = self._window[0] + 60 - now if self._window else 60.0
+        if len(self._window) >= self.rpm:
+            self.last_headers = {
+                "x-ratelimit-limit-requests": str(self.rpm),
+                "x-ratelimit-remaining-requests": "0",
+                "x-ratelimit-reset-requests": f"{reset:.1f}s",
+                "retry-after": str(math.ceil(reset)),
+            }
+            raise RateLimitError(f"{self.provider} rate limit exceeded (simulated, retry after {reset:.1f}s)")
+        self._window.append(now)
+        self.last_headers = {
+            "x-ratelimit-limit-requests": str(self.rpm),
+            "x-ratelimit-remaining-requests": str(self.rpm - len(self._window)),
+            "x-ratelimit-reset-requests": f"{reset:.1f}s",
+        }
+
+    async def _start(self) -> None:
+        """Everything before the first token: quotas, latency, injected failures."""
+        self.calls += 1
+        if self.provider_limits:
+            try:
+                await PROVIDER_LIMITS.acquire(self.provider)
+            except RateLimited as e:
+                raise RateLimitError(str(e))
+
+        # Draw from the RNG in a fixed order so runs replay exactly
+        latency = self.sample_latency()
+        roll = self._rng.random()
+        self._check_quota()
+        if roll < self.rate_429:
+            # Throttled requests come back fast
+            await asyncio.sleep(latency * 0.1)
+            self.last_headers = {**self.last_headers, "retry-after": "1"}
+            raise RateLimitError(f"{self.provider} rate limit exceeded (simulated)")
+        await asyncio.sleep(latency)
+        if roll < self.rate_429 + self.rate_5xx:
+            raise SimulatedServerError(self.provider, status=503)
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        await self._start()
+        text = self.response_text(prompt)
+        if self.tokens_per_second > 0:
+            await asyncio.sleep(self.response_tokens / self.tokens_per_second)
+        return text
+
+    async def stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        await self._start()
+        first, *rest = self.response_text(prompt).split(" ")
+        yield first
+        for word in rest:
+            if self.tokens_per_second > 0:
+                await asyncio.sleep(1 / self.tokens_per_second)
+            yield " " + word
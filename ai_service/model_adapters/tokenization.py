@@ -0,0 +1,58 @@
+"""
+Length-Bucketed Tokenization
+============================
+
+Embedding inputs are mostly 1-6 word symptom or drug phrases. Padding an
+arbitrary batch to its longest item (or to max_length=512) wastes most of
+the forward pass, since attention cost grows with the square of padded length.
+
+`bucketed_encode` tokenizes once, sorts inputs by token length, pads each
+batch only to its own longest item, and returns results in input order.
+
+Configuration:
+- CONCEPT_MAX_LENGTH: truncation length for concept strings (symptoms, drug
+  names, short user phrases) used by the SapBERT adapters
+"""
+
+import os
+from typing import Any, Callable, List, Sequence
+
+CONCEPT_MAX_LENGTH = int(os.getenv("CONCEPT_MAX_LENGTH", 32))
+
+
+def bucketed_encode(
+    tokenizer,
+    texts: Sequence[str],
+    forward: Callable[[Any], Sequence[Any]],
+    batch_size: int = 64,
+    max_length: int = CONCEPT_MAX_LENGTH
+) -> List[Any]:
+    """
+    Run `forward` over length-sorted, per-batch padded inputs.
+
+    Args:
+        tokenizer: HuggingFace tokenizer
+        texts: Input strings
+        forward: Takes a padded BatchEncoding (torch tensors), returns one row per item
+        batch_size: Max items per forward pass
+        max_length: Truncation length in tokens
+
+    Returns:
+        One row per input text, in the original order
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+
+    encoded = tokenizer(texts, truncation=True, max_length=max_length)
+    keys = list(encoded.keys())
+    order = sorted(range(len(texts)), key=lambda i: len(encoded["input_ids"][i]))
+
+    results: List[Any] = [None] * len(texts)
+    for start in range(0, len(order), batch_size):
+        indices = order[start:start + batch_size]
+        features = [{key: encoded[key][i] for key in keys} for i in indices]
+        batch = tokenizer.pad(features, padding=True, return_tensors="pt")
+        for i, row in zip(indices, forward(batch)):
+            results[i] = row
+    return results
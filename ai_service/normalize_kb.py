@@ -57,19 +57,20 @@ def normalize_kb():
     mapping = {}
     
     print("Normalizing symptoms...")
-    for sym in tqdm(unique_symptoms):
-        # 1. Check direct match
+    # 1. Direct matches
+    to_match = []
+    for sym in unique_symptoms:
         if sym in CANONICAL_TARGETS:
             mapping[sym] = sym
-            continue
-            
-        # 2. SapBERT match
-        normalized = sapbert.normalize(sym, candidates=None, threshold=0.7) # Use cached targets
-        
-        if normalized:
-            mapping[sym] = normalized
         else:
-            mapping[sym] = sym # Keep original if no match
+            to_match.append(sym)
+    
+    # 2. SapBERT match, in batches against the cached targets
+    batch_size = 256
+    for i in tqdm(range(0, len(to_match), batch_size)):
+        batch = to_match[i:i + batch_size]
+        for sym, normalized in zip(batch, sapbert.normalize_batch(batch, threshold=0.7)):
+            mapping[sym] = normalized or sym  # Keep original if no match
             
     # Apply mapping
     print("Applying mapping...")
@@ -0,0 +1,14 @@
+# Observability Package
+"""
+Metrics and diagnostics for the AI service.
+"""
+
+from .metrics import REGISTRY, MetricsRegistry, Counter, Gauge, Histogram
+
+__all__ = [
+    "REGISTRY",
+    "MetricsRegistry",
+    "Counter",
+    "Gauge",
+    "Histogram"
+]
@@ -0,0 +1,357 @@
+"""
+Metrics Registry
+
+Minimal Prometheus-compatible metrics (counters, gauges, histograms) with
+no external dependency. Observations are a dict lookup plus a lock, cheap
+enough to leave on in production.
+
+Exposed in text exposition format by the `/metrics` endpoint.
+
+Usage:
+    from observability.metrics import ENGINE_PHASE_SECONDS
+
+    with ENGINE_PHASE_SECONDS.time(phase="posterior"):
+        ...
+"""
+
+import math
+import time
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Latency buckets (seconds) tuned for 1 ms .. 60 s
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    """Common label handling for all metric types."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_str(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_str(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations (cumulative on render)."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of a block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def timed(self, **labels):
+        """Decorator form of `time()`."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def get_count(self, **labels) -> float:
+        series = self._values.get(self._key(labels))
+        return series[-1] if series else 0.0
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            for key, series in sorted(self._values.items()):
+                cumulative = 0.0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(
+                        f"{self.name}_bucket{_label_str(self.labelnames, key, le)} {_format_value(cumulative)}"
+                    )
+                labels = _label_str(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+                lines.append(f"{self.name}_count{labels} {_format_value(series[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callback that refreshes gauges just before rendering."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception:
+                pass
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ===== HTTP =====
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route",
+    ["method", "route", "status"]
+)
+
+# ===== TRIAGE ENGINE =====
+ENGINE_PHASE_SECONDS = REGISTRY.histogram(
+    "engine_phase_seconds",
+    "Symptom engine phase latency (extraction, sapbert_fallback, posterior, ig_selection)",
+    ["phase"]
+)
+
+# ===== OCR =====
+OCR_PAGE_SECONDS = REGISTRY.histogram(
+    "ocr_page_seconds", "OCR time per page or image", ["engine"]
+)
+
+# ===== LLM PROVIDERS =====
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "llm_request_seconds", "LLM provider call latency", ["provider"]
+)
+LLM_REQUESTS_TOTAL = REGISTRY.counter(
+    "llm_requests_total", "LLM provider calls by outcome (ok, rate_limited, error)",
+    ["provider", "outcome"]
+)
+LLM_TIME_TO_FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    "llm_time_to_first_token_seconds", "Time until a streamed LLM response sends its first chunk",
+    ["provider"]
+)
+LLM_RATE_LIMIT_WAIT_SECONDS = REGISTRY.histogram(
+    "llm_rate_limit_wait_seconds", "Time spent waiting for a provider rate-limit token", ["provider"]
+)
+LLM_RATE_LIMITED_TOTAL = REGISTRY.counter(
+    "llm_rate_limited_total", "Provider calls refused locally because the quota was exhausted",
+    ["provider"]
+)
+LLM_BREAKER_STATE = REGISTRY.gauge(
+    "llm_breaker_state", "Provider circuit breaker state (0 closed, 1 half-open, 2 open)",
+    ["provider"]
+)
+LLM_BREAKER_TRANSITIONS_TOTAL = REGISTRY.counter(
+    "llm_breaker_transitions_total", "Circuit breaker state changes by new state",
+    ["provider", "state"]
+)
+LLM_PROVIDER_HEALTH = REGISTRY.gauge(
+    "llm_provider_health", "Provider health score used to order auto-mode calls (0-1)",
+    ["provider"]
+)
+
+# ===== CACHES =====
+CACHE_REQUESTS_TOTAL = REGISTRY.counter(
+    "cache_requests_total", "Cache lookups by result (hit, disk_hit, miss)", ["cache", "result"]
+)
+EMBEDDING_CACHE_BYTES = REGISTRY.gauge(
+    "embedding_cache_bytes", "Approximate memory held by an embedding cache", ["cache"]
+)
+EMBEDDING_CACHE_ENTRIES = REGISTRY.gauge(
+    "embedding_cache_entries", "Vectors held in an embedding cache's memory tier", ["cache"]
+)
+EMBEDDING_CACHE_EVICTIONS_TOTAL = REGISTRY.counter(
+    "embedding_cache_evictions_total", "Embedding cache LRU evictions", ["cache"]
+)
+
+# ===== SINGLEFLIGHT =====
+SINGLEFLIGHT_REQUESTS_TOTAL = REGISTRY.counter(
+    "singleflight_requests_total",
+    "Coalesced calls by role (leader ran the work, shared joined it)", ["flight", "role"]
+)
+
+# ===== SESSION STORE =====
+SESSION_STORE_SECONDS = REGISTRY.histogram(
+    "session_store_seconds", "Session store round-trip time", ["op", "backend"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+)
+
+# ===== ADMISSION CONTROL =====
+ADMISSION_RUNNING = REGISTRY.gauge(
+    "admission_running", "Requests currently holding an admission slot", ["request_class"]
+)
+ADMISSION_QUEUED = REGISTRY.gauge(
+    "admission_queue_depth", "Requests waiting for an admission slot", ["request_class"]
+)
+ADMISSION_SHED_TOTAL = REGISTRY.counter(
+    "admission_shed_total", "Requests rejected with 503 by admission control", ["request_class"]
+)
+
+# ===== MODEL INFERENCE =====
+INFERENCE_BATCH_SIZE = REGISTRY.histogram(
+    "inference_batch_size", "Requests coalesced into one forward pass", ["model"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+INFERENCE_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "inference_queue_wait_seconds", "Time a request waited for its batch to start", ["model"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+)
+INFERENCE_BATCH_SECONDS = REGISTRY.histogram(
+    "inference_batch_seconds", "Forward-pass time per batch", ["model"]
+)
+
+# ===== MODEL REGISTRY =====
+MODEL_LOAD_SECONDS = REGISTRY.histogram(
+    "model_load_seconds", "Time to load a model into the shared registry", ["model"],
+    buckets=(0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+)
+MODEL_MEMORY_BYTES = REGISTRY.gauge(
+    "model_memory_bytes", "Weight memory of a loaded model (0 once evicted)", ["model"]
+)
+MODEL_EVICTIONS_TOTAL = REGISTRY.counter(
+    "model_evictions_total", "Models dropped from the registry", ["model"]
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a cache lookup."""
+    CACHE_REQUESTS_TOTAL.inc(cache=cache, result="hit" if hit else "miss")
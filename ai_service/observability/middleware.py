@@ -0,0 +1,51 @@
+"""
+HTTP Metrics Middleware
+
+Pure ASGI middleware recording request latency per route template
+(e.g. `/session/{session_id}`), so label cardinality stays bounded.
+"""
+
+import time
+
+from starlette.routing import Match
+
+from .metrics import HTTP_REQUEST_SECONDS
+
+
+class MetricsMiddleware:
+    """Observe `http_request_duration_seconds` for every HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=scope.get("method", ""),
+                route=self._route_template(scope),
+                status=str(status["code"])
+            )
+
+    @staticmethod
+    def _route_template(scope) -> str:
+        app = scope.get("app")
+        for route in getattr(app, "routes", []):
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", "<unknown>")
+        return "<unmatched>"
@@ -0,0 +1,211 @@
+"""
+On-Demand Request Profiling
+
+Wraps a single request in cProfile when explicitly asked to, so slow
+production requests can be diagnosed without redeploying.
+
+Trigger (both required):
+- `X-Profile: 1` header or `?profile=1` query flag
+- `X-Profile-Token` header matching the PROFILING_TOKEN env var
+
+Profiling is disabled entirely when PROFILING_TOKEN is unset, and profiled
+requests are rate limited (PROFILING_MAX_PER_MINUTE). The response carries
+an `X-Profile-Id` header; the breakdown is fetched from
+`GET /debug/profiles/{profile_id}`.
+
+Note: cProfile follows the event-loop thread only. Work pushed to the
+threadpool (e.g. OCR) shows up as time spent awaiting it, and other
+requests interleaved on the loop are included. Only one request is
+profiled at a time.
+"""
+
+import os
+import time
+import uuid
+import hmac
+import pstats
+import cProfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs
+
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILING_MAX_PER_MINUTE = int(os.getenv("PROFILING_MAX_PER_MINUTE", 6))
+PROFILING_KEEP = int(os.getenv("PROFILING_KEEP", 50))
+
+# Path fragments used to group functions in the breakdown
+CATEGORIES = [
+    ("engine", ("engines/",)),
+    ("adapters", ("model_adapters/",)),
+    ("report_analysis", ("report_analysis/",)),
+    ("serialization", ("json/", "pydantic", "fastapi/encoders", "fastapi/routing")),
+]
+
+
+def _categorize(filename: str) -> str:
+    filename = filename.replace("\\", "/")
+    for category, fragments in CATEGORIES:
+        if any(fragment in filename for fragment in fragments):
+            return category
+    return "other"
+
+
+def authorize(token: Optional[str]) -> bool:
+    """Check a profiling token against PROFILING_TOKEN."""
+    if not PROFILING_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token, PROFILING_TOKEN)
+
+
+class ProfileRateLimiter:
+    """Token bucket limiting how many requests may be profiled."""
+
+    def __init__(self, per_minute: int = PROFILING_MAX_PER_MINUTE):
+        self.capacity = max(1, per_minute)
+        self.rate = per_minute / 60.0
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class ProfileStore:
+    """Keeps the most recent profile reports in memory."""
+
+    def __init__(self, keep: int = PROFILING_KEEP):
+        self.keep = keep
+        self._reports: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, report: Dict[str, Any]) -> None:
+        with self._lock:
+            self._reports[report["profile_id"]] = report
+            while len(self._reports) > self.keep:
+                self._reports.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        return self._reports.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {k: r[k] for k in ("profile_id", "method", "path", "status", "duration_ms", "created_at")}
+                for r in reversed(self._reports.values())
+            ]
+
+
+def build_report(profiler: cProfile.Profile, top_n: int = 40) -> Dict[str, Any]:
+    """Turn raw cProfile stats into a JSON-friendly per-function breakdown."""
+    stats = pstats.Stats(profiler)
+    rows = []
+    by_category: Dict[str, float] = {}
+
+    for (filename, line, func), (cc, ncalls, tottime, cumtime, _) in stats.stats.items():
+        category = _categorize(filename)
+        by_category[category] = by_category.get(category, 0.0) + tottime
+        rows.append({
+            "function": func,
+            "file": filename,
+            "line": line,
+            "category": category,
+            "ncalls": ncalls,
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3),
+        })
+
+    rows.sort(key=lambda r: r["cumtime_ms"], reverse=True)
+    return {
+        "self_time_ms_by_category": {k: round(v * 1000, 3) for k, v in sorted(by_category.items())},
+        "top_functions": rows[:top_n],
+        # Application code is usually buried below framework frames by cumtime
+        "top_app_functions": [r for r in rows if r["category"] != "other"][:top_n],
+    }
+
+
+profile_store = ProfileStore()
+rate_limiter = ProfileRateLimiter()
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware that profiles opted-in, authorised requests."""
+
+    def __init__(self, app, store: ProfileStore = None, limiter: ProfileRateLimiter = None):
+        self.app = app
+        self.store = store or profile_store
+        self.limiter = limiter or rate_limiter
+        self._active = threading.Lock()
+
+    @staticmethod
+    def _requested(scope) -> Optional[str]:
+        """Return the supplied token if profiling was requested, else None."""
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        flag = headers.get("x-profile") or (query.get("profile") or [""])[0]
+        if flag.lower() not in ("1", "true", "yes"):
+            return None
+        return headers.get("x-profile-token", "")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not PROFILING_TOKEN:
+            await self.app(scope, receive, send)
+            return
+
+        token = self._requested(scope)
+        if token is None or not authorize(token):
+            await self.app(scope, receive, send)
+            return
+
+        # The interpreter has a single profile hook per thread; check this
+        # before spending a rate-limit token on a request we will not profile
+        if not self._active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        if not self.limiter.allow():
+            self._active.release()
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            self._active.release()
+
+    async def _profile(self, scope, receive, send):
+        profile_id = uuid.uuid4().hex[:12]
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-profile-id", profile_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            report = {
+                "profile_id": profile_id,
+                "method": scope.get("method", ""),
+                "path": scope.get("path", ""),
+                "status": status["code"],
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                "created_at": time.time(),
+            }
+            report.update(build_report(profiler))
+            self.store.add(report)
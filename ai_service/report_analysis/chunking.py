@@ -0,0 +1,64 @@
+"""
+Report Chunking
+
+Splits long OCR text into chunks for map-reduce summarization.
+
+- Multi-page PDFs are split on the "--- Page N ---" markers written by
+  OCREngine. The markers are dropped, so a chunk's text (and cache key)
+  depends on the page content, not on where the page sits in the file.
+- Text without page markers is split into sections on blank lines.
+- Any page or section over the limit is split on line boundaries (a
+  single over-long line is cut).
+- Consecutive pages/sections are packed greedily up to the size limit,
+  so short pages do not each cost a model call.
+"""
+
+import re
+from typing import List
+
+# Page separator emitted by OCREngine._extract_from_pdf
+_PAGE_MARKER = re.compile(r"^--- Page \d+ ---[ \t]*$", re.MULTILINE)
+_SECTION_BREAK = re.compile(r"\n[ \t]*\n")
+
+
+def _pack(pieces: List[str], max_chars: int, joiner: str) -> List[str]:
+    """Greedily join consecutive pieces while the result fits in max_chars."""
+    chunks, current = [], ""
+    for piece in pieces:
+        if current and len(current) + len(joiner) + len(piece) <= max_chars:
+            current += joiner + piece
+        else:
+            if current:
+                chunks.append(current)
+            current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_oversized(piece: str, max_chars: int) -> List[str]:
+    if len(piece) <= max_chars:
+        return [piece]
+    lines = []
+    for line in piece.split("\n"):
+        lines.extend(line[i:i + max_chars] for i in range(0, max(len(line), 1), max_chars))
+    return _pack(lines, max_chars, "\n")
+
+
+def split_report(text: str, max_chars: int) -> List[str]:
+    """
+    Split report text into chunks of at most max_chars characters.
+
+    Returns:
+        Non-empty chunks in document order ([] for blank text)
+    """
+    pages = [p.strip() for p in _PAGE_MARKER.split(text) if p.strip()]
+    if len(pages) > 1:
+        pieces = pages
+    else:
+        pieces = [s.strip() for s in _SECTION_BREAK.split(text) if s.strip()]
+
+    units = []
+    for piece in pieces:
+        units.extend(_split_oversized(piece, max_chars))
+    return _pack(units, max_chars, "\n\n")
@@ -10,25 +10,45 @@ import os
 from typing import Optional
 from pathlib import Path
 
-# Try to import OCR libraries
-try:
-    import pytesseract
-    from PIL import Image
-    TESSERACT_AVAILABLE = True
-except ImportError:
-    TESSERACT_AVAILABLE = False
-
-try:
-    import pdf2image
-    PDF2IMAGE_AVAILABLE = True
-except ImportError:
-    PDF2IMAGE_AVAILABLE = False
-
-try:
-    from paddleocr import PaddleOCR
-    PADDLE_AVAILABLE = True
-except ImportError:
-    PADDLE_AVAILABLE = False
+from observability.metrics import OCR_PAGE_SECONDS
+
+# OCR libraries are imported on first use: pulling in pytesseract/PIL,
+# pdf2image and especially paddleocr at import time slows service startup
+# for endpoints that never touch OCR.
+_MODULES = {}
+
+
+def _load(name: str):
+    """Import an optional OCR dependency once; returns None if unavailable."""
+    if name not in _MODULES:
+        try:
+            if name == "pytesseract":
+                import pytesseract as module
+                from PIL import Image  # noqa: F401  (required by pytesseract)
+            elif name == "pdf2image":
+                import pdf2image as module
+            elif name == "paddleocr":
+                import paddleocr as module
+            elif name == "PIL.Image":
+                from PIL import Image as module
+            else:
+                raise ImportError(name)
+            _MODULES[name] = module
+        except ImportError:
+            _MODULES[name] = None
+    return _MODULES[name]
+
+
+def tesseract_available() -> bool:
+    return _load("pytesseract") is not None
+
+
+def pdf2image_available() -> bool:
+    return _load("pdf2image") is not None
+
+
+def paddle_available() -> bool:
+    return _load("paddleocr") is not None
 
 
 class OCREngine:
@@ -48,10 +68,10 @@ class OCREngine:
         Args:
             use_paddle: Use PaddleOCR instead of Tesseract (better for complex layouts)
         """
-        self.use_paddle = use_paddle and PADDLE_AVAILABLE
+        self.use_paddle = use_paddle and paddle_available()
         
         if self.use_paddle:
-            self.paddle_ocr = PaddleOCR(use_angle_cls=True, lang='en', show_log=False)
+            self.paddle_ocr = _load("paddleocr").PaddleOCR(use_angle_cls=True, lang='en', show_log=False)
         
         # Tesseract configuration for medical documents
         self.tesseract_config = '--oem 3 --psm 6'
@@ -80,7 +100,8 @@ class OCREngine:
     
     def _extract_from_pdf(self, content: bytes) -> str:
         """Extract text from PDF file."""
-        if not PDF2IMAGE_AVAILABLE:
+        pdf2image = _load("pdf2image")
+        if pdf2image is None:
             return "[Error: PDF processing not available. Install pdf2image and poppler.]"
         
         try:
@@ -99,6 +120,9 @@ class OCREngine:
     def _extract_from_image(self, content: bytes) -> str:
         """Extract text from image file."""
         try:
+            Image = _load("PIL.Image")
+            if Image is None:
+                return "[Error: Image processing not available. Install pillow.]"
             image = Image.open(io.BytesIO(content))
             return self._ocr_image(image)
         except Exception as e:
@@ -110,14 +134,16 @@ class OCREngine:
         
         Uses PaddleOCR or Tesseract based on configuration.
         """
-        if self.use_paddle:
-            return self._paddle_ocr(image)
-        else:
-            return self._tesseract_ocr(image)
+        with OCR_PAGE_SECONDS.time(engine="paddle" if self.use_paddle else "tesseract"):
+            if self.use_paddle:
+                return self._paddle_ocr(image)
+            else:
+                return self._tesseract_ocr(image)
     
     def _tesseract_ocr(self, image: 'Image.Image') -> str:
         """Extract text using Tesseract OCR."""
-        if not TESSERACT_AVAILABLE:
+        pytesseract = _load("pytesseract")
+        if pytesseract is None:
             return "[Error: Tesseract not available. Install pytesseract and tesseract-ocr.]"
         
         try:
@@ -133,7 +159,7 @@ class OCREngine:
     
     def _paddle_ocr(self, image: 'Image.Image') -> str:
         """Extract text using PaddleOCR."""
-        if not PADDLE_AVAILABLE:
+        if not paddle_available():
             return "[Error: PaddleOCR not available. Install paddleocr.]"
         
         try:
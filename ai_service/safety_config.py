@@ -165,6 +165,8 @@ def format_safe_response(
     
     return "\n".join(response_parts)
 
+SAFETY_BLOCK_MESSAGE = "This system does not provide medical diagnosis or treatment advice. (Safety Block)"
+
 def validate_safety(text: str) -> str:
     """
     Validate text against safety tensors.
@@ -172,5 +174,62 @@ def validate_safety(text: str) -> str:
     """
     is_safe, error = safety_filter(text)
     if not is_safe:
-        return "This system does not provide medical diagnosis or treatment advice. (Safety Block)"
+        return SAFETY_BLOCK_MESSAGE
     return text
+
+# Same matching as safety_filter (whole-word, case-insensitive), as one pattern
+_UNSAFE_PATTERN = re.compile(
+    r"\b(?:" + "|".join(re.escape(term) for term in UNSAFE_TERMS) + r")\b", re.IGNORECASE
+)
+_LONGEST_TERM = max(len(term) for term in UNSAFE_TERMS)
+
+class StreamingSafetyFilter:
+    """
+    Incremental safety_filter for streamed LLM output.
+    
+    Text is released as soon as no blocked term can still be forming in it:
+    only the last len(longest term) characters are held back, since a term
+    (plus the character after it that decides the word boundary) starting
+    earlier is already fully visible. Once a term is seen, the stream is
+    blocked and nothing further is released; no character of a blocked
+    term is ever emitted.
+    
+    Usage:
+        f = StreamingSafetyFilter()
+        for chunk in stream:
+            send(f.feed(chunk))
+        send(f.finish())
+        if f.blocked: replace the output with SAFETY_BLOCK_MESSAGE
+    """
+    
+    def __init__(self):
+        self._text = ""
+        self._emitted = 0
+        self.blocked = False
+    
+    def feed(self, chunk: str) -> str:
+        """Add a chunk; returns the text that is now safe to send ('' if none)."""
+        if self.blocked or not chunk:
+            return ""
+        self._text += chunk
+        return self._release(len(self._text) - _LONGEST_TERM, final=False)
+    
+    def finish(self) -> str:
+        """End of stream; returns the remaining held-back text if it is safe."""
+        if self.blocked:
+            return ""
+        return self._release(len(self._text), final=True)
+    
+    def _release(self, upto: int, final: bool) -> str:
+        # Terms starting before the previous release point were already ruled out
+        for match in _UNSAFE_PATTERN.finditer(self._text, self._emitted):
+            # A term ending exactly at the end of the buffer may still grow
+            # into a longer, allowed word ("cure" -> "cured")
+            if final or match.end() < len(self._text):
+                self.blocked = True
+                return ""
+        if upto <= self._emitted:
+            return ""
+        released = self._text[self._emitted:upto]
+        self._emitted = upto
+        return released
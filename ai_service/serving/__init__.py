@@ -0,0 +1,18 @@
+# Serving Package
+"""
+Request-serving infrastructure shared by the API endpoints.
+"""
+
+from .session_store import SessionStore
+from .idempotency import IdempotencyCache, IdempotencyConflict, IdempotencyInProgress
+from .admission import AdmissionController, RequestClass, Overloaded
+
+__all__ = [
+    "SessionStore",
+    "IdempotencyCache",
+    "IdempotencyConflict",
+    "IdempotencyInProgress",
+    "AdmissionController",
+    "RequestClass",
+    "Overloaded"
+]
@@ -0,0 +1,198 @@
+"""
+Admission Control & Load Shedding
+
+Bounds how many expensive requests run at once so slow work (OCR + LLM
+report analysis, AI chat) cannot starve cheap triage turns.
+
+Each request class has:
+- a priority (lower number = served first when slots free up)
+- a per-class concurrency limit
+- a bounded wait queue; when it is full the request is shed immediately
+
+All classes also share a global slot budget (ADMISSION_TOTAL_SLOTS,
+default: the largest per-class limit), so queued triage turns are admitted
+ahead of queued chat and report analysis. The default budget is below the
+sum of the class limits on purpose; if it were the sum it would never be
+the binding limit and priority ordering across classes would never apply.
+"""
+
+import os
+import heapq
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Any
+
+from observability.metrics import ADMISSION_RUNNING, ADMISSION_QUEUED, ADMISSION_SHED_TOTAL
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed because its queue is full or the wait timed out."""
+
+    def __init__(self, request_class: str, retry_after: int):
+        super().__init__(f"Service overloaded for '{request_class}' requests")
+        self.request_class = request_class
+        self.retry_after = retry_after
+
+
+@dataclass
+class RequestClass:
+    """Admission settings for one class of request."""
+    name: str
+    priority: int
+    max_concurrent: int
+    max_queue: int
+    max_wait: float = 10.0
+    retry_after: int = 5
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+# Default classes: triage turns first, chat next, report analysis last
+DEFAULT_CLASSES = [
+    RequestClass("triage", priority=0,
+                 max_concurrent=_env_int("ADMISSION_TRIAGE_CONCURRENCY", 32),
+                 max_queue=_env_int("ADMISSION_TRIAGE_QUEUE", 128),
+                 max_wait=5.0, retry_after=1),
+    RequestClass("chat", priority=1,
+                 max_concurrent=_env_int("ADMISSION_CHAT_CONCURRENCY", 8),
+                 max_queue=_env_int("ADMISSION_CHAT_QUEUE", 16),
+                 max_wait=15.0, retry_after=5),
+    RequestClass("report", priority=2,
+                 max_concurrent=_env_int("ADMISSION_REPORT_CONCURRENCY", 2),
+                 max_queue=_env_int("ADMISSION_REPORT_QUEUE", 4),
+                 max_wait=30.0, retry_after=15),
+]
+
+
+class AdmissionController:
+    """
+    Priority admission gate with per-class limits and bounded queues.
+
+    Usage:
+        admission = AdmissionController()
+        async with admission.slot("report"):
+            ...  # expensive work
+    """
+
+    def __init__(self, classes: List[RequestClass] = None, total_slots: int = None):
+        classes = classes or DEFAULT_CLASSES
+        self.classes: Dict[str, RequestClass] = {c.name: c for c in classes}
+        self.total_slots = total_slots or _env_int(
+            "ADMISSION_TOTAL_SLOTS", max(c.max_concurrent for c in classes)
+        )
+
+        self._running: Dict[str, int] = {name: 0 for name in self.classes}
+        self._queued: Dict[str, int] = {name: 0 for name in self.classes}
+        self._admitted: Dict[str, int] = {name: 0 for name in self.classes}
+        self._shed: Dict[str, int] = {name: 0 for name in self.classes}
+        self._waiters: List = []  # heap of (priority, seq, class_name, future)
+        self._seq = itertools.count()
+
+    def _total_running(self) -> int:
+        return sum(self._running.values())
+
+    def _can_run(self, name: str) -> bool:
+        return (
+            self._running[name] < self.classes[name].max_concurrent
+            and self._total_running() < self.total_slots
+        )
+
+    def _shed_request(self, name: str) -> Overloaded:
+        self._shed[name] += 1
+        ADMISSION_SHED_TOTAL.inc(request_class=name)
+        return Overloaded(name, self.classes[name].retry_after)
+
+    async def acquire(self, name: str) -> None:
+        """Wait for a slot, or raise Overloaded if the request must be shed."""
+        cls = self.classes[name]
+
+        # Fast path: free slot and nobody of equal or higher priority waiting
+        if self._can_run(name) and not any(
+            w[0] <= cls.priority and not w[3].done() for w in self._waiters
+        ):
+            self._running[name] += 1
+            self._admitted[name] += 1
+            return
+
+        if self._queued[name] >= cls.max_queue:
+            raise self._shed_request(name)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (cls.priority, next(self._seq), name, future))
+        self._queued[name] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=cls.max_wait)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # Admitted just as the timeout fired; give the slot back
+                self.release(name)
+            else:
+                future.cancel()
+            raise self._shed_request(name)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(name)
+            else:
+                future.cancel()
+            raise
+        finally:
+            self._queued[name] -= 1
+        self._admitted[name] += 1
+
+    def release(self, name: str) -> None:
+        """Free a slot and admit the highest-priority waiters that now fit."""
+        self._running[name] -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        skipped = []
+        while self._waiters and self._total_running() < self.total_slots:
+            entry = heapq.heappop(self._waiters)
+            _, _, name, future = entry
+            if future.done():
+                continue
+            if self._running[name] >= self.classes[name].max_concurrent:
+                # Class is at its own limit; let lower-priority classes use the slot
+                skipped.append(entry)
+                continue
+            self._running[name] += 1
+            future.set_result(True)
+        for entry in skipped:
+            heapq.heappush(self._waiters, entry)
+
+    @asynccontextmanager
+    async def slot(self, name: str):
+        """Async context manager holding one admission slot."""
+        await self.acquire(name)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    def export_metrics(self) -> None:
+        """Refresh admission gauges (registered as a metrics collector)."""
+        for name in self.classes:
+            ADMISSION_RUNNING.set(self._running[name], request_class=name)
+            ADMISSION_QUEUED.set(self._queued[name], request_class=name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight and shed counts per class."""
+        return {
+            "total_slots": self.total_slots,
+            "classes": {
+                name: {
+                    "priority": cls.priority,
+                    "max_concurrent": cls.max_concurrent,
+                    "max_queue": cls.max_queue,
+                    "running": self._running[name],
+                    "queued": self._queued[name],
+                    "admitted_total": self._admitted[name],
+                    "shed_total": self._shed[name],
+                }
+                for name, cls in self.classes.items()
+            }
+        }
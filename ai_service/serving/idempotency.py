@@ -0,0 +1,193 @@
+"""
+Idempotency-Key Response Cache
+
+Lets clients (mainly the Node proxy, which retries /start and /next on 5xx
+and timeouts) attach an `Idempotency-Key` header so a retried request returns
+the original response instead of re-running extraction and inference.
+
+- Completed responses are stored in the session store for a short TTL.
+- Identical requests still in flight in this worker await the same task.
+- Requests in flight on another worker are detected via a pending marker
+  in the session store and polled until the result lands. The marker has
+  its own short TTL and is refreshed while the request runs, so a slow
+  request keeps it however long it takes, and a crashed worker's marker
+  lapses within IDEMPOTENCY_PENDING_TTL_SECONDS.
+- If the store itself is failing, requests run uncached rather than wait.
+- Store calls that may reach Redis run in a worker thread, so polling a
+  pending key never blocks the event loop on a network round trip.
+"""
+
+import json
+import asyncio
+import hashlib
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from observability.metrics import record_cache
+from .session_store import SessionStore
+
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", 300))
+IDEMPOTENCY_WAIT = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 30))
+IDEMPOTENCY_PENDING_TTL = float(os.getenv("IDEMPOTENCY_PENDING_TTL_SECONDS", 30))
+
+
+class IdempotencyConflict(Exception):
+    """Same idempotency key reused with a different request body."""
+    pass
+
+
+class IdempotencyInProgress(Exception):
+    """The original request is still running elsewhere and did not finish in time."""
+    pass
+
+
+class IdempotencyCache:
+    """
+    Response cache keyed by (scope, Idempotency-Key).
+
+    Usage:
+        cache = IdempotencyCache(store)
+        response = await cache.run(key, "start", payload, compute)
+    """
+
+    def __init__(
+        self,
+        store: SessionStore,
+        ttl: float = IDEMPOTENCY_TTL,
+        wait_timeout: float = IDEMPOTENCY_WAIT,
+        poll_interval: float = 0.05,
+        pending_ttl: float = IDEMPOTENCY_PENDING_TTL
+    ):
+        self.store = store
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self.pending_ttl = pending_ttl
+        self.poll_interval = poll_interval
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def fingerprint(payload: Dict[str, Any]) -> str:
+        """Stable hash of the request body."""
+        body = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    async def run(
+        self,
+        key: Optional[str],
+        scope: str,
+        payload: Dict[str, Any],
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Run `compute` at most once per idempotency key.
+
+        Args:
+            key: Value of the Idempotency-Key header (None disables caching)
+            scope: Endpoint name, so keys never collide across routes
+            payload: Request body used to detect key reuse
+            compute: Coroutine factory producing the response
+
+        Returns:
+            The response (a plain dict when served from cache)
+        """
+        if not key:
+            return await compute()
+
+        cache_key = f"idempotency:{scope}:{key}"
+        fingerprint = self.fingerprint(payload)
+
+        # Coalesce with an identical request running in this worker
+        task = self._inflight.get(cache_key)
+        if task is not None:
+            record_cache("idempotency", hit=True)
+            result = await asyncio.shield(task)
+            return self._check(result, fingerprint)["response"]
+
+        task = asyncio.ensure_future(self._resolve(cache_key, fingerprint, compute))
+        self._inflight[cache_key] = task
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            if task.done():
+                self._inflight.pop(cache_key, None)
+            else:
+                task.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+
+        return self._check(result, fingerprint)["response"]
+
+    async def _store(self, method: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call a store method, off the event loop unless the store is in-memory."""
+        if self.store.connected and not self.store.use_redis:
+            return method(*args, **kwargs)
+        return await asyncio.to_thread(method, *args, **kwargs)
+
+    async def _resolve(
+        self,
+        cache_key: str,
+        fingerprint: str,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Dict[str, Any]:
+        """Return a completed record, computing it if nobody else is."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_timeout
+
+        while True:
+            record = await self._store(self.store.get_json, cache_key)
+            if record and record.get("status") == "done":
+                record_cache("idempotency", hit=True)
+                return record
+
+            pending = {"status": "pending", "fingerprint": fingerprint}
+            if record is None:
+                if await self._store(self.store.set_if_absent, cache_key, json.dumps(pending), ttl=self.pending_ttl):
+                    record_cache("idempotency", hit=False)
+                    break
+                if await self._store(self.store.get_json, cache_key) is None:
+                    # Neither written nor held by anyone: the store is failing,
+                    # not a lost race. Serve the request uncached.
+                    record_cache("idempotency", hit=False)
+                    return self._record(fingerprint, await compute())
+
+            if record and record.get("fingerprint") != fingerprint:
+                return record
+            if loop.time() >= deadline:
+                raise IdempotencyInProgress("Original request is still being processed")
+            await asyncio.sleep(self.poll_interval)
+
+        stop = asyncio.Event()
+        heartbeat = asyncio.ensure_future(self._keep_pending(cache_key, json.dumps(pending), stop))
+        try:
+            response = await compute()
+        except BaseException:
+            # Errors are not cached; let the client retry for real
+            stop.set()
+            await heartbeat
+            await self._store(self.store.delete, cache_key)
+            raise
+        stop.set()
+        await heartbeat
+
+        record = self._record(fingerprint, response)
+        await self._store(self.store.set_json, cache_key, record, ttl=self.ttl)
+        return record
+
+    async def _keep_pending(self, cache_key: str, marker: str, stop: asyncio.Event) -> None:
+        """Re-arm the pending marker's TTL until `stop` is set (never after: the result may follow)."""
+        while True:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.pending_ttl / 3)
+                return
+            except asyncio.TimeoutError:
+                await self._store(self.store.set, cache_key, marker, ttl=self.pending_ttl)
+
+    @staticmethod
+    def _record(fingerprint: str, response: Any) -> Dict[str, Any]:
+        if hasattr(response, "model_dump"):
+            response = response.model_dump()
+        return {"status": "done", "fingerprint": fingerprint, "response": response}
+
+    @staticmethod
+    def _check(record: Dict[str, Any], fingerprint: str) -> Dict[str, Any]:
+        if record.get("fingerprint") != fingerprint:
+            raise IdempotencyConflict("Idempotency-Key was already used with a different request")
+        return record
@@ -0,0 +1,82 @@
+"""
+Lazy Subsystem Loaders
+
+Heavy subsystems (OCR stack, LLM model selector, transformer adapters) are
+constructed on first use rather than at import, so triage-only workers and
+the test suite start quickly.
+
+Also provides an import-time report logged at startup.
+"""
+
+import sys
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+# Modules whose presence in sys.modules means a heavy dependency was imported
+HEAVY_MODULES = [
+    "torch", "transformers", "redis", "aiohttp", "pytesseract",
+    "pdf2image", "paddleocr", "PIL", "google.generativeai", "numpy", "httpx",
+]
+
+
+class LazySubsystem:
+    """
+    Thread-safe, build-once holder for an expensive object.
+
+    Usage:
+        ocr = LazySubsystem("ocr", lambda: OCREngine())
+        ocr.get().extract_text(...)
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self.name = name
+        self._factory = factory
+        self._instance: Any = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.load_seconds: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def get(self) -> Any:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    start = time.perf_counter()
+                    self._instance = self._factory()
+                    self.load_seconds = time.perf_counter() - start
+                    self._loaded = True
+        return self._instance
+
+
+_subsystems: Dict[str, LazySubsystem] = {}
+
+
+def lazy_subsystem(name: str, factory: Callable[[], Any]) -> LazySubsystem:
+    """Create (or return the existing) named lazy subsystem."""
+    if name not in _subsystems:
+        _subsystems[name] = LazySubsystem(name, factory)
+    return _subsystems[name]
+
+
+def loaded_heavy_modules() -> List[str]:
+    """Heavy dependencies currently imported in this process."""
+    return [m for m in HEAVY_MODULES if m in sys.modules]
+
+
+def import_report(app_import_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """Summary of startup cost: app import time, subsystems built, heavy modules loaded."""
+    return {
+        "app_import_seconds": round(app_import_seconds, 4) if app_import_seconds is not None else None,
+        "subsystems": {
+            name: {
+                "loaded": sub.loaded,
+                "load_seconds": round(sub.load_seconds, 4) if sub.load_seconds is not None else None,
+            }
+            for name, sub in _subsystems.items()
+        },
+        "heavy_modules_loaded": loaded_heavy_modules(),
+    }
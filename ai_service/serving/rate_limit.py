@@ -0,0 +1,203 @@
+"""
+Provider Rate Limiting
+
+Token buckets that keep LLM calls inside each provider's quota up front,
+instead of discovering the quota through 429 responses.
+
+- One bucket per provider: refills at `<PROVIDER>_RPM` requests per minute
+  and holds at most `<PROVIDER>_BURST` tokens. RPM 0 disables the limit.
+- With Redis, the bucket lives in the session store and is updated by a
+  Lua script, so all workers draw from the same quota (refill uses the
+  Redis clock, not each worker's). Without Redis, buckets are per-process.
+- `acquire` runs the Redis round trip (and a first Redis connect) in a
+  worker thread, so a slow Redis never stalls the event loop. The app
+  hands its own SessionStore to PROVIDER_LIMITS via `use_store`.
+- `acquire` waits for a token when the wait is short; when it would exceed
+  LLM_RATE_LIMIT_MAX_WAIT it raises `RateLimited` right away so the caller
+  can fall over to another provider.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from observability.metrics import LLM_RATE_LIMIT_WAIT_SECONDS, LLM_RATE_LIMITED_TOTAL
+from serving.session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+LLM_RATE_LIMIT_MAX_WAIT = float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT", 5))
+
+# Requests per minute and burst size per provider (free-tier Gemini allows 60 RPM)
+DEFAULT_QUOTAS = {
+    "gemini": (60, 10),
+    "openrouter": (200, 20),
+}
+
+# KEYS[1] = bucket key; ARGV = refill rate (tokens/s), burst, cost.
+# Returns the seconds to wait before `cost` tokens are available (0 = taken).
+_TAKE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RateLimited(Exception):
+    """Raised when a provider's quota would not free up within the allowed wait."""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"{provider} quota exhausted; retry in {retry_after:.1f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+@dataclass
+class Quota:
+    """Rate limit settings for one provider."""
+    requests_per_minute: float
+    burst: float
+
+    @property
+    def rate(self) -> float:
+        return self.requests_per_minute / 60.0
+
+
+def _quota_from_env(provider: str) -> Quota:
+    rpm, burst = DEFAULT_QUOTAS.get(provider, (0, 1))
+    prefix = provider.upper()
+    return Quota(
+        requests_per_minute=float(os.getenv(f"{prefix}_RPM", rpm)),
+        burst=float(os.getenv(f"{prefix}_BURST", burst)),
+    )
+
+
+class ProviderRateLimiter:
+    """
+    Token bucket per provider, shared through the session store.
+
+    Usage:
+        await PROVIDER_LIMITS.acquire("gemini")   # before each provider call
+    """
+
+    def __init__(self, store: Optional[SessionStore] = None,
+                 max_wait: float = LLM_RATE_LIMIT_MAX_WAIT):
+        self._store = store
+        self.max_wait = max_wait
+        self._quotas: Dict[str, Quota] = {}
+        # provider -> (tokens, last refill) for the in-process fallback
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._script = None
+
+    @property
+    def store(self) -> SessionStore:
+        if self._store is None:
+            self._store = SessionStore()
+        return self._store
+
+    def use_store(self, store: SessionStore) -> None:
+        """Share buckets through `store` (the app's session store) instead of a private one."""
+        with self._lock:
+            self._store = store
+            self._script = None
+
+    def quota(self, provider: str) -> Quota:
+        if provider not in self._quotas:
+            self._quotas[provider] = _quota_from_env(provider)
+        return self._quotas[provider]
+
+    def set_quota(self, provider: str, requests_per_minute: float, burst: float) -> None:
+        """Override a provider's quota (tests, or plans with a different tier)."""
+        with self._lock:
+            self._quotas[provider] = Quota(requests_per_minute, burst)
+            self._buckets.pop(provider, None)
+
+    def try_acquire(self, provider: str, cost: float = 1.0) -> float:
+        """
+        Take `cost` tokens if available.
+
+        Returns:
+            0.0 when taken, otherwise the seconds until enough tokens refill
+        """
+        quota = self.quota(provider)
+        if quota.requests_per_minute <= 0:
+            return 0.0
+        if self.store.use_redis:
+            try:
+                return self._take_redis(provider, quota, cost)
+            except Exception as e:
+                logger.warning(f"Shared rate limit for {provider} unavailable, using local bucket: {e}")
+        return self._take_local(provider, quota, cost)
+
+    def _take_redis(self, provider: str, quota: Quota, cost: float) -> float:
+        if self._script is None:
+            self._script = self.store.redis_client.register_script(_TAKE_SCRIPT)
+        wait = self._script(keys=[f"ratelimit:{provider}"], args=[quota.rate, quota.burst, cost])
+        return float(wait)
+
+    def _take_local(self, provider: str, quota: Quota, cost: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(provider, (quota.burst, now))
+            tokens = min(quota.burst, tokens + (now - last) * quota.rate)
+            if tokens >= cost:
+                self._buckets[provider] = (tokens - cost, now)
+                return 0.0
+            self._buckets[provider] = (tokens, now)
+            return (cost - tokens) / quota.rate
+
+    async def _try_acquire_async(self, provider: str, cost: float) -> float:
+        """try_acquire without blocking the loop: anything that may touch Redis runs in a thread."""
+        if self.quota(provider).requests_per_minute <= 0:
+            return 0.0
+        if self.store.connected and not self.store.use_redis:
+            return self.try_acquire(provider, cost)
+        return await asyncio.to_thread(self.try_acquire, provider, cost)
+
+    async def acquire(self, provider: str, cost: float = 1.0,
+                      max_wait: Optional[float] = None) -> float:
+        """
+        Wait for a token for `provider`.
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimited: if the token would not be available within max_wait
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        start = time.monotonic()
+        while True:
+            wait = await self._try_acquire_async(provider, cost)
+            waited = time.monotonic() - start
+            if wait <= 0:
+                if waited > 0:
+                    LLM_RATE_LIMIT_WAIT_SECONDS.observe(waited, provider=provider)
+                return waited
+            if waited + wait > max_wait:
+                LLM_RATE_LIMITED_TOTAL.inc(provider=provider)
+                raise RateLimited(provider, wait)
+            await asyncio.sleep(wait)
+
+
+PROVIDER_LIMITS = ProviderRateLimiter()
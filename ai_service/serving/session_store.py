@@ -0,0 +1,198 @@
+"""
+Session Store
+
+Small key-value store used for triage sessions and short-lived service state.
+Backed by Redis when reachable, otherwise by an in-process dict with TTLs.
+
+Values are strings; JSON helpers are provided for dict payloads.
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Optional, Dict, Any, Tuple
+
+from observability.metrics import SESSION_STORE_SECONDS
+
+# Bound on the Redis connect (seconds); the probe runs once, at startup or first use
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", 0.5))
+# How often the in-memory fallback drops expired keys that are never read again
+MEMORY_SWEEP_SECONDS = float(os.getenv("SESSION_STORE_SWEEP_SECONDS", 60))
+
+
+class SessionStore:
+    """
+    Redis-or-memory key-value store.
+    
+    The in-memory fallback is per-process, so anything that must be shared
+    across workers only works as intended when Redis is available.
+    
+    The redis package is imported and the connection probed by `connect()`
+    (called from the app's startup hook, off the event loop) or else on
+    first use, not at construction, so importing the service stays fast.
+    The probe is bounded by REDIS_CONNECT_TIMEOUT.
+    """
+    
+    def __init__(self, host: str = None, port: int = None, connect_timeout: float = None):
+        self.host = host or os.getenv("REDIS_HOST", "localhost")
+        self.port = int(port or os.getenv("REDIS_PORT", 6379))
+        self.connect_timeout = REDIS_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout
+        self._redis_client = None
+        self._connected = False
+        self._memory: Dict[str, Tuple[str, Optional[float]]] = {}
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+    
+    def connect(self) -> str:
+        """Probe Redis once (blocking); returns the backend in use."""
+        if not self._connected:
+            with self._lock:
+                if not self._connected:
+                    try:
+                        import redis
+                        client = redis.Redis(
+                            host=self.host,
+                            port=self.port,
+                            decode_responses=True,
+                            socket_connect_timeout=self.connect_timeout
+                        )
+                        client.ping()
+                        self._redis_client = client
+                    except Exception:
+                        self._redis_client = None
+                    self._connected = True
+        return "redis" if self._redis_client is not None else "memory"
+    
+    @property
+    def connected(self) -> bool:
+        """Whether the Redis probe has run, so backend checks no longer block."""
+        return self._connected
+    
+    @property
+    def redis_client(self):
+        """Redis client, or None when Redis is unavailable."""
+        if not self._connected:
+            self.connect()
+        return self._redis_client
+    
+    @property
+    def use_redis(self) -> bool:
+        return self.redis_client is not None
+    
+    @property
+    def backend(self) -> str:
+        return "redis" if self.use_redis else "memory"
+    
+    def get(self, key: str) -> Optional[str]:
+        """Get a value, or None if missing/expired."""
+        with SESSION_STORE_SECONDS.time(op="get", backend=self.backend):
+            return self._get(key)
+    
+    def _get(self, key: str) -> Optional[str]:
+        if self.use_redis:
+            try:
+                return self.redis_client.get(key)
+            except Exception:
+                return None
+        
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._memory[key]
+                return None
+            return value
+    
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Set a value with optional TTL in seconds."""
+        with SESSION_STORE_SECONDS.time(op="set", backend=self.backend):
+            self._set(key, value, ttl)
+    
+    def _set(self, key: str, value: str, ttl: Optional[float]) -> None:
+        if self.use_redis:
+            try:
+                if ttl:
+                    self.redis_client.set(key, value, px=int(ttl * 1000))
+                else:
+                    self.redis_client.set(key, value)
+            except Exception:
+                pass
+            return
+        
+        with self._lock:
+            self._sweep_locked()
+            self._memory[key] = (value, time.time() + ttl if ttl else None)
+    
+    def set_if_absent(self, key: str, value: str, ttl: Optional[float] = None) -> bool:
+        """
+        Atomically set a value only if the key does not exist.
+        
+        Returns:
+            True if the value was written
+        """
+        with SESSION_STORE_SECONDS.time(op="set_if_absent", backend=self.backend):
+            return self._set_if_absent(key, value, ttl)
+    
+    def _set_if_absent(self, key: str, value: str, ttl: Optional[float]) -> bool:
+        if self.use_redis:
+            try:
+                return bool(self.redis_client.set(
+                    key, value, nx=True, px=int(ttl * 1000) if ttl else None
+                ))
+            except Exception:
+                return False
+        
+        with self._lock:
+            self._sweep_locked()
+            entry = self._memory.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.time()):
+                return False
+            self._memory[key] = (value, time.time() + ttl if ttl else None)
+            return True
+    
+    def _sweep_locked(self) -> None:
+        """
+        Drop expired in-memory keys, at most every MEMORY_SWEEP_SECONDS.
+        
+        Expired keys are otherwise only removed when read again, so write-once
+        keys (e.g. one per Idempotency-Key) would accumulate forever.
+        """
+        now = time.time()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + MEMORY_SWEEP_SECONDS
+        expired = [k for k, (_, expires_at) in self._memory.items()
+                   if expires_at is not None and expires_at <= now]
+        for k in expired:
+            del self._memory[k]
+    
+    def delete(self, key: str) -> None:
+        """Delete a key if present."""
+        with SESSION_STORE_SECONDS.time(op="delete", backend=self.backend):
+            self._delete(key)
+    
+    def _delete(self, key: str) -> None:
+        if self.use_redis:
+            try:
+                self.redis_client.delete(key)
+            except Exception:
+                pass
+            return
+        
+        with self._lock:
+            self._memory.pop(key, None)
+    
+    def get_json(self, key: str) -> Optional[Dict[str, Any]]:
+        data = self.get(key)
+        if not data:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
+    
+    def set_json(self, key: str, value: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        self.set(key, json.dumps(value), ttl=ttl)
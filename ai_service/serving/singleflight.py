@@ -0,0 +1,72 @@
+"""
+Singleflight Request Coalescing
+
+Identical work that is already running is joined instead of repeated: a
+report uploaded twice in quick succession (double-click, or a retry from
+the Node proxy) runs OCR and summarization once, and identical chat
+prompts share one LLM call. This removes duplicate heavy work exactly
+when the service is already busy.
+
+- Work is keyed by a content hash (see `content_key`).
+- The first caller starts the computation; callers arriving while it runs
+  await the same task and receive the same result (or exception).
+- Nothing is kept once the task finishes; completed results belong in the
+  caches, this only covers the in-flight window.
+- A caller that goes away does not cancel the shared task, so the other
+  waiters (and any cache it fills) still get the result.
+
+Metrics: singleflight_requests_total{flight, role="leader"|"shared"}.
+"""
+
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Union
+
+from observability.metrics import SINGLEFLIGHT_REQUESTS_TOTAL
+
+
+def content_key(*parts: Union[str, bytes]) -> str:
+    """sha256 over the given parts (length-prefixed, so parts never run together)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part if isinstance(part, bytes) else str(part).encode("utf-8")
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """
+    Per-worker coalescing of concurrent identical calls.
+
+    Usage:
+        flight = SingleFlight("ocr")
+        text = await flight.do(content_key(content, content_type), lambda: run_ocr(content))
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of `compute()`, shared with any identical call already in flight."""
+        task = self._inflight.get(key)
+        # Tasks are bound to their event loop; never join one from another loop
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            SINGLEFLIGHT_REQUESTS_TOTAL.inc(flight=self.name, role="shared")
+        else:
+            task = asyncio.ensure_future(compute())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+            SINGLEFLIGHT_REQUESTS_TOTAL.inc(flight=self.name, role="leader")
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved even if every waiter has gone away
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,107 @@
+"""
+Server-Sent Events Streaming
+
+Helpers for the streaming variants of /ai/chat and /report/analyze:
+LLM chunks are passed through the incremental safety filter and framed
+as SSE events, so the first text reaches the client at time-to-first-token
+instead of after full generation.
+
+Event types:
+- token:   {"text": ...} safe text to append
+- blocked: {"message": ...} the answer tripped the safety filter; the
+           client should replace everything shown so far with `message`
+- done:    {... endpoint-specific metadata, e.g. cached, provider}
+- error:   {"detail": ...}
+
+Streams hold an admission slot for their whole life; `SlotStreamingResponse`
+releases it when the response ends, however it ends (including a client
+that disconnects before the first event, when the body generator never runs).
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from starlette.responses import StreamingResponse
+
+from safety_config import SAFETY_BLOCK_MESSAGE, StreamingSafetyFilter
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Stop nginx-style proxies from buffering the stream
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """One SSE frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class SlotStreamingResponse(StreamingResponse):
+    """
+    SSE response that owns an admission slot.
+
+    `release` is called exactly once, after the body is sent, the client
+    disconnects, or sending fails; the body generator is closed first so
+    an abandoned stream stops its upstream LLM call.
+    """
+
+    def __init__(self, content: AsyncIterator[str], release: Callable[[], None], **kwargs):
+        kwargs.setdefault("media_type", "text/event-stream")
+        kwargs.setdefault("headers", SSE_HEADERS)
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            try:
+                aclose = getattr(self.body_iterator, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+            finally:
+                self._release()
+
+
+@dataclass
+class StreamOutcome:
+    """What a filtered stream produced, for caching and the final event."""
+    parts: List[str] = field(default_factory=list)
+    provider: Optional[str] = None
+    blocked: bool = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+async def filtered_events(
+    chunks: AsyncIterator[Tuple[str, Optional[str]]],
+    outcome: StreamOutcome
+) -> AsyncIterator[str]:
+    """
+    Frame (chunk, provider) pairs as `token` events through the safety filter.
+
+    Stops at the first blocked term with a `blocked` event; `outcome` holds
+    the raw text, the answering provider and whether it was blocked.
+    """
+    safety = StreamingSafetyFilter()
+    async for chunk, provider in chunks:
+        outcome.provider = provider
+        outcome.parts.append(chunk)
+        text = safety.feed(chunk)
+        if text:
+            yield sse_event("token", {"text": text})
+        if safety.blocked:
+            # Stop generating: nothing more from this answer will be sent
+            if hasattr(chunks, "aclose"):
+                await chunks.aclose()
+            break
+    text = safety.finish()
+    if text:
+        yield sse_event("token", {"text": text})
+    if safety.blocked:
+        outcome.blocked = True
+        yield sse_event("blocked", {"message": SAFETY_BLOCK_MESSAGE})
@@ -0,0 +1,100 @@
+"""
+Background Model Warm-up
+
+Loads the configured model subsystems after startup, off the request path,
+and tracks per-subsystem readiness for the /ready endpoint.
+
+- Tasks run one after another in a daemon thread (parallel loads would only
+  compete for the same CPU cores).
+- While a subsystem is pending or warming, `on_change(name, warming=True)`
+  lets callers gate request paths onto their rule-based fallbacks.
+- A task that returns False or raises leaves the subsystem "failed"; the
+  service keeps serving it through the fallback path.
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+class WarmupManager:
+    """
+    Ordered set of named warm-up tasks with readiness tracking.
+
+    Usage:
+        warmup = WarmupManager(on_change=set_warming)
+        warmup.add("sapbert", engine.prepare_sapbert)
+        warmup.start()
+        warmup.report()  # {"ready": ..., "subsystems": {...}}
+    """
+
+    def __init__(self, on_change: Optional[Callable[[str, bool], None]] = None):
+        self.on_change = on_change
+        self._tasks: Dict[str, Callable[[], Any]] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, name: str, task: Callable[[], Any]) -> None:
+        """Register a warm-up task; its subsystem is gated until the task finishes."""
+        with self._lock:
+            self._tasks[name] = task
+            self._status[name] = {"state": PENDING, "seconds": None, "error": None}
+        if self.on_change:
+            self.on_change(name, True)
+
+    def start(self) -> Optional[threading.Thread]:
+        """Run all registered tasks in the background (once)."""
+        if not self._tasks or self._thread is not None:
+            return self._thread
+        self._thread = threading.Thread(target=self._run, name="model-warmup", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def _run(self) -> None:
+        for name, task in list(self._tasks.items()):
+            self._set(name, state=WARMING)
+            start = time.perf_counter()
+            try:
+                ok = task() is not False
+                error = None if ok else "unavailable"
+            except Exception as e:
+                ok, error = False, str(e)
+                logger.warning(f"Warm-up of {name} failed: {e}")
+            seconds = round(time.perf_counter() - start, 3)
+            self._set(name, state=READY if ok else FAILED, seconds=seconds, error=error)
+            logger.info(f"Warm-up of {name}: {'ready' if ok else 'failed'} in {seconds:.1f}s")
+            if self.on_change:
+                self.on_change(name, False)
+
+    def _set(self, name: str, **fields) -> None:
+        with self._lock:
+            self._status[name].update(fields)
+
+    def state(self, name: str) -> Optional[str]:
+        status = self._status.get(name)
+        return status["state"] if status else None
+
+    def is_ready(self, name: str) -> bool:
+        """True once the subsystem finished warming (or was never registered)."""
+        return self.state(name) in (None, READY, FAILED)
+
+    @property
+    def ready(self) -> bool:
+        """No subsystem is still pending or warming."""
+        return all(self.is_ready(name) for name in self._status)
+
+    def report(self) -> Dict[str, Any]:
+        """Overall readiness plus per-subsystem state, timing and errors."""
+        with self._lock:
+            subsystems = {name: dict(status) for name, status in self._status.items()}
+        degraded: List[str] = [n for n, s in subsystems.items() if s["state"] == FAILED]
+        return {"ready": self.ready, "degraded": degraded, "subsystems": subsystems}
@@ -0,0 +1,81 @@
+"""
+Tests for the micro-batching inference worker.
+"""
+
+import sys
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model_adapters.batching import MicroBatcher
+from observability.metrics import INFERENCE_BATCH_SIZE
+
+
+class SlowModel:
+    """Records batch sizes; each forward pass costs a fixed 20 ms."""
+
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self.lock:
+            self.batches.append(len(texts))
+        time.sleep(0.02)
+        return [t.upper() for t in texts]
+
+
+def test_concurrent_callers_share_batches():
+    model = SlowModel()
+    batcher = MicroBatcher("test_model", model, max_batch_size=8, max_wait=0.05)
+    texts = [f"text {i}" for i in range(16)]
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(batcher.run, texts))
+
+    # Every caller gets its own result, in its own slot
+    assert results == [t.upper() for t in texts]
+    assert sum(model.batches) == 16
+    assert max(model.batches) <= 8
+    assert len(model.batches) < 16
+    assert INFERENCE_BATCH_SIZE.get_count(model="test_model") == len(model.batches)
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    def broken(texts):
+        raise ValueError("forward failed")
+
+    batcher = MicroBatcher("broken_model", broken, max_batch_size=4, max_wait=0.01)
+    futures = [batcher.submit(t) for t in ("a", "b", "c")]
+    for future in futures:
+        try:
+            future.result(timeout=2)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+    # Worker keeps serving after a failed batch
+    batcher.run_batch = lambda texts: texts
+    assert batcher.run("ok", timeout=2) == "ok"
+
+
+def test_disabled_runs_inline_and_async_api():
+    model = SlowModel()
+    batcher = MicroBatcher("inline_model", model, enabled=False)
+    assert batcher.run_many(["x", "y"]) == ["X", "Y"]
+    assert model.batches == [1, 1]
+    assert batcher._worker is None
+
+    enabled = MicroBatcher("async_model", model, max_wait=0.01)
+    assert asyncio.run(enabled.run_async("z")) == "Z"
+
+
+if __name__ == "__main__":
+    test_concurrent_callers_share_batches()
+    test_errors_reach_every_caller_in_the_batch()
+    test_disabled_runs_inline_and_async_api()
+    print("✅ Micro-batching tests passed")
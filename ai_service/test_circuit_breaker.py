@@ -0,0 +1,150 @@
+"""
+Tests for per-provider circuit breakers and health-ordered auto mode.
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model_adapters.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, HALF_OPEN, OPEN
+from observability.metrics import LLM_BREAKER_STATE
+from test_hedging import StubProvider, _selector
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _breaker(clock: FakeClock, name: str = "test", **kwargs) -> CircuitBreaker:
+    settings = dict(window_seconds=60, min_requests=4, failure_rate=0.5,
+                    slow_call_seconds=10, open_seconds=30, half_open_probes=1)
+    settings.update(kwargs)
+    return CircuitBreaker(name, clock=clock, **settings)
+
+
+def test_opens_after_failure_rate_and_refuses_calls():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for ok in (True, False, True, False):
+        breaker.before_call()
+        breaker.record(ok, 0.5)
+
+    assert breaker.state == OPEN
+    assert breaker.health() == 0.0
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_slow_calls_count_against_the_provider():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(4):
+        breaker.record(True, 15.0)
+    assert breaker.state == OPEN
+
+
+def test_old_failures_leave_the_window():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(3):
+        breaker.record(False, 1.0)
+    clock.now += 61
+    breaker.record(False, 1.0)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_closes_or_reopens():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(4):
+        breaker.record(False, 1.0)
+    assert breaker.state == OPEN and not breaker.probe_due()
+
+    clock.now += 31
+    assert breaker.probe_due()
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record(False, 1.0)
+    assert breaker.state == OPEN
+
+    clock.now += 31
+    breaker.before_call()
+    breaker.record(True, 1.0)
+    assert breaker.state == CLOSED
+    assert breaker.health() > 0.9
+
+
+def test_cancelled_probe_frees_the_slot():
+    clock = FakeClock()
+    breaker = _breaker(clock)
+    for _ in range(4):
+        breaker.record(False, 1.0)
+    clock.now += 31
+    breaker.before_call()
+    breaker.record(None, 0.1)
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+
+
+def test_state_is_exported_as_metric():
+    clock = FakeClock()
+    breaker = _breaker(clock, name="metric-test")
+    assert LLM_BREAKER_STATE.get(provider="metric-test") == 0
+    for _ in range(4):
+        breaker.record(False, 1.0)
+    assert LLM_BREAKER_STATE.get(provider="metric-test") == 2
+
+
+def test_outage_costs_probes_not_timeouts():
+    clock = FakeClock()
+    gemini = StubProvider("gemini", 0.0, error=ConnectionError("down"))
+    openrouter = StubProvider("openrouter", 0.0)
+    selector = _selector(gemini, openrouter)
+    selector.breakers = {name: _breaker(clock, name=name) for name in ("gemini", "openrouter")}
+
+    async def scenario(n, **kwargs):
+        return [await selector.generate("q", task_type="summary", **kwargs) for _ in range(n)]
+
+    replies = asyncio.run(scenario(10, provider="gemini"))
+    # Gemini was only called until its breaker opened; later calls fail fast
+    assert gemini.calls == 4
+    assert all("circuit open" in reply for reply in replies[4:])
+    assert selector.get_status()["gemini"]["state"] == OPEN
+
+    # Auto mode routes straight to OpenRouter meanwhile
+    assert asyncio.run(scenario(3)) == ["openrouter: q"] * 3
+    assert gemini.calls == 4
+
+    # After the open period one probe goes to Gemini; it has recovered
+    gemini.error = None
+    clock.now += 31
+    assert asyncio.run(scenario(2)) == ["gemini: q"] * 2
+    assert selector.breakers["gemini"].state == CLOSED
+
+
+def test_degraded_provider_is_ordered_last():
+    clock = FakeClock()
+    gemini, openrouter = StubProvider("gemini"), StubProvider("openrouter")
+    selector = _selector(gemini, openrouter)
+    selector.breakers = {name: _breaker(clock, name=name, min_requests=100)
+                         for name in ("gemini", "openrouter")}
+    for ok in (True, False, False):
+        selector.breakers["gemini"].record(ok, 1.0)
+
+    order = selector._by_health([("gemini", gemini), ("openrouter", openrouter)])
+    assert [name for name, _ in order] == ["openrouter", "gemini"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
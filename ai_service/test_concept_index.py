@@ -0,0 +1,70 @@
+"""
+Tests for the IVF / IVF-PQ concept index.
+Uses synthetic clustered embeddings; no model needed.
+"""
+
+import sys
+import os
+import tempfile
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+np = pytest.importorskip("numpy")
+
+from model_adapters.concept_index import ConceptIndex, brute_force_topk, recall_at_k
+
+
+def make_data(n=4000, dim=64, clusters=40, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, n)] + 0.8 * rng.standard_normal((n, dim))
+    queries = vectors[rng.choice(n, 50, replace=False)] + 0.3 * rng.standard_normal((50, dim))
+    return vectors.astype(np.float32), queries.astype(np.float32), [f"concept_{i}" for i in range(n)]
+
+
+def test_ivf_recall_against_brute_force():
+    vectors, queries, names = make_data()
+    index = ConceptIndex(n_probe=8).build(vectors, names)
+
+    assert recall_at_k(index, vectors, queries, k=10) >= 0.9
+
+    # Probing every list is exact search
+    exact = brute_force_topk(vectors, queries, 10)
+    ids, _ = index.search(queries[0], k=10, n_probe=index.n_lists)
+    assert ids.tolist() == exact[0].tolist()
+
+    # More probes never hurt recall
+    assert recall_at_k(index, vectors, queries, 10, n_probe=1) <= recall_at_k(index, vectors, queries, 10, n_probe=16)
+
+
+def test_pq_index_with_refine():
+    vectors, queries, names = make_data()
+    index = ConceptIndex(n_probe=8, pq_subvectors=16).build(vectors, names)
+    assert index.codes.dtype == np.uint8
+    assert recall_at_k(index, vectors, queries, k=10) >= 0.8
+
+
+def test_save_and_load_round_trip():
+    vectors, queries, names = make_data(n=1000)
+    index = ConceptIndex(n_probe=4).build(vectors, names)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index.save(tmp)
+        loaded = ConceptIndex.load(tmp)
+        assert isinstance(loaded.vectors, np.memmap)
+        assert loaded.n_probe == 4
+        for q in queries[:5]:
+            assert loaded.query(q, k=5) == index.query(q, k=5)
+
+    # Exact hit on a stored vector
+    name, score = index.query(vectors[123], k=1)[0]
+    assert name == "concept_123" and score > 0.999
+
+
+if __name__ == "__main__":
+    test_ivf_recall_against_brute_force()
+    test_pq_index_with_refine()
+    test_save_and_load_round_trip()
+    print("✅ Concept index tests passed")
@@ -0,0 +1,90 @@
+"""
+Tests for the byte-bounded embedding cache.
+"""
+
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model_adapters.embedding_cache import EmbeddingCache
+from observability.metrics import CACHE_REQUESTS_TOTAL, EMBEDDING_CACHE_BYTES
+
+
+def _vector(seed, dim=64):
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+
+def test_lru_stays_within_byte_budget():
+    one_entry = EmbeddingCache._entry_bytes("text 0", _vector(0).astype(np.float16))
+    cache = EmbeddingCache("test_lru", max_bytes=one_entry * 3, disk_dir="")
+
+    for i in range(3):
+        cache.put(f"text {i}", _vector(i))
+    assert cache.get("text 0") is not None  # now most recently used
+    cache.put("text 3", _vector(3))
+
+    assert len(cache) == 3
+    assert cache.nbytes <= cache.max_bytes
+    assert cache.get("text 1") is None  # least recently used went first
+    assert cache.get("text 0") is not None
+    assert EMBEDDING_CACHE_BYTES.get(cache="test_lru") == cache.nbytes
+
+
+def test_float16_storage_and_hit_miss_metrics():
+    cache = EmbeddingCache("test_fp16", disk_dir="")
+    vector = _vector(7)
+    cache.put_many(["fever"], [vector])
+
+    assert cache._entries["fever"].dtype == np.float16
+    cached, missing = cache.get_many(["fever", "cough"])
+    assert missing is None
+    assert cached.dtype == np.float32
+    cosine = cached @ vector / (np.linalg.norm(cached) * np.linalg.norm(vector))
+    assert cosine > 0.9999
+    assert CACHE_REQUESTS_TOTAL.get(cache="test_fp16", result="hit") == 1
+    assert CACHE_REQUESTS_TOTAL.get(cache="test_fp16", result="miss") == 1
+
+
+def test_disk_tier_survives_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        first = EmbeddingCache("test_disk", disk_dir=tmp)
+        first.put_many(["fever", "cough"], [_vector(1), _vector(2)])
+        first.close()
+
+        second = EmbeddingCache("test_disk", disk_dir=tmp)
+        assert len(second) == 0
+        rows = second.get_many(["cough", "headache"])
+        assert rows[1] is None
+        assert np.allclose(rows[0], _vector(2), atol=1e-2)
+        assert "cough" in second._entries  # promoted to memory
+        assert CACHE_REQUESTS_TOTAL.get(cache="test_disk", result="disk_hit") == 1
+        second.close()
+
+
+def test_namespaces_keep_models_and_backends_apart():
+    with tempfile.TemporaryDirectory() as tmp:
+        fp32 = EmbeddingCache("test_ns", disk_dir=tmp, namespace="sapbert|fp32")
+        fp32.put("fever", _vector(1))
+        assert fp32.get("fever") is not None
+        fp32.set_namespace("sapbert|int8")
+        assert len(fp32) == 0
+        assert fp32.get("fever") is None
+        fp32.close()
+
+        restarted = EmbeddingCache("test_ns", disk_dir=tmp, namespace="fallback|fp32")
+        assert restarted.get("fever") is None
+        restarted.set_namespace("sapbert|fp32")
+        assert np.allclose(restarted.get("fever"), _vector(1), atol=1e-2)
+        restarted.close()
+
+
+if __name__ == "__main__":
+    test_lru_stays_within_byte_budget()
+    test_float16_storage_and_hit_miss_metrics()
+    test_disk_tier_survives_restart()
+    test_namespaces_keep_models_and_backends_apart()
+    print("✅ Embedding cache tests passed")
@@ -0,0 +1,153 @@
+"""
+Tests for SapBERT candidate embedding storage.
+Runs without the SapBERT model: embeddings come from a deterministic fake.
+"""
+
+import sys
+import os
+import tempfile
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+np = pytest.importorskip("numpy")
+
+import model_adapters.sapbert_helper as sapbert_helper
+from model_adapters.sapbert_helper import SapBERTHelper, candidate_cache_path
+
+
+class FakeSapBERT(SapBERTHelper):
+    """SapBERTHelper whose forward pass is a hash-seeded embedding."""
+
+    def __init__(self):
+        super().__init__(use_api=True, hf_token="")
+        self.use_api = False
+        self.model = self.tokenizer = object()
+        self.batches = []
+
+    def _fake(self, text):
+        rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+        return rng.standard_normal(16).astype(np.float32)
+
+    def _encode(self, texts, batch_size=None):
+        self.batches.append(len(texts))
+        return np.vstack([self._fake(t) for t in texts])
+
+
+def test_candidates_are_persisted_and_memory_mapped():
+    candidates = ["fever", "headache", "cough", "nausea"]
+    with tempfile.TemporaryDirectory() as tmp:
+        original = sapbert_helper.EMBEDDING_CACHE_DIR
+        sapbert_helper.EMBEDDING_CACHE_DIR = sapbert_helper.Path(tmp)
+        try:
+            first = FakeSapBERT()
+            first.cache_candidates(candidates)
+            assert first.batches == [4]
+            assert candidate_cache_path(candidates).exists()
+
+            # Same list in a different order maps to the same file
+            second = FakeSapBERT()
+            second.cache_candidates(list(reversed(candidates)))
+            assert second.batches == []
+            assert isinstance(second.candidate_matrix, np.memmap)
+            assert np.allclose(second.candidate_matrix, first.candidate_matrix)
+
+            # ensure_candidates is a no-op once loaded
+            second.ensure_candidates(candidates)
+            assert second.batches == []
+        finally:
+            sapbert_helper.EMBEDDING_CACHE_DIR = original
+
+
+def test_normalize_batch_matches_brute_force_cosine():
+    candidates = ["fever", "headache", "cough", "nausea", "chest pain", "rash"]
+    helper = FakeSapBERT()
+    helper.cache_candidates(candidates, persist=False)
+
+    # Rows are stored unit-normalized
+    assert np.allclose(np.linalg.norm(helper.candidate_matrix, axis=1), 1.0, atol=1e-5)
+
+    queries = ["cough", "my head hurts", "rash"]
+    results = helper.normalize_batch(queries, threshold=-1.0)
+    for query, result in zip(queries, results):
+        q = helper._fake(query)
+        expected = max(
+            candidates,
+            key=lambda c: np.dot(q, helper._fake(c)) / (np.linalg.norm(q) * np.linalg.norm(helper._fake(c)))
+        )
+        assert result == expected
+        assert helper.normalize(query, threshold=-1.0) == expected
+
+    # Exact matches score ~1.0; an impossible threshold rejects everything
+    assert helper.top_k("cough", k=2)[0][0] == "cough"
+    assert helper.normalize_batch(queries, threshold=1.01) == [None, None, None]
+
+    # Explicit candidate lists may include uncached names
+    assert helper.normalize("fatigue", candidates=["fatigue", "fever"], threshold=0.99) == "fatigue"
+
+
+def test_similarity_table_reranks_without_model_calls():
+    symptoms = ["fever", "headache", "cough", "nausea", "chest pain"]
+    diseases = ["Influenza", "Migraine", "Pneumonia", "Gastroenteritis"]
+    with tempfile.TemporaryDirectory() as tmp:
+        original = sapbert_helper.EMBEDDING_CACHE_DIR
+        sapbert_helper.EMBEDDING_CACHE_DIR = sapbert_helper.Path(tmp)
+        try:
+            helper = FakeSapBERT()
+            helper.ensure_similarity_table(symptoms, diseases)
+            assert helper.similarity_table.shape == (len(symptoms), len(diseases))
+            assert sapbert_helper.similarity_table_path(symptoms, diseases).exists()
+
+            # Canonical inputs: pure table lookup, no forward pass
+            helper.batches.clear()
+            ranked = helper.encode_differential_diagnosis(["fever", "cough"], diseases)
+            assert helper.batches == []
+
+            # Same scores as embedding everything on the fly
+            s = np.vstack([helper._fake(x) for x in ("fever", "cough")])
+            s /= np.linalg.norm(s, axis=1, keepdims=True)
+            profile = s.mean(axis=0)
+            for row in ranked:
+                d = helper._fake(row["disease"])
+                expected = profile @ d / (np.linalg.norm(profile) * np.linalg.norm(d))
+                assert abs(row["score"] - expected) < 1e-5
+            assert [r["score"] for r in ranked] == sorted((r["score"] for r in ranked), reverse=True)
+
+            # Unknown symptoms fall back to embedding; table reloads from disk
+            assert len(helper.encode_differential_diagnosis(["my head hurts"], diseases)) == len(diseases)
+            reloaded = FakeSapBERT()
+            reloaded.ensure_similarity_table(symptoms, diseases)
+            assert reloaded.batches == []
+            assert np.allclose(reloaded.similarity_table, helper.similarity_table)
+        finally:
+            sapbert_helper.EMBEDDING_CACHE_DIR = original
+
+
+def test_persisted_matrices_are_keyed_by_backend():
+    candidates, diseases = ["fever", "cough"], ["Influenza"]
+    original = os.environ.get("SAPBERT_BACKEND")
+    try:
+        os.environ["SAPBERT_BACKEND"] = "fp32"
+        fp32 = (candidate_cache_path(candidates), sapbert_helper.similarity_table_path(candidates, diseases))
+        os.environ["SAPBERT_BACKEND"] = "int8"
+        int8 = (candidate_cache_path(candidates), sapbert_helper.similarity_table_path(candidates, diseases))
+        helper_backend = FakeSapBERT().backend
+    finally:
+        if original is None:
+            os.environ.pop("SAPBERT_BACKEND", None)
+        else:
+            os.environ["SAPBERT_BACKEND"] = original
+
+    # An fp32 matrix is never memory-mapped for int8 (or API) query vectors
+    assert fp32[0] != int8[0] and fp32[1] != int8[1]
+    assert helper_backend == "int8"
+    assert candidate_cache_path(candidates, backend="api") not in (fp32[0], int8[0])
+
+
+if __name__ == "__main__":
+    test_candidates_are_persisted_and_memory_mapped()
+    test_normalize_batch_matches_brute_force_cosine()
+    test_similarity_table_reranks_without_model_calls()
+    test_persisted_matrices_are_keyed_by_backend()
+    print("✅ Embedding storage tests passed")
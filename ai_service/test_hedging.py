@@ -0,0 +1,150 @@
+"""
+Tests for hedged provider racing in ModelSelector, against stub providers
+with injected latency.
+"""
+
+import sys
+import os
+import time
+import asyncio
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model_adapters.hedging import HedgePolicy, LatencyTracker, ProvidersExhausted, race
+from model_adapters.model_selector import BaseModelAdapter, ModelSelector, RateLimitError
+
+
+class StubProvider(BaseModelAdapter):
+    """Answers after `delay` seconds, or raises `error`; records cancellation."""
+
+    def __init__(self, name: str, delay: float = 0.0, error: Exception = None):
+        self.name, self.delay, self.error = name, delay, error
+        self.calls = 0
+        self.cancelled = 0
+
+    def is_available(self) -> bool:
+        return True
+
+    async def generate(self, prompt: str, **kwargs) -> str:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        return f"{self.name}: {prompt}"
+
+
+def _selector(gemini: StubProvider, openrouter: StubProvider, **policy) -> ModelSelector:
+    selector = ModelSelector()
+    selector.gemini_adapter, selector.openrouter_adapter = gemini, openrouter
+    selector.local_adapter = StubProvider("local")
+    selector.use_gemini = selector.use_openrouter = selector.use_local = True
+    selector.hedge_policy = HedgePolicy(**{"default_delay": 0.1, "budget": 2.0, **policy})
+    return selector
+
+
+def _timed(coro):
+    start = time.perf_counter()
+    result = asyncio.run(coro)
+    return result, time.perf_counter() - start
+
+
+def test_fast_primary_is_not_hedged():
+    gemini, openrouter = StubProvider("gemini", 0.01), StubProvider("openrouter", 0.01)
+    selector = _selector(gemini, openrouter)
+
+    reply, _ = _timed(selector.generate("summarize", task_type="summary"))
+
+    assert reply == "gemini: summarize"
+    assert openrouter.calls == 0
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    gemini, openrouter = StubProvider("gemini", 5.0), StubProvider("openrouter", 0.05)
+    selector = _selector(gemini, openrouter)
+
+    reply, elapsed = _timed(selector.generate("summarize", task_type="summary"))
+
+    assert reply == "openrouter: summarize"
+    # hedge delay (0.1) + fallback latency (0.05), nowhere near the primary's 5 s
+    assert elapsed < 1.0
+    assert gemini.cancelled == 1
+
+
+def test_failing_primary_starts_fallback_immediately():
+    gemini = StubProvider("gemini", 0.0, error=RateLimitError("429"))
+    openrouter = StubProvider("openrouter", 0.05)
+    selector = _selector(gemini, openrouter, default_delay=5.0)
+
+    reply, elapsed = _timed(selector.generate("chat", task_type="reasoning"))
+
+    assert reply == "openrouter: chat"
+    assert elapsed < 1.0
+
+
+def test_budget_caps_total_time_and_falls_back_to_local():
+    gemini, openrouter = StubProvider("gemini", 5.0), StubProvider("openrouter", 5.0)
+    selector = _selector(gemini, openrouter, budget=0.3)
+
+    reply, elapsed = _timed(selector.generate("summarize this report", task_type="summary"))
+
+    assert elapsed < 1.5
+    assert gemini.cancelled == openrouter.cancelled == 1
+    assert reply == "local: summarize this report"
+
+
+def test_race_raises_when_every_provider_fails():
+    async def boom():
+        raise ConnectionError("down")
+
+    policy = HedgePolicy(default_delay=0.1, budget=1.0)
+    with pytest.raises(ProvidersExhausted) as info:
+        asyncio.run(race([("a", boom), ("b", boom)], policy))
+    assert [name for name, _ in info.value.errors] == ["a", "b"]
+    assert not info.value.timed_out
+
+
+def test_hedge_delay_follows_recent_latency_percentile():
+    tracker = LatencyTracker()
+    policy = HedgePolicy(tracker, percentile=95, min_delay=0.05, max_delay=5.0,
+                         default_delay=3.0, min_samples=20)
+    assert policy.delay_for("gemini") == 3.0
+
+    for i in range(100):
+        tracker.observe("gemini", 0.2 if i < 95 else 4.0)
+    assert policy.delay_for("gemini") == pytest.approx(0.2)
+
+    for _ in range(200):
+        tracker.observe("gemini", 9.0)
+    assert policy.delay_for("gemini") == 5.0
+
+
+def test_disabled_hedging_is_sequential():
+    gemini, openrouter = StubProvider("gemini", 0.3), StubProvider("openrouter", 0.01)
+    selector = _selector(gemini, openrouter, enabled=False)
+
+    reply, _ = _timed(selector.generate("summarize", task_type="summary"))
+
+    assert reply == "gemini: summarize"
+    assert openrouter.calls == 0
+
+
+def test_selector_learns_provider_latency():
+    gemini, openrouter = StubProvider("gemini", 0.01), StubProvider("openrouter", 0.01)
+    selector = _selector(gemini, openrouter)
+
+    async def scenario():
+        for _ in range(3):
+            await selector.generate("q", task_type="summary")
+
+    asyncio.run(scenario())
+    assert selector.hedge_policy.tracker.count("gemini") == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,180 @@
+"""
+Tests for the pooled LLM provider HTTP clients, against a local stub server.
+"""
+
+import sys
+import os
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+pytest.importorskip("httpx")
+
+import model_adapters.http_client as http_client
+from model_adapters.http_client import ProviderClients
+import model_adapters.model_selector as model_selector
+from model_adapters.model_selector import OpenRouterModelAdapter, RateLimitError
+
+
+class StubLLMServer:
+    """OpenAI-style /chat/completions stub that records client connections."""
+
+    def __init__(self, reply: str = "stub reply", status: int = 200, delay: float = 0.0,
+                 trickle: float = 0.0):
+        self.reply, self.status, self.delay = reply, status, delay
+        # Seconds between body bytes: a provider that never stalls long enough for a read timeout
+        self.trickle = trickle
+        self.connections = set()
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.connections.add(self.client_address)
+                stub.requests.append(body)
+                time.sleep(stub.delay)
+                data = json.dumps({"choices": [{"message": {"content": stub.reply}}]}).encode()
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if not stub.trickle:
+                    self.wfile.write(data)
+                    return
+                try:
+                    for i in range(len(data)):
+                        self.wfile.write(data[i:i + 1])
+                        self.wfile.flush()
+                        time.sleep(stub.trickle)
+                except OSError:
+                    pass  # client gave up
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _adapter(stub: StubLLMServer) -> OpenRouterModelAdapter:
+    adapter = OpenRouterModelAdapter(api_key="test-key")
+    adapter.base_url = stub.url
+    return adapter
+
+
+def test_requests_reuse_one_keepalive_connection(monkeypatch):
+    stub = StubLLMServer()
+    monkeypatch.setattr(model_selector, "HTTP_CLIENTS", ProviderClients(max_connections=4))
+    adapter = _adapter(stub)
+
+    async def scenario():
+        replies = [await adapter.generate(f"question {i}") for i in range(5)]
+        await model_selector.HTTP_CLIENTS.aclose()
+        return replies
+
+    try:
+        assert asyncio.run(scenario()) == ["stub reply"] * 5
+        assert len(stub.requests) == 5
+        assert len(stub.connections) == 1
+    finally:
+        stub.close()
+
+
+def test_pool_limit_and_rate_limit_status(monkeypatch):
+    stub = StubLLMServer(delay=0.05)
+    monkeypatch.setattr(model_selector, "HTTP_CLIENTS", ProviderClients(max_connections=2))
+    adapter = _adapter(stub)
+
+    async def scenario():
+        await asyncio.gather(*(adapter.generate("q") for _ in range(6)))
+        stub.status = 429
+        try:
+            await adapter.generate("q")
+            assert False, "expected RateLimitError"
+        except RateLimitError:
+            pass
+        await model_selector.HTTP_CLIENTS.aclose()
+
+    try:
+        asyncio.run(scenario())
+        # Concurrent calls never open more connections than the pool allows
+        assert len(stub.connections) <= 2
+    finally:
+        stub.close()
+
+
+def test_trickling_provider_hits_the_total_deadline(monkeypatch):
+    stub = StubLLMServer(trickle=0.05)
+    monkeypatch.setattr(model_selector, "HTTP_CLIENTS", ProviderClients())
+    monkeypatch.setattr(http_client, "LLM_HTTP_TOTAL_TIMEOUT", 0.3)
+    adapter = _adapter(stub)
+
+    async def scenario():
+        start = time.monotonic()
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await adapter.generate("q")
+            with pytest.raises(asyncio.TimeoutError):
+                async for _ in adapter.stream("q"):
+                    pass
+            return time.monotonic() - start
+        finally:
+            await model_selector.HTTP_CLIENTS.aclose()
+
+    try:
+        # Bytes keep arriving well inside the read timeout; only the deadline stops it
+        assert asyncio.run(scenario()) < 1.5
+    finally:
+        stub.close()
+
+
+def test_client_is_rebuilt_per_event_loop():
+    clients = ProviderClients()
+
+    async def get():
+        return clients.get("openrouter"), clients.get("openrouter")
+
+    first_a, first_b = asyncio.run(get())
+    second, _ = asyncio.run(get())
+    assert first_a is first_b
+    assert second is not first_a
+
+
+def test_stale_clients_are_closed():
+    clients = ProviderClients()
+
+    async def get():
+        return clients.get("openrouter")
+
+    async def replace_and_shut_down():
+        client = clients.get("openrouter")
+        await clients.aclose()
+        return client
+
+    stale = asyncio.run(get())
+    current = asyncio.run(replace_and_shut_down())
+    # Replacing a client from a finished loop closes it instead of leaking its pool
+    assert stale.is_closed and current.is_closed
+
+    # Shutdown also closes clients left behind by other loops
+    leftover = asyncio.run(get())
+    asyncio.run(clients.aclose())
+    assert leftover.is_closed
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,250 @@
+"""Tests for the Idempotency-Key response cache."""
+
+import sys
+import os
+import time
+import asyncio
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from serving.session_store import SessionStore
+from serving.idempotency import IdempotencyCache, IdempotencyConflict, IdempotencyInProgress
+
+
+def _memory_store() -> SessionStore:
+    return SessionStore(host="127.0.0.1", port=1)  # unreachable -> in-memory
+
+
+def test_retry_replays_first_response():
+    cache = IdempotencyCache(_memory_store())
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"session_id": f"s{len(calls)}"}
+
+    async def scenario():
+        first = await cache.run("k1", "start", {"text": "fever"}, compute)
+        second = await cache.run("k1", "start", {"text": "fever"}, compute)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second == {"session_id": "s1"}
+    assert len(calls) == 1
+
+
+def test_concurrent_duplicates_are_coalesced():
+    cache = IdempotencyCache(_memory_store())
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    async def scenario():
+        return await asyncio.gather(*[
+            cache.run("k2", "next", {"answer": "yes"}, compute) for _ in range(5)
+        ])
+
+    results = asyncio.run(scenario())
+    assert all(r == {"ok": True} for r in results)
+    assert len(calls) == 1
+
+
+def test_key_reuse_with_different_body_is_rejected():
+    cache = IdempotencyCache(_memory_store())
+
+    async def compute():
+        return {"ok": True}
+
+    async def scenario():
+        await cache.run("k3", "start", {"text": "fever"}, compute)
+        await cache.run("k3", "start", {"text": "cough"}, compute)
+
+    try:
+        asyncio.run(scenario())
+        assert False, "expected IdempotencyConflict"
+    except IdempotencyConflict:
+        pass
+
+
+def test_errors_are_not_cached():
+    cache = IdempotencyCache(_memory_store())
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("transient")
+        return {"ok": True}
+
+    async def scenario():
+        try:
+            await cache.run("k4", "next", {}, compute)
+        except RuntimeError:
+            pass
+        return await cache.run("k4", "next", {}, compute)
+
+    assert asyncio.run(scenario()) == {"ok": True}
+    assert len(calls) == 2
+
+
+class FailingStore(SessionStore):
+    """Redis that errors on every call (reads return None, writes fail)."""
+
+    def _get(self, key):
+        return None
+
+    def _set_if_absent(self, key, value, ttl):
+        return False
+
+
+def test_store_errors_bypass_the_cache_instead_of_stalling():
+    cache = IdempotencyCache(FailingStore(host="127.0.0.1", port=1), wait_timeout=5)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"ok": True}
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        result = await cache.run("k5", "start", {}, compute)
+        return result, loop.time() - start
+
+    result, elapsed = asyncio.run(scenario())
+    assert result == {"ok": True} and len(calls) == 1
+    assert elapsed < 1.0
+
+
+def test_start_fallback_reply_is_not_replayed():
+    from fastapi.testclient import TestClient
+    import app as app_module
+
+    engine = app_module.elimination_engine
+    original = engine.extract_symptoms
+    calls = []
+
+    def flaky(text):
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("extraction backend down")
+        return original(text)
+
+    engine.extract_symptoms = flaky
+    try:
+        client = TestClient(app_module.app)
+        body = {"text": "I have a fever and a cough", "user_id": "u1"}
+        headers = {"Idempotency-Key": "start-retry"}
+        first = client.post("/start", json=body, headers=headers).json()
+        second = client.post("/start", json=body, headers=headers).json()
+    finally:
+        engine.extract_symptoms = original
+
+    assert first["safe_summary"].startswith("**System Error:**")
+    # The retry ran the triage again instead of replaying the stored failure
+    assert not second["safe_summary"].startswith("**System Error:**")
+    assert len(calls) == 2
+
+
+def test_pending_marker_outlives_its_ttl_while_computing():
+    store = _memory_store()
+    first = IdempotencyCache(store, pending_ttl=0.06, wait_timeout=0.02)
+    other_worker = IdempotencyCache(store, pending_ttl=0.06, wait_timeout=0.02)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.3)
+        return {"ok": True}
+
+    async def scenario():
+        running = asyncio.ensure_future(first.run("k7", "start", {}, compute))
+        await asyncio.sleep(0.2)
+        # Several pending TTLs later the marker is still held: a retry waits
+        # (and gives up with 409) instead of starting a second execution
+        try:
+            await other_worker.run("k7", "start", {}, compute)
+            assert False, "expected IdempotencyInProgress"
+        except IdempotencyInProgress:
+            pass
+        return await running
+
+    assert asyncio.run(scenario()) == {"ok": True}
+    assert len(calls) == 1
+    assert store.get_json("idempotency:start:k7")["status"] == "done"
+
+
+class SlowStore(SessionStore):
+    """Store whose every call costs a `delay`-second round trip, like a remote Redis."""
+
+    def __init__(self, delay):
+        super().__init__(host="127.0.0.1", port=1)
+        self.delay = delay
+
+    def _get(self, key):
+        time.sleep(self.delay)
+        return super()._get(key)
+
+    def _set_if_absent(self, key, value, ttl):
+        time.sleep(self.delay)
+        return super()._set_if_absent(key, value, ttl)
+
+
+def test_store_round_trips_do_not_block_the_loop():
+    cache = IdempotencyCache(SlowStore(delay=0.1))
+
+    async def compute():
+        return {"ok": True}
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await cache.run("k6", "start", {}, compute)
+        task.cancel()
+        return ticks
+
+    # ~0.2 s of store round trips; blocking calls would leave ticks at 0
+    assert asyncio.run(scenario()) >= 5
+
+
+def test_memory_fallback_sweeps_expired_keys():
+    store = _memory_store()
+    for i in range(100):
+        store.set_if_absent(f"idempotency:start:{i}", "x", ttl=0.01)
+    time.sleep(0.02)
+    store._next_sweep = 0.0
+    store.set("other", "y")
+    assert list(store._memory) == ["other"]
+
+
+def test_connect_probes_once_and_falls_back_to_memory():
+    store = SessionStore(host="127.0.0.1", port=1, connect_timeout=0.2)
+    start = time.perf_counter()
+    assert store.connect() == "memory"
+    assert time.perf_counter() - start < 1.0
+    assert store.connect() == "memory" and store.backend == "memory"
+
+
+if __name__ == "__main__":
+    test_retry_replays_first_response()
+    test_concurrent_duplicates_are_coalesced()
+    test_key_reuse_with_different_body_is_rejected()
+    test_errors_are_not_cached()
+    test_store_errors_bypass_the_cache_instead_of_stalling()
+    test_start_fallback_reply_is_not_replayed()
+    test_pending_marker_outlives_its_ttl_while_computing()
+    test_store_round_trips_do_not_block_the_loop()
+    test_memory_fallback_sweeps_expired_keys()
+    test_connect_probes_once_and_falls_back_to_memory()
+    print("✅ Idempotency tests passed")
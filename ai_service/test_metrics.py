@@ -0,0 +1,54 @@
+"""Tests for the Prometheus-style metrics registry."""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from observability.metrics import MetricsRegistry, REGISTRY, ENGINE_PHASE_SECONDS
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    hist = registry.histogram("demo_seconds", "Demo", ["route"], buckets=(0.1, 1.0))
+    hist.observe(0.05, route="/start")
+    hist.observe(0.5, route="/start")
+    hist.observe(5.0, route="/start")
+
+    text = registry.render()
+    assert 'demo_seconds_bucket{route="/start",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{route="/start",le="1"} 2' in text
+    assert 'demo_seconds_bucket{route="/start",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{route="/start"} 3' in text
+
+
+def test_counter_and_collector():
+    registry = MetricsRegistry()
+    counter = registry.counter("demo_total", "Demo", ["outcome"])
+    gauge = registry.gauge("demo_depth", "Demo")
+    registry.register_collector(lambda: gauge.set(7))
+    counter.inc(outcome="ok")
+    counter.inc(2, outcome="ok")
+
+    text = registry.render()
+    assert 'demo_total{outcome="ok"} 3' in text
+    assert "demo_depth 7" in text
+
+
+def test_engine_phases_are_recorded():
+    from engines.symptom_elimination import SymptomEliminationEngine
+
+    engine = SymptomEliminationEngine()
+    before = ENGINE_PHASE_SECONDS.get_count(phase="posterior")
+    engine.start(engine.extract_symptoms("fever and cough")["symptoms"])
+
+    assert ENGINE_PHASE_SECONDS.get_count(phase="posterior") > before
+    assert ENGINE_PHASE_SECONDS.get_count(phase="extraction") >= 1
+    assert 'engine_phase_seconds_count{phase="ig_selection"}' in REGISTRY.render()
+
+
+if __name__ == "__main__":
+    test_histogram_renders_cumulative_buckets()
+    test_counter_and_collector()
+    test_engine_phases_are_recorded()
+    print("✅ Metrics tests passed")
@@ -0,0 +1,98 @@
+"""
+Tests for the shared model registry.
+"""
+
+import sys
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model_adapters.registry import ModelRegistry
+from observability.metrics import MODEL_EVICTIONS_TOTAL
+
+
+class Holder:
+    """Stands in for an adapter holding a reference to a shared model."""
+
+    def __init__(self):
+        self.model = None
+
+    def release(self):
+        self.model = None
+
+
+def test_concurrent_first_use_loads_once():
+    registry = ModelRegistry(idle_seconds=0)
+    loads = []
+    lock = threading.Lock()
+
+    def loader():
+        with lock:
+            loads.append(1)
+        time.sleep(0.05)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        models = list(pool.map(lambda _: registry.get("test/model|fp32|cpu", loader), range(8)))
+
+    assert len(loads) == 1
+    assert all(m is models[0] for m in models)
+    assert [s["model"] for s in registry.stats()] == ["test/model|fp32|cpu"]
+
+
+def test_failed_load_is_not_cached():
+    registry = ModelRegistry(idle_seconds=0)
+
+    def broken():
+        raise OSError("weights not found")
+
+    try:
+        registry.get("test/broken", broken)
+        assert False, "expected OSError"
+    except OSError:
+        pass
+    assert "test/broken" not in registry
+    assert registry.get("test/broken", lambda: "loaded") == "loaded"
+
+
+def test_idle_eviction_releases_every_holder():
+    registry = ModelRegistry(idle_seconds=0)
+    first, second = Holder(), Holder()
+    first.model = registry.get("test/idle", object, on_evict=first.release)
+    second.model = registry.get("test/idle", object, on_evict=second.release)
+    assert first.model is second.model
+    assert registry.stats()[0]["users"] == 2
+
+    registry.touch("test/idle")
+    assert registry.evict_idle(max_idle=60) == []
+    assert registry.evict_idle(max_idle=0) == ["test/idle"]
+    assert first.model is None and second.model is None
+    assert "test/idle" not in registry
+    assert MODEL_EVICTIONS_TOTAL.get(model="test/idle") == 1
+
+
+def test_idle_eviction_skips_a_model_used_since_the_scan():
+    registry = ModelRegistry(idle_seconds=0)
+    holder = Holder()
+    holder.model = registry.get("test/busy", object, on_evict=holder.release)
+    registry._entries["test/busy"].last_used -= 120
+
+    # A request touches the model between evict_idle's scan and the eviction
+    registry.touch("test/busy")
+    assert registry.evict("test/busy", max_idle=60) is False
+    assert holder.model is not None and "test/busy" in registry
+
+    registry._entries["test/busy"].last_used -= 120
+    assert registry.evict_idle(max_idle=60) == ["test/busy"]
+    assert holder.model is None
+
+
+if __name__ == "__main__":
+    test_concurrent_first_use_loads_once()
+    test_failed_load_is_not_cached()
+    test_idle_eviction_releases_every_holder()
+    test_idle_eviction_skips_a_model_used_since_the_scan()
+    print("✅ Model registry tests passed")
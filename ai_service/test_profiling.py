@@ -0,0 +1,118 @@
+"""Tests for on-demand request profiling (token guard, rate limit, report)."""
+
+import sys
+import os
+import asyncio
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from observability import profiling
+from observability.profiling import ProfileRateLimiter, ProfileStore, ProfilingMiddleware
+
+TOKEN = "s3cret"
+
+
+def _scope(token=TOKEN, flag="1"):
+    headers = [(b"x-profile", flag.encode())]
+    if token is not None:
+        headers.append((b"x-profile-token", token.encode()))
+    return {"type": "http", "method": "GET", "path": "/start", "headers": headers, "query_string": b""}
+
+
+def _middleware(per_minute=10, hold: asyncio.Event = None):
+    async def app(scope, receive, send):
+        if hold is not None:
+            await hold.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    store = ProfileStore()
+    return ProfilingMiddleware(app, store=store, limiter=ProfileRateLimiter(per_minute)), store
+
+
+async def _call(middleware, scope):
+    sent = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        sent.append(message)
+
+    await middleware(scope, receive, send)
+    return dict(sent[0]["headers"]).get(b"x-profile-id")
+
+
+def test_requires_matching_token(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", TOKEN)
+    middleware, store = _middleware()
+
+    async def scenario():
+        return [
+            await _call(middleware, _scope(token=None)),
+            await _call(middleware, _scope(token="wrong")),
+            await _call(middleware, _scope(flag="0")),
+            await _call(middleware, _scope()),
+        ]
+
+    ids = asyncio.run(scenario())
+    assert ids[:3] == [None, None, None]
+    assert ids[3] is not None and len(store.list()) == 1
+
+
+def test_disabled_without_configured_token(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", "")
+    middleware, store = _middleware()
+    assert asyncio.run(_call(middleware, _scope(token=""))) is None
+    assert store.list() == []
+
+
+def test_rate_limited_per_minute(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", TOKEN)
+    middleware, store = _middleware(per_minute=2)
+
+    async def scenario():
+        return [await _call(middleware, _scope()) for _ in range(3)]
+
+    ids = asyncio.run(scenario())
+    assert ids[0] and ids[1] and ids[2] is None
+    assert len(store.list()) == 2
+
+
+def test_concurrent_request_is_not_profiled_and_keeps_budget(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", TOKEN)
+
+    async def scenario():
+        hold = asyncio.Event()
+        middleware, store = _middleware(per_minute=2, hold=hold)
+        first = asyncio.create_task(_call(middleware, _scope()))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(_call(middleware, _scope()))
+        await asyncio.sleep(0)
+        hold.set()
+        results = [await first, await second]
+        # The rejected concurrent request must not have spent a token
+        results.append(await _call(middleware, _scope()))
+        return results
+
+    first, second, third = asyncio.run(scenario())
+    assert first is not None and second is None and third is not None
+
+
+def test_report_format(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", TOKEN)
+    middleware, store = _middleware()
+    profile_id = asyncio.run(_call(middleware, _scope())).decode()
+
+    report = store.get(profile_id)
+    assert report["path"] == "/start" and report["status"] == 200
+    assert report["duration_ms"] >= 0
+    assert {"self_time_ms_by_category", "top_functions", "top_app_functions"} <= set(report)
+    row = report["top_functions"][0]
+    assert {"function", "file", "line", "category", "ncalls", "tottime_ms", "cumtime_ms"} <= set(row)
+    assert set(store.list()[0]) == {"profile_id", "method", "path", "status", "duration_ms", "created_at"}
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main([__file__, "-q"])
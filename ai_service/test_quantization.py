@@ -0,0 +1,69 @@
+"""
+Accuracy-parity tests for the quantized inference backends.
+Uses a small randomly initialized BERT and a local vocab, so it runs offline.
+"""
+
+import sys
+import os
+import tempfile
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+import model_adapters.quantization as quantization
+from model_adapters.quantization import apply_backend, backend_for, cls_encoder, parity_report
+from bert_fixtures import SYMPTOMS, tiny_bert
+
+def test_int8_matches_fp32_top1_normalization():
+    model, tokenizer = tiny_bert()
+    quantized = apply_backend(model, "int8", "tiny-bert")
+    assert quantized is not model
+
+    report = parity_report(cls_encoder(model, tokenizer), cls_encoder(quantized, tokenizer), SYMPTOMS)
+    assert report["queries"] == len(SYMPTOMS)
+    assert report["top1_agreement"] >= 0.9
+    assert report["mean_cosine"] >= 0.98
+
+
+def test_onnx_backend_round_trip():
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+    model, tokenizer = tiny_bert()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        original = quantization.ONNX_CACHE_DIR
+        quantization.ONNX_CACHE_DIR = quantization.Path(tmp)
+        try:
+            encoder = apply_backend(model, "onnx-int8", "tiny-bert")
+            assert isinstance(encoder, quantization.OnnxEncoder)
+
+            # Same call convention as a transformers model, any batch/sequence size
+            inputs = tokenizer(["fever", "i have chest pain"], return_tensors="pt", padding=True)
+            outputs = encoder(**inputs)
+            assert tuple(outputs.last_hidden_state.shape[:2]) == tuple(inputs["input_ids"].shape)
+
+            report = parity_report(cls_encoder(model, tokenizer), cls_encoder(encoder, tokenizer), SYMPTOMS)
+            assert report["top1_agreement"] >= 0.9
+            assert report["mean_cosine"] >= 0.98
+        finally:
+            quantization.ONNX_CACHE_DIR = original
+
+
+def test_backend_selection(monkeypatch):
+    monkeypatch.setenv("SAPBERT_BACKEND", "int8")
+    assert backend_for("sapbert") == "int8"
+    monkeypatch.setenv("SAPBERT_BACKEND", "bogus")
+    assert backend_for("sapbert") == "fp32"
+
+    model, _ = tiny_bert()
+    assert apply_backend(model, "fp32") is model
+
+
+if __name__ == "__main__":
+    test_int8_matches_fp32_top1_normalization()
+    test_onnx_backend_round_trip()
+    print("✅ Quantization parity tests passed")
@@ -0,0 +1,165 @@
+"""
+Tests for the provider token-bucket limiter and the non-blocking Gemini path.
+"""
+
+import sys
+import os
+import time
+import asyncio
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from serving.rate_limit import ProviderRateLimiter, RateLimited
+from serving.session_store import SessionStore
+import model_adapters.model_selector as model_selector
+from model_adapters.model_selector import GeminiModelAdapter, RateLimitError
+
+
+def _limiter(**kwargs) -> ProviderRateLimiter:
+    # Port 1 is never Redis, so this exercises the in-memory fallback
+    return ProviderRateLimiter(store=SessionStore(host="127.0.0.1", port=1), **kwargs)
+
+
+class SlowSyncGemini:
+    """Stands in for genai.GenerativeModel with only the blocking call."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    def generate_content(self, prompt, generation_config=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        return type("Response", (), {"text": f"answer to: {prompt[-12:]}"})()
+
+
+def test_burst_then_refill():
+    limiter = _limiter()
+    limiter.set_quota("gemini", requests_per_minute=60, burst=3)
+
+    assert [limiter.try_acquire("gemini") for _ in range(3)] == [0.0, 0.0, 0.0]
+    wait = limiter.try_acquire("gemini")
+    assert 0.9 < wait <= 1.0  # one token per second at 60 RPM
+
+
+def test_zero_rpm_is_unlimited():
+    limiter = _limiter()
+    limiter.set_quota("local", requests_per_minute=0, burst=0)
+    assert all(limiter.try_acquire("local") == 0.0 for _ in range(100))
+
+
+def test_acquire_waits_for_short_refill():
+    limiter = _limiter(max_wait=1.0)
+    limiter.set_quota("openrouter", requests_per_minute=600, burst=1)  # 10 per second
+
+    async def scenario():
+        await limiter.acquire("openrouter")
+        return await limiter.acquire("openrouter")
+
+    waited = asyncio.run(scenario())
+    assert 0.05 < waited < 0.5
+
+
+def test_acquire_fails_fast_when_quota_is_far_away():
+    limiter = _limiter(max_wait=0.5)
+    limiter.set_quota("gemini", requests_per_minute=6, burst=1)  # one per 10 s
+
+    async def scenario():
+        await limiter.acquire("gemini")
+        start = time.monotonic()
+        with pytest.raises(RateLimited) as info:
+            await limiter.acquire("gemini")
+        return time.monotonic() - start, info.value
+
+    elapsed, error = asyncio.run(scenario())
+    assert elapsed < 0.1
+    assert error.retry_after > 5
+
+
+class SlowRedisStore:
+    """Session store whose Redis token-bucket script takes `delay` seconds."""
+
+    connected = True
+    use_redis = True
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.redis_client = self
+
+    def register_script(self, script):
+        def take(keys, args):
+            time.sleep(self.delay)
+            return "0"
+        return take
+
+
+def test_redis_bucket_does_not_block_event_loop():
+    limiter = _limiter()
+    limiter.use_store(SlowRedisStore(delay=0.3))
+    limiter.set_quota("gemini", requests_per_minute=60, burst=5)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await limiter.acquire("gemini")
+        task.cancel()
+        return ticks
+
+    # The loop kept running while the Lua script round trip was in flight
+    assert asyncio.run(scenario()) >= 10
+
+
+def test_slow_gemini_call_does_not_block_event_loop(monkeypatch):
+    limiter = _limiter()
+    monkeypatch.setattr(model_selector, "PROVIDER_LIMITS", limiter)
+    adapter = GeminiModelAdapter(api_key="test-key")
+    adapter._client = SlowSyncGemini(delay=0.5)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        reply = await adapter.generate("what is a fever")
+        task.cancel()
+        return reply, ticks
+
+    reply, ticks = asyncio.run(scenario())
+    assert reply.endswith("is a fever")
+    # The loop kept running other coroutines while Gemini was "thinking"
+    assert ticks >= 20
+
+
+def test_gemini_quota_exhaustion_is_a_rate_limit_error(monkeypatch):
+    limiter = _limiter(max_wait=0.1)
+    limiter.set_quota("gemini", requests_per_minute=1, burst=1)
+    monkeypatch.setattr(model_selector, "PROVIDER_LIMITS", limiter)
+    adapter = GeminiModelAdapter(api_key="test-key")
+    adapter._client = client = SlowSyncGemini(delay=0.0)
+
+    async def scenario():
+        await adapter.generate("first")
+        with pytest.raises(RateLimitError):
+            await adapter.generate("second")
+
+    asyncio.run(scenario())
+    # The second call never reached the provider
+    assert client.calls == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
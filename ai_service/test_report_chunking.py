@@ -0,0 +1,149 @@
+"""
+Tests for chunked (map-reduce) summarization of long reports.
+"""
+
+import sys
+import os
+import time
+import asyncio
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from report_analysis.chunking import split_report
+from model_adapters import model_selector as model_selector_module
+from model_adapters.response_cache import ResponseCache
+from test_hedging import StubProvider, _selector
+from test_response_cache import LABS, FINDINGS
+
+
+def _pdf_text(pages):
+    return "\n\n".join(f"--- Page {i + 1} ---\n{body}" for i, body in enumerate(pages))
+
+
+PAGES = [f"Panel {i}: Hemoglobin {9 + i}.1 g/dL\n" + "reference comment " * 20 for i in range(6)]
+
+
+class ConcurrencyStub(StubProvider):
+    """StubProvider that tracks peak concurrency and fails map prompts containing `fail_chunk`."""
+
+    def __init__(self, name, delay=0.0, fail_chunk=None):
+        super().__init__(name, delay)
+        self.active = self.peak = 0
+        self.fail_chunk = fail_chunk
+        self.prompts = []
+
+    async def generate(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        if self.fail_chunk and "REPORT SECTION" in prompt and self.fail_chunk in prompt:
+            self.calls += 1
+            raise ConnectionError("down")
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            return await super().generate(prompt, **kwargs)
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def chunked(monkeypatch):
+    monkeypatch.setattr(model_selector_module, "REPORT_MAP_REDUCE", True)
+    monkeypatch.setattr(model_selector_module, "REPORT_CHUNK_MAX_CHARS", 500)
+    monkeypatch.setattr(model_selector_module, "REPORT_MAP_CONCURRENCY", 3)
+
+
+def _selector_for(gemini):
+    selector = _selector(gemini, StubProvider("openrouter", 5.0), default_delay=5.0)
+    selector.summary_cache = ResponseCache("chunk-test")
+    return selector
+
+
+def test_split_by_page_markers():
+    assert split_report(_pdf_text(["Hb 9.1", "WBC 6.2", "PLT 250"]), max_chars=10) == [
+        "Hb 9.1", "WBC 6.2", "PLT 250"
+    ]
+    # Short pages share a chunk
+    assert split_report(_pdf_text(["Hb 9.1", "WBC 6.2", "PLT 250"]), max_chars=20) == [
+        "Hb 9.1\n\nWBC 6.2", "PLT 250"
+    ]
+
+
+def test_chunk_text_does_not_depend_on_page_number():
+    page = "Hemoglobin 9.1 g/dL\n" + "comment " * 10
+    front = split_report(_pdf_text([page, "x" * 100]), max_chars=100)
+    back = split_report(_pdf_text(["x" * 100, page]), max_chars=100)
+    assert front[0] == back[1] == page.strip()
+
+
+def test_split_packs_sections_and_bounds_size():
+    text = "CBC\nHb 9.1\n\nLIPIDS\nLDL 130\n\n" + "x" * 250
+    chunks = split_report(text, max_chars=100)
+    assert chunks[0] == "CBC\nHb 9.1\n\nLIPIDS\nLDL 130"
+    assert all(len(c) <= 100 for c in chunks)
+    assert "".join(chunks[1:]) == "x" * 250
+    assert split_report("  \n\n ", max_chars=100) == []
+
+
+def test_long_report_is_mapped_concurrently_then_reduced(chunked):
+    gemini = ConcurrencyStub("gemini", 0.05)
+    selector = _selector_for(gemini)
+
+    start = time.perf_counter()
+    result = asyncio.run(selector.summarize_report_with_meta(_pdf_text(PAGES), LABS, FINDINGS))
+    elapsed = time.perf_counter() - start
+
+    assert gemini.calls == 7  # 6 pages + reduce
+    assert gemini.peak == 3
+    reduce_prompt = gemini.prompts[-1]
+    assert "SECTION NOTES" in reduce_prompt
+    assert all(f"Panel {i}" in reduce_prompt for i in range(6))
+    assert result["provider"] == "gemini" and not result["cached"]
+    # Two waves of map calls plus the reduce, not seven sequential calls
+    assert elapsed < 0.3
+
+
+def test_reupload_recomputes_only_changed_pages(chunked):
+    gemini = ConcurrencyStub("gemini")
+    selector = _selector_for(gemini)
+    summarize = selector.summarize_report_with_meta
+
+    asyncio.run(summarize(_pdf_text(PAGES), LABS, FINDINGS))
+    again = asyncio.run(summarize(_pdf_text(PAGES), LABS, FINDINGS))
+    assert gemini.calls == 7 and again["cached"]
+
+    edited = list(PAGES)
+    edited[2] = edited[2].replace("Hemoglobin 11.1", "Hemoglobin 12.4")
+    asyncio.run(summarize(_pdf_text(edited), LABS, FINDINGS))
+    assert gemini.calls == 9  # the edited page + a new reduce
+
+
+def test_short_report_stays_single_pass(chunked):
+    gemini = ConcurrencyStub("gemini")
+    selector = _selector_for(gemini)
+    asyncio.run(selector.summarize_report_with_meta("Hemoglobin 9.1 g/dL", LABS, FINDINGS))
+    assert gemini.calls == 1
+    assert "EXTRACTED TEXT" in gemini.prompts[0]
+
+
+def test_short_multi_page_report_stays_single_pass(chunked):
+    gemini = ConcurrencyStub("gemini")
+    selector = _selector_for(gemini)
+    asyncio.run(selector.summarize_report_with_meta(_pdf_text(["Hb 9.1 g/dL", "WBC 6.2"]), LABS, FINDINGS))
+    assert gemini.calls == 1
+    assert "EXTRACTED TEXT" in gemini.prompts[0]
+
+
+def test_failed_map_step_falls_back_to_single_pass(chunked):
+    gemini = ConcurrencyStub("gemini", fail_chunk="Panel 2")
+    selector = _selector_for(gemini)
+    selector.use_openrouter = False
+
+    result = asyncio.run(selector.summarize_report_with_meta(_pdf_text(PAGES), LABS, FINDINGS))
+    assert result["provider"] == "gemini"
+    assert "EXTRACTED TEXT" in gemini.prompts[-1]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
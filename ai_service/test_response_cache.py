@@ -0,0 +1,153 @@
+"""
+Tests for the content-addressed LLM response cache used by report summaries.
+"""
+
+import sys
+import os
+import time
+import asyncio
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model_adapters.response_cache import ResponseCache
+from serving.session_store import SessionStore
+from test_hedging import StubProvider, _selector
+
+LABS = [
+    {"name": "Hemoglobin", "value": 9.1, "unit": "g/dL", "is_abnormal": True},
+    {"name": "WBC", "value": 6.2, "unit": "10^3/uL", "is_abnormal": False},
+]
+FINDINGS = [
+    {"test_name": "Hemoglobin", "value": 9.1, "unit": "g/dL", "direction": "low", "severity": "moderate"},
+]
+
+
+def _summarizing_selector(gemini: StubProvider, **cache_kwargs):
+    selector = _selector(gemini, StubProvider("openrouter", 5.0), default_delay=5.0)
+    selector.summary_cache = ResponseCache("summary-test", **cache_kwargs)
+    return selector
+
+
+def test_key_ignores_whitespace_but_not_params():
+    key = ResponseCache.key
+    base = key("Summarize  this\nreport", "auto", "m", {"temperature": 0.3})
+    assert key("Summarize this report ", "auto", "m", {"temperature": 0.3}) == base
+    assert key("Summarize this report", "auto", "m", {"temperature": 0.7}) != base
+    assert key("Summarize this report", "gemini", "m", {"temperature": 0.3}) != base
+    assert key("Summarize this report", "auto", "other", {"temperature": 0.3}) != base
+
+
+def test_lru_bound_and_ttl():
+    cache = ResponseCache("bounded", ttl=0.2, max_entries=2, backend="memory")
+    for k in ("a", "b", "c"):
+        cache.put(k, k.upper())
+    assert len(cache) == 2
+    assert cache.get("a") is None
+    assert cache.get("c") == "C"
+    time.sleep(0.25)
+    assert cache.get("c") is None
+
+
+def test_session_store_backend_falls_back_to_local_without_redis():
+    store = SessionStore(host="127.0.0.1", port=1)
+    cache = ResponseCache("shared", backend="session_store", store=store, max_entries=1)
+    cache.put("k", "v")
+    assert cache.get("k") == "v"
+    cache.put("k2", "v2")
+    assert len(cache) == 1
+
+
+class SlowRedisStore(SessionStore):
+    """Session store that behaves like a Redis `delay` seconds away."""
+
+    def __init__(self, delay):
+        super().__init__(host="127.0.0.1", port=1)
+        self.delay = delay
+        self.values = {}
+
+    @property
+    def use_redis(self):
+        return True
+
+    def get(self, key):
+        time.sleep(self.delay)
+        return self.values.get(key)
+
+    def set(self, key, value, ttl=None):
+        time.sleep(self.delay)
+        self.values[key] = value
+
+
+def test_shared_backend_does_not_block_the_loop():
+    cache = ResponseCache("slow", backend="session_store", store=SlowRedisStore(delay=0.1))
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await cache.aput("k", "v")
+        value = await cache.aget("k")
+        task.cancel()
+        return value, ticks
+
+    value, ticks = asyncio.run(scenario())
+    assert value == "v"
+    # ~0.2 s of Redis round trips; blocking calls would leave ticks at 0
+    assert ticks >= 5
+
+
+def test_repeat_report_is_served_from_cache():
+    gemini = StubProvider("gemini", 0.2)
+    selector = _summarizing_selector(gemini)
+
+    async def summarize():
+        return await selector.summarize_report_with_meta("CBC report text", LABS, FINDINGS)
+
+    first = asyncio.run(summarize())
+    start = time.perf_counter()
+    second = asyncio.run(summarize())
+    elapsed = time.perf_counter() - start
+
+    assert first["cached"] is False and first["provider"] == "gemini"
+    assert second == {"summary": first["summary"], "cached": True, "provider": "gemini"}
+    assert gemini.calls == 1
+    assert elapsed < 0.1
+
+
+def test_fallback_answers_are_not_cached():
+    gemini = StubProvider("gemini", 0.0, error=ConnectionError("down"))
+    selector = _summarizing_selector(gemini)
+    selector.use_openrouter = False
+
+    async def summarize():
+        return await selector.summarize_report_with_meta("CBC report text", LABS, FINDINGS)
+
+    first = asyncio.run(summarize())
+    assert first["provider"] == "local" and not first["cached"]
+    gemini.error = None
+    second = asyncio.run(summarize())
+    assert second["provider"] == "gemini" and not second["cached"]
+
+
+def test_disabled_cache_always_calls_provider():
+    gemini = StubProvider("gemini")
+    selector = _summarizing_selector(gemini, enabled=False)
+
+    async def summarize():
+        return await selector.summarize_report("CBC report text", LABS, FINDINGS)
+
+    asyncio.run(summarize())
+    asyncio.run(summarize())
+    assert gemini.calls == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
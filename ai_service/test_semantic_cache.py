@@ -0,0 +1,120 @@
+"""
+Tests for the semantic /ai/chat answer cache (with a stand-in encoder).
+"""
+
+import sys
+import os
+import zlib
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model_adapters.semantic_cache import SemanticChatCache, chat_context_key
+
+
+def bag_of_words(texts, dim=256):
+    """Hashed bag-of-words vectors: shared words -> high cosine."""
+    out = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for word in text.replace("?", " ").split():
+            out[row, zlib.crc32(word.encode()) % dim] += 1.0
+    return out
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+STATE = {"probabilities": [{"disease": "Influenza", "probability": 0.6}], "red_flags": []}
+CONTEXT = chat_context_key(STATE)
+
+
+def test_near_duplicate_question_hits():
+    cache = SemanticChatCache(embed=bag_of_words, threshold=0.9)
+    cache.store("Is this contagious?", CONTEXT, "Flu spreads easily; stay home.")
+
+    hit = cache.lookup("is this   contagious", CONTEXT)
+    assert hit is not None and hit[0] == "Flu spreads easily; stay home."
+    assert hit[1] >= 0.9
+    assert cache.lookup("Should I go to the ER?", CONTEXT) is None
+
+
+def test_context_partitions_answers():
+    cache = SemanticChatCache(embed=bag_of_words)
+    cache.store("Should I go to the ER?", CONTEXT, "Not usually for flu.")
+
+    red_flag_state = dict(STATE, red_flags=[{"symptom": "chest_pain"}])
+    assert chat_context_key(red_flag_state) != CONTEXT
+    assert cache.lookup("Should I go to the ER?", chat_context_key(red_flag_state)) is None
+    other_condition = {"probabilities": [{"disease": "Migraine"}], "red_flags": []}
+    assert cache.lookup("Should I go to the ER?", chat_context_key(other_condition)) is None
+    assert cache.lookup("Should I go to the ER?", chat_context_key(STATE, "gemini")) is None
+
+
+def test_patient_symptoms_partition_answers():
+    cache = SemanticChatCache(embed=bag_of_words)
+    first = dict(STATE, observed_symptoms=["fever", "cough"])
+    second = dict(STATE, observed_symptoms=["fever", "rash"])
+    cache.store("Is this contagious?", chat_context_key(first), "Given your fever and cough, yes.")
+
+    # Same top condition, different symptoms: the reply quoting them is not reused
+    assert chat_context_key(first) != chat_context_key(second)
+    assert cache.lookup("Is this contagious?", chat_context_key(second)) is None
+    same_symptoms = dict(STATE, observed_symptoms=["Cough", "fever"])
+    assert cache.lookup("Is this contagious?", chat_context_key(same_symptoms)) is not None
+
+
+def test_entries_expire():
+    clock = FakeClock()
+    cache = SemanticChatCache(embed=bag_of_words, ttl=60, clock=clock)
+    cache.store("Is this contagious?", CONTEXT, "yes")
+    clock.now = 61
+    assert cache.lookup("Is this contagious?", CONTEXT) is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction_when_full():
+    clock = FakeClock()
+    cache = SemanticChatCache(embed=bag_of_words, max_entries=2, clock=clock)
+    cache.store("Is this contagious?", CONTEXT, "a")
+    clock.now = 1
+    cache.store("How long does it last?", CONTEXT, "b")
+    clock.now = 2
+    assert cache.lookup("Is this contagious?", CONTEXT)[0] == "a"  # refreshes "a"
+    clock.now = 3
+    cache.store("Can I exercise?", CONTEXT, "c")
+
+    assert len(cache) == 2
+    assert cache.lookup("How long does it last?", CONTEXT) is None
+    assert cache.lookup("Is this contagious?", CONTEXT)[0] == "a"
+    assert cache.lookup("Can I exercise?", CONTEXT)[0] == "c"
+
+
+def test_context_map_is_bounded_by_the_slot_table():
+    clock = FakeClock()
+    cache = SemanticChatCache(embed=bag_of_words, max_entries=4, ttl=10, clock=clock)
+    for i in range(50):
+        clock.now = i
+        state = dict(STATE, observed_symptoms=["fever", f"symptom_{i}"])
+        cache.store("Is this contagious?", chat_context_key(state), f"reply {i}")
+
+    # One context per patient symptom set, but only the live slots' contexts are kept
+    assert len(cache._contexts) <= 4
+    latest = chat_context_key(dict(STATE, observed_symptoms=["fever", "symptom_49"]))
+    assert cache.lookup("Is this contagious?", latest)[0] == "reply 49"
+
+
+def test_no_encoder_means_no_caching():
+    cache = SemanticChatCache(embed=lambda texts: None)
+    assert cache.store("Is this contagious?", CONTEXT, "yes") is False
+    assert cache.lookup("Is this contagious?", CONTEXT) is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,147 @@
+"""
+Tests for the offline simulated LLM provider and ModelSelector behaviour
+driven by it (routing, hedging, breakers, streaming).
+"""
+
+import sys
+import os
+import asyncio
+import statistics
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from model_adapters import model_selector as model_selector_module
+from model_adapters.circuit_breaker import OPEN
+from model_adapters.model_selector import ModelSelector, RateLimitError
+from model_adapters.simulated import SimulatedModelAdapter, SimulatedServerError
+from safety_config import safety_filter
+from test_hedging import _selector
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _sim(provider, **kwargs):
+    settings = {"latency": "fixed", "latency_median": 0.01, "tokens_per_second": 0,
+                "response_tokens": 20, "provider_limits": False}
+    return SimulatedModelAdapter(provider, **{**settings, **kwargs})
+
+
+def test_same_seed_replays_latencies_and_failures():
+    def outcomes(seed):
+        adapter = _sim("gemini", latency="lognormal", latency_median=0.001, latency_p95=0.003,
+                       rate_429=0.2, rate_5xx=0.2, seed=seed)
+
+        async def run():
+            results = []
+            for _ in range(30):
+                try:
+                    await adapter.generate("q")
+                    results.append("ok")
+                except RateLimitError:
+                    results.append("429")
+                except SimulatedServerError:
+                    results.append("5xx")
+            return results
+
+        return asyncio.run(run())
+
+    first = outcomes(7)
+    assert first == outcomes(7)
+    assert first != outcomes(8)
+    assert {"ok", "429", "5xx"} <= set(first)
+
+
+def test_lognormal_latency_matches_median_and_p95():
+    adapter = _sim("gemini", latency="lognormal", latency_median=0.8, latency_p95=2.5, seed=1)
+    samples = sorted(adapter.sample_latency() for _ in range(5000))
+    assert statistics.median(samples) == pytest.approx(0.8, rel=0.1)
+    assert samples[int(0.95 * len(samples))] == pytest.approx(2.5, rel=0.1)
+
+
+def test_stream_yields_the_generated_text_word_by_word():
+    adapter = _sim("openrouter")
+
+    async def run():
+        chunks = [chunk async for chunk in adapter.stream("q")]
+        return chunks, await adapter.generate("q")
+
+    chunks, text = asyncio.run(run())
+    assert len(chunks) > 20 and "".join(chunks) == text
+    assert safety_filter(text)[0]
+
+
+def test_quota_exhaustion_returns_429_with_headers():
+    clock = FakeClock()
+    adapter = _sim("gemini", rpm=2, clock=clock)
+
+    async def call():
+        await adapter.generate("q")
+
+    asyncio.run(call())
+    assert adapter.last_headers["x-ratelimit-remaining-requests"] == "1"
+    clock.now = 10
+    asyncio.run(call())
+    with pytest.raises(RateLimitError):
+        asyncio.run(call())
+    assert adapter.last_headers["x-ratelimit-remaining-requests"] == "0"
+    assert adapter.last_headers["retry-after"] == "50"
+
+    clock.now = 61
+    asyncio.run(call())
+    assert adapter.last_headers["x-ratelimit-remaining-requests"] == "0"
+
+
+def test_slow_simulated_primary_is_hedged():
+    gemini, openrouter = _sim("gemini", latency_median=5.0), _sim("openrouter", latency_median=0.02)
+    selector = _selector(gemini, openrouter)
+
+    text, provider = asyncio.run(selector.generate_with_provider("q", task_type="summary"))
+    assert provider == "openrouter"
+    assert text == openrouter.response_text("q")
+
+
+def test_failing_simulated_provider_opens_its_breaker():
+    gemini = _sim("gemini", rate_5xx=1.0)
+    selector = _selector(gemini, _sim("openrouter"))
+
+    async def run():
+        for _ in range(8):
+            await selector.generate_with_provider("q", task_type="summary", provider="gemini")
+        return await selector.generate_with_provider("q", task_type="summary")
+
+    text, provider = asyncio.run(run())
+    assert selector.breakers["gemini"].state == OPEN
+    assert provider == "openrouter"
+    assert gemini.calls < 8  # the open breaker stopped calling it
+    assert selector.get_status()["gemini"]["state"] == "open"
+
+
+def test_config_selects_simulated_providers(monkeypatch):
+    monkeypatch.setattr(model_selector_module, "LLM_SIMULATED", True)
+    monkeypatch.setenv("LLM_SIM_LATENCY_MEDIAN_MS", "100")
+    monkeypatch.setenv("LLM_SIM_OPENROUTER_LATENCY_MEDIAN_MS", "30")
+
+    selector = ModelSelector()
+    assert isinstance(selector.gemini_adapter, SimulatedModelAdapter)
+    assert selector.gemini_adapter.latency_median == pytest.approx(0.1)
+    assert selector.openrouter_adapter.latency_median == pytest.approx(0.03)
+    assert selector.use_gemini
+
+
+def test_env_config_is_seeded_by_default(monkeypatch):
+    monkeypatch.delenv("LLM_SIM_SEED", raising=False)
+    monkeypatch.delenv("LLM_SIM_GEMINI_SEED", raising=False)
+    first, second = SimulatedModelAdapter.from_env("gemini"), SimulatedModelAdapter.from_env("gemini")
+    assert [first.sample_latency() for _ in range(5)] == [second.sample_latency() for _ in range(5)]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,114 @@
+"""
+Tests for singleflight coalescing of identical in-flight OCR / LLM work.
+"""
+
+import sys
+import os
+import asyncio
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from serving.singleflight import SingleFlight, content_key
+from model_adapters.response_cache import ResponseCache
+from test_hedging import StubProvider, _selector
+from test_response_cache import LABS, FINDINGS
+
+
+def test_content_key_separates_parts():
+    assert content_key(b"ab", "c") == content_key(b"ab", "c")
+    assert content_key(b"ab", "c") != content_key(b"a", "bc")
+    assert content_key(b"pdf bytes", "application/pdf") != content_key(b"pdf bytes", "image/png")
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "text"
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("k", compute) for _ in range(5)))
+        other = await flight.do("other", compute)
+        return results, other
+
+    results, other = asyncio.run(main())
+    assert results == ["text"] * 5 and other == "text"
+    assert len(calls) == 2
+    assert len(flight) == 0
+
+
+def test_errors_are_shared_but_not_remembered():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("ocr failed")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", failing) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert len(calls) == 1
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    flight = SingleFlight("test")
+
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", compute))
+        second = asyncio.ensure_future(flight.do("k", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_duplicate_report_summaries_make_one_llm_call():
+    gemini = StubProvider("gemini", 0.05)
+    selector = _selector(gemini, StubProvider("openrouter", 5.0), default_delay=5.0)
+    selector.summary_cache = ResponseCache("flight-test", enabled=False)
+
+    async def main():
+        return await asyncio.gather(*(
+            selector.summarize_report_with_meta("CBC report text", LABS, FINDINGS) for _ in range(3)
+        ))
+
+    results = asyncio.run(main())
+    assert gemini.calls == 1
+    assert all(r == results[0] for r in results)
+    assert results[0] is not results[1]
+
+
+def test_identical_chat_prompts_make_one_llm_call():
+    gemini = StubProvider("gemini", 0.05)
+    selector = _selector(gemini, StubProvider("openrouter", 5.0), default_delay=5.0)
+
+    async def main():
+        return await asyncio.gather(
+            selector.generate_chat_response("sys", "Is this contagious?", {}),
+            selector.generate_chat_response("sys", "Is this contagious?", {}),
+            selector.generate_chat_response("sys", "Can I exercise?", {}),
+        )
+
+    first, second, third = asyncio.run(main())
+    assert first == second and third != first
+    assert gemini.calls == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
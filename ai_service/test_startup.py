@@ -0,0 +1,74 @@
+"""
+Startup regression test: the triage-only import path must stay light.
+
+Imports run in a fresh interpreter so modules already loaded by other
+tests do not hide regressions.
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+SERVICE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Generous budget for CI; heavy imports (torch/transformers) alone take several seconds
+IMPORT_BUDGET_SECONDS = float(os.getenv("IMPORT_BUDGET_SECONDS", 3.0))
+
+FORBIDDEN_MODULES = ["torch", "transformers", "redis", "pytesseract", "pdf2image", "paddleocr", "aiohttp"]
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def _probe(imports: str, cwd: str = SERVICE_DIR) -> dict:
+    code = PROBE.format(imports=imports, forbidden=FORBIDDEN_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=cwd, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_triage_modules_import_without_heavy_dependencies():
+    report = _probe(
+        "from engines.symptom_elimination import SymptomEliminationEngine\n"
+        "SymptomEliminationEngine()\n"
+        "import model_adapters.model_selector, report_analysis.ocr_engine\n"
+        "import serving.session_store, serving.idempotency, serving.admission\n"
+        "import observability.metrics"
+    )
+    print(f"Triage path import: {report['seconds']:.3f}s, heavy modules: {report['loaded']}")
+    assert report["loaded"] == []
+    assert report["seconds"] < IMPORT_BUDGET_SECONDS
+
+
+def test_engine_imports_as_package_from_repo_root():
+    # How evaluation/evaluate_model.py and calculate_accuracy.py import it
+    report = _probe(
+        "from ai_service.engines.symptom_elimination import SymptomEliminationEngine",
+        cwd=os.path.dirname(SERVICE_DIR)
+    )
+    assert report["loaded"] == []
+
+
+def test_app_import_within_budget():
+    pytest.importorskip("fastapi")
+    report = _probe("import app")
+    print(f"App import: {report['seconds']:.3f}s, heavy modules: {report['loaded']}")
+    assert report["loaded"] == []
+    assert report["seconds"] < IMPORT_BUDGET_SECONDS
+
+
+if __name__ == "__main__":
+    test_triage_modules_import_without_heavy_dependencies()
+    test_app_import_within_budget()
+    print("✅ Startup import budget respected")
@@ -0,0 +1,184 @@
+"""
+Tests for streamed LLM output: the incremental safety filter, SSE framing,
+and ModelSelector streaming with stub providers.
+"""
+
+import sys
+import os
+import json
+import random
+import asyncio
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from safety_config import SAFETY_BLOCK_MESSAGE, StreamingSafetyFilter, safety_filter
+from serving.streaming import SlotStreamingResponse, StreamOutcome, filtered_events
+from model_adapters.response_cache import ResponseCache
+from test_hedging import StubProvider, _selector
+from test_response_cache import LABS, FINDINGS
+
+
+class StreamingStub(StubProvider):
+    """Streams `words` with `gap` seconds between them; `error` is raised before the first."""
+
+    def __init__(self, name: str, words=("Rest", " and", " hydrate."), gap: float = 0.0, error=None):
+        super().__init__(name, error=error)
+        self.words, self.gap = list(words), gap
+
+    async def stream(self, prompt: str, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        for word in self.words:
+            await asyncio.sleep(self.gap)
+            yield word
+
+
+def _run_filter(chunks):
+    f = StreamingSafetyFilter()
+    out = "".join(f.feed(c) for c in chunks) + f.finish()
+    return out, f.blocked
+
+
+def _events(frames):
+    parsed = []
+    for frame in frames:
+        event, data = frame.strip().split("\n")
+        parsed.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return parsed
+
+
+async def _pairs(chunks, provider="gemini"):
+    for chunk in chunks:
+        yield chunk, provider
+
+
+async def _collect(agen):
+    return [item async for item in agen]
+
+
+def test_filter_blocks_term_split_across_chunks():
+    out, blocked = _run_filter(["Take the pres", "cription daily"])
+    assert blocked
+    assert "pres" not in out
+
+
+def test_filter_passes_allowed_word_with_blocked_prefix():
+    # "cure" is blocked, "cured" is not: the decision waits for the next chunk
+    out, blocked = _run_filter(["Most patients are cure", "d within a week."])
+    assert not blocked
+    assert out == "Most patients are cured within a week."
+    out, blocked = _run_filter(["There is no cure"])
+    assert blocked
+
+
+def test_filter_agrees_with_safety_filter_on_random_chunking():
+    rng = random.Random(7)
+    texts = [
+        "Drink fluids and rest. See a doctor if it gets worse. " * 3,
+        "This is a prescription strength remedy you should take. " * 2,
+    ]
+    for text in texts:
+        for _ in range(20):
+            cuts = sorted(rng.sample(range(1, len(text)), 6))
+            chunks = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+            out, blocked = _run_filter(chunks)
+            assert blocked == (not safety_filter(text)[0])
+            if not blocked:
+                assert out == text
+
+
+def test_filtered_events_stop_at_blocked_term():
+    outcome = StreamOutcome()
+    chunks = _pairs(["Rest well. ", "You need a prescrip", "tion for this. ", "More text."])
+    events = _events(asyncio.run(_collect(filtered_events(chunks, outcome))))
+
+    assert events[-1] == ("blocked", {"message": SAFETY_BLOCK_MESSAGE})
+    sent = "".join(data["text"] for kind, data in events if kind == "token")
+    assert "prescrip" not in sent
+    assert outcome.blocked and outcome.provider == "gemini"
+    assert "More text." not in outcome.text
+
+
+def _serve(response, send):
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+    return asyncio.run(response(scope, receive, send))
+
+
+def test_slot_is_released_once_when_stream_completes():
+    released, frames = [], []
+
+    async def events():
+        yield "event: token\n\n"
+
+    async def send(message):
+        frames.append(message)
+
+    _serve(SlotStreamingResponse(events(), release=lambda: released.append(1)), send)
+    assert released == [1]
+    assert frames[-1] == {"type": "http.response.body", "body": b"", "more_body": False}
+
+
+def test_slot_is_released_when_client_leaves_before_first_event():
+    released, started = [], []
+
+    async def events():
+        started.append(1)
+        yield "event: token\n\n"
+
+    async def send(message):
+        raise OSError("client went away")
+
+    with pytest.raises(Exception):
+        _serve(SlotStreamingResponse(events(), release=lambda: released.append(1)), send)
+    # The generator never ran, so only the response can give the slot back
+    assert started == []
+    assert released == [1]
+
+
+def test_stream_delivers_chunks_as_they_arrive():
+    gemini = StreamingStub("gemini", gap=0.05)
+    selector = _selector(gemini, StreamingStub("openrouter"))
+
+    async def first_chunk():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        async for chunk, provider in selector.stream_with_provider("q", task_type="summary"):
+            return chunk, provider, loop.time() - start
+
+    chunk, provider, elapsed = asyncio.run(first_chunk())
+    assert (chunk, provider) == ("Rest", "gemini")
+    assert elapsed < 0.1  # one gap, not the whole answer
+
+
+def test_stream_falls_back_when_primary_fails_before_first_chunk():
+    gemini = StreamingStub("gemini", error=ConnectionError("down"))
+    openrouter = StreamingStub("openrouter", words=["ok"])
+    selector = _selector(gemini, openrouter)
+
+    pairs = asyncio.run(_collect(selector.stream_with_provider("q", task_type="summary")))
+    assert pairs == [("ok", "openrouter")]
+    assert gemini.calls == 1
+
+
+def test_report_summary_stream_is_cached():
+    gemini = StreamingStub("gemini")
+    selector = _selector(gemini, StreamingStub("openrouter"))
+    selector.summary_cache = ResponseCache("stream-test")
+
+    def summarize():
+        return asyncio.run(_collect(selector.stream_report_summary("CBC report text", LABS, FINDINGS)))
+
+    first, second = summarize(), summarize()
+    assert [cached for _, _, cached in first] == [False] * 3
+    assert second == [("Rest and hydrate.", "gemini", True)]
+    assert gemini.calls == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-q"])
@@ -0,0 +1,61 @@
+"""
+Tests for length-bucketed tokenization.
+Uses the small random BERT from bert_fixtures, so it runs offline.
+"""
+
+import sys
+import os
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from model_adapters.tokenization import bucketed_encode
+from bert_fixtures import SYMPTOMS, tiny_bert
+
+
+def test_bucketed_matches_unpadded_and_keeps_order():
+    model, tokenizer = tiny_bert()
+    texts = [f"i have {s}" if i % 3 == 0 else s for i, s in enumerate(SYMPTOMS)]
+    pad_lengths = []
+
+    def forward(inputs):
+        pad_lengths.append(inputs["input_ids"].shape[1])
+        with torch.no_grad():
+            return model(**inputs).last_hidden_state[:, 0, :].numpy()
+
+    rows = bucketed_encode(tokenizer, texts, forward, batch_size=4)
+    assert len(rows) == len(texts)
+
+    for text, row in zip(texts, rows):
+        inputs = tokenizer([text], return_tensors="pt")
+        with torch.no_grad():
+            expected = model(**inputs).last_hidden_state[0, 0, :].numpy()
+        assert abs(row - expected).max() < 1e-4
+
+    # Sorted buckets: pad length never shrinks, and short phrases are not
+    # padded to the longest input
+    assert pad_lengths == sorted(pad_lengths)
+    assert pad_lengths[0] < pad_lengths[-1]
+
+
+def test_truncation_and_empty_input():
+    _, tokenizer = tiny_bert()
+    seen = []
+
+    def forward(inputs):
+        seen.append(inputs["input_ids"].shape[1])
+        return list(range(inputs["input_ids"].shape[0]))
+
+    assert bucketed_encode(tokenizer, [], forward) == []
+    bucketed_encode(tokenizer, [" ".join(SYMPTOMS)], forward, max_length=8)
+    assert seen == [8]
+
+
+if __name__ == "__main__":
+    test_bucketed_matches_unpadded_and_keeps_order()
+    test_truncation_and_empty_input()
+    print("✅ Tokenization tests passed")
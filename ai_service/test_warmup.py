@@ -0,0 +1,78 @@
+"""
+Tests for background model warm-up and readiness gating.
+"""
+
+import sys
+import os
+import threading
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import engines.symptom_elimination as symptom_elimination
+from serving.warmup import WarmupManager
+
+
+def test_readiness_follows_tasks():
+    release = threading.Event()
+    changes = []
+    warmup = WarmupManager(on_change=lambda name, warming: changes.append((name, warming)))
+    warmup.add("slow", lambda: release.wait(5))
+    warmup.add("broken", lambda: 1 / 0)
+
+    assert warmup.report()["subsystems"]["slow"]["state"] == "pending"
+    thread = warmup.start()
+    assert not warmup.ready
+    assert not warmup.is_ready("slow")
+
+    release.set()
+    thread.join(timeout=5)
+    report = warmup.report()
+    assert report["ready"]
+    assert report["subsystems"]["slow"]["state"] == "ready"
+    assert report["subsystems"]["broken"]["state"] == "failed"
+    assert report["degraded"] == ["broken"]
+    assert changes == [("slow", True), ("broken", True), ("slow", False), ("broken", False)]
+
+
+def test_requests_use_rule_based_path_while_warming():
+    engine = symptom_elimination.SymptomEliminationEngine()
+    loads = []
+    original = symptom_elimination._load_sapbert_adapter
+    symptom_elimination._load_sapbert_adapter = lambda: loads.append(1)
+    symptom_elimination.set_warming("sapbert", True)
+    try:
+        assert symptom_elimination.get_sapbert_adapter() is None
+        result = engine.extract_symptoms("I have a fever and a cough")
+        assert "fever" in result["symptoms"]
+        assert loads == []
+    finally:
+        symptom_elimination.set_warming("sapbert", False)
+        symptom_elimination._load_sapbert_adapter = original
+
+
+def test_rerank_reads_the_table_but_never_builds_it():
+    engine = symptom_elimination.SymptomEliminationEngine()
+    predictions = [{"disease": "Influenza", "probability": 0.6}, {"disease": "Common Cold", "probability": 0.4}]
+
+    class Unprepared:
+        similarity_table = None
+
+        def ensure_similarity_table(self, *args):
+            raise AssertionError("built on the request path")
+
+        def encode_differential_diagnosis(self, **kwargs):
+            raise AssertionError("re-ranked without a table")
+
+    original = symptom_elimination._load_sapbert_adapter
+    symptom_elimination._load_sapbert_adapter = Unprepared
+    try:
+        assert engine.enhance_predictions_with_sapbert(["fever"], predictions) == predictions
+    finally:
+        symptom_elimination._load_sapbert_adapter = original
+
+
+if __name__ == "__main__":
+    test_readiness_follows_tasks()
+    test_requests_use_rule_based_path_while_warming()
+    test_rerank_reads_the_table_but_never_builds_it()
+    print("✅ Warm-up tests passed")
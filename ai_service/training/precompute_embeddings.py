@@ -0,0 +1,101 @@
+"""
+SapBERT Candidate Embedding Precompute
+
+Embeds every canonical symptom in the knowledge base in padded batches and
+writes the matrix to EMBEDDING_CACHE_DIR, keyed by model name and candidate
+list hash. The service memory-maps this file instead of embedding the
+vocabulary inside the first request that needs it.
+
+It also embeds every KB disease and writes the symptom x disease cosine
+table used to re-rank predictions (SAPBERT_RERANK) without a model call.
+
+With --concept-index it also builds the ANN concept index (KB symptoms +
+drug names) used by SapBERTDDXPlusAdapter.find_similar_concepts; point
+CONCEPT_INDEX_PATH at the output directory.
+
+Run after (re)training the knowledge base, or as a Docker build step.
+
+Usage:
+    python training/precompute_embeddings.py
+    python training/precompute_embeddings.py --batch-size 128 --force
+    python training/precompute_embeddings.py --concept-index --pq 96
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engines.symptom_elimination import SymptomEliminationEngine
+from model_adapters.sapbert_helper import (
+    SapBERTHelper, candidate_cache_path, similarity_table_path, EMBED_BATCH_SIZE, EMBEDDING_CACHE_DIR
+)
+
+KNOWLEDGE_DIR = Path(__file__).parent.parent / "knowledge"
+
+
+def build_concept_index(symptoms, batch_size: int, pq_subvectors: int):
+    """Embed KB symptoms + drug names and save an IVF concept index."""
+    from model_adapters.sapbert_ddxplus import SapBERTDDXPlusAdapter
+
+    drugs = json.loads((KNOWLEDGE_DIR / "drug_database.json").read_text())
+    concepts = list(symptoms) + [d["name"] for d in drugs if d.get("name")]
+    path = EMBEDDING_CACHE_DIR / "concepts.ivf"
+    print(f"📂 {len(concepts)} concepts -> {path}")
+
+    adapter = SapBERTDDXPlusAdapter(use_local=True)
+    if not adapter.initialize():
+        print("❌ SapBERT model unavailable; concept index not built")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    index = adapter.build_concept_index(
+        concepts, path=str(path), batch_size=batch_size, pq_subvectors=pq_subvectors
+    )
+    print(f"✅ Indexed {len(index)} concepts in {index.n_lists} lists "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute SapBERT candidate embeddings")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE)
+    parser.add_argument("--force", action="store_true", help="Rebuild even if a cached matrix exists")
+    parser.add_argument("--concept-index", action="store_true", help="Also build the ANN concept index")
+    parser.add_argument("--pq", type=int, default=0, help="PQ subvectors for the concept index (0 = off)")
+    args = parser.parse_args()
+
+    engine = SymptomEliminationEngine()
+    candidates = engine.symptoms
+    if args.concept_index:
+        build_concept_index(candidates, args.batch_size, args.pq)
+    diseases = engine.diseases
+    path = candidate_cache_path(candidates)
+    table_path = similarity_table_path(candidates, diseases)
+    print(f"📂 {len(candidates)} candidate symptoms -> {path}")
+    print(f"📂 {len(candidates)} x {len(diseases)} similarity table -> {table_path}")
+
+    if path.exists() and table_path.exists() and not args.force:
+        print("✅ Already up to date (use --force to rebuild)")
+        return
+
+    if args.force:
+        for stale in (path, candidate_cache_path(diseases), table_path):
+            stale.unlink(missing_ok=True)
+
+    helper = SapBERTHelper(use_api=False)
+    start = time.perf_counter()
+    helper.cache_candidates(candidates, batch_size=args.batch_size)
+    if helper.candidate_matrix is None:
+        print("❌ SapBERT model unavailable; nothing written")
+        sys.exit(1)
+
+    helper.cache_similarity_table(candidates, diseases, batch_size=args.batch_size)
+    print(f"✅ Embedded {helper.candidate_matrix.shape} symptoms, {helper.disease_matrix.shape} diseases "
+          f"and a {helper.similarity_table.shape} table in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@
  */
 
 const axios = require('axios');
+const crypto = require('crypto');
 
 const AI_SERVICE_URL = process.env.AI_SERVICE_URL || 'http://localhost:8000';
 const MAX_RETRIES = 3;
@@ -24,8 +25,10 @@ const retryWithBackoff = async (fn, retries = MAX_RETRIES) => {
     } catch (error) {
       const isRateLimited = error.response?.status === 429;
       const isServerError = error.response?.status >= 500;
+      // 409: an earlier attempt with the same Idempotency-Key is still running
+      const isInProgress = error.response?.status === 409;
 
-      if (attempt === retries || (!isRateLimited && !isServerError)) {
+      if (attempt === retries || (!isRateLimited && !isServerError && !isInProgress)) {
         throw error;
       }
 
@@ -51,6 +54,9 @@ exports.startTriage = async (req, res) => {
       });
     }
 
+    // One key per logical request so retries replay instead of re-running
+    const idempotencyKey = crypto.randomUUID();
+
     // Call AI service with retry
     const response = await retryWithBackoff(async () => {
       return axios.post(`${AI_SERVICE_URL}/start`, {
@@ -58,6 +64,7 @@ exports.startTriage = async (req, res) => {
         user_id: userId,
         model_provider: req.body.model_provider || 'auto' // Forward model selection
       }, {
+        headers: { 'Idempotency-Key': idempotencyKey },
         timeout: 30000
       });
     });
@@ -96,6 +103,9 @@ exports.nextQuestion = async (req, res) => {
       });
     }
 
+    // One key per logical request so a retried answer is not applied twice
+    const idempotencyKey = crypto.randomUUID();
+
     // Call AI service with retry
     const response = await retryWithBackoff(async () => {
       return axios.post(`${AI_SERVICE_URL}/next`, {
@@ -103,6 +113,7 @@ exports.nextQuestion = async (req, res) => {
         answer,
         user_id: userId
       }, {
+        headers: { 'Idempotency-Key': idempotencyKey },
         timeout: 30000
       });
     });
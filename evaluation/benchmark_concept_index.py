@@ -0,0 +1,78 @@
+"""
+Concept Index Benchmark
+=======================
+
+Measures recall@k and per-query latency of the IVF / IVF-PQ concept index
+against brute-force cosine search, across n_probe settings.
+
+Uses synthetic clustered embeddings by default, or a real [N, dim] .npy
+matrix (e.g. one written by training/precompute_embeddings.py).
+
+Usage:
+    python benchmark_concept_index.py
+    python benchmark_concept_index.py --size 100000 --dim 768 --pq 96
+    python benchmark_concept_index.py --embeddings ../ai_service/knowledge/embeddings/<file>.npy
+"""
+
+import sys
+import os
+import time
+import argparse
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ai_service"))
+
+import numpy as np
+
+from model_adapters.concept_index import ConceptIndex, recall_at_k
+
+
+def synthetic(size: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Clustered vectors, roughly how concept embeddings group by topic."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, size // 50), dim)).astype(np.float32)
+    return centers[rng.integers(0, len(centers), size)] + rng.standard_normal((size, dim)).astype(np.float32)
+
+
+def per_query_ms(fn, queries) -> float:
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the concept ANN index")
+    parser.add_argument("--embeddings", help="Path to an [N, dim] .npy matrix")
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--pq", type=int, default=0, help="PQ subvectors (0 = plain IVF)")
+    parser.add_argument("--probes", default="1,2,4,8,16,32")
+    args = parser.parse_args()
+
+    vectors = np.load(args.embeddings) if args.embeddings else synthetic(args.size, args.dim)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.choice(len(vectors), args.queries)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape).astype(np.float32)
+
+    print(f"📊 {vectors.shape[0]} x {vectors.shape[1]} vectors, {args.queries} queries, k={args.k}")
+
+    start = time.perf_counter()
+    index = ConceptIndex(pq_subvectors=args.pq).build(vectors, [str(i) for i in range(len(vectors))])
+    print(f"   Build: {time.perf_counter() - start:.1f}s ({index.n_lists} lists"
+          + (f", PQ m={args.pq}" if args.pq else "") + ")")
+
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    brute_ms = per_query_ms(lambda q: np.argpartition(-(unit @ q), args.k)[:args.k], queries)
+    print(f"   Brute force: {brute_ms:.3f} ms/query")
+
+    print(f"\n{'n_probe':>8} {'recall@k':>9} {'ms/query':>9} {'speedup':>8}")
+    for n_probe in (int(p) for p in args.probes.split(",")):
+        recall = recall_at_k(index, vectors, queries, k=args.k, n_probe=n_probe)
+        ms = per_query_ms(lambda q: index.search(q, k=args.k, n_probe=n_probe), queries)
+        print(f"{n_probe:>8} {recall:>9.3f} {ms:>9.3f} {brute_ms / ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+LLM Routing Benchmark
+=====================
+
+Measures end-to-end latency of ModelSelector auto-mode calls against the
+offline simulated providers, with and without hedging, so routing changes
+can be compared without network access or API keys.
+
+Usage:
+    python benchmark_llm_routing.py
+    python benchmark_llm_routing.py --requests 500 --concurrency 50 --gemini-p95 8000 --gemini-5xx 0.05
+"""
+
+import sys
+import os
+import time
+import asyncio
+import argparse
+from collections import Counter
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ai_service"))
+
+from model_adapters.hedging import HedgePolicy
+from model_adapters.model_selector import ModelSelector
+from model_adapters.simulated import SimulatedModelAdapter
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+async def run(args, hedging: bool):
+    selector = ModelSelector()
+    selector.use_local = True
+    selector.use_gemini = selector.use_openrouter = True
+    selector.gemini_adapter = SimulatedModelAdapter(
+        "gemini", latency_median=args.gemini_median / 1000, latency_p95=args.gemini_p95 / 1000,
+        rate_5xx=args.gemini_5xx, rate_429=args.gemini_429, tokens_per_second=0,
+        seed=args.seed, provider_limits=False
+    )
+    selector.openrouter_adapter = SimulatedModelAdapter(
+        "openrouter", latency_median=args.openrouter_median / 1000, latency_p95=args.openrouter_p95 / 1000,
+        tokens_per_second=0, seed=args.seed + 1, provider_limits=False
+    )
+    selector.hedge_policy = HedgePolicy(enabled=hedging, min_samples=10)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, providers = [], Counter()
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            _, provider = await selector.generate_with_provider(f"request {i}", task_type="summary")
+            latencies.append(time.perf_counter() - start)
+            providers[provider] += 1
+
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    return latencies, providers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ModelSelector routing on simulated providers")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--gemini-median", type=float, default=800, help="ms")
+    parser.add_argument("--gemini-p95", type=float, default=4000, help="ms")
+    parser.add_argument("--gemini-5xx", type=float, default=0.02)
+    parser.add_argument("--gemini-429", type=float, default=0.02)
+    parser.add_argument("--openrouter-median", type=float, default=1000, help="ms")
+    parser.add_argument("--openrouter-p95", type=float, default=2000, help="ms")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"📊 {args.requests} requests, concurrency {args.concurrency}")
+    print(f"\n{'hedging':>8} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7}  providers")
+    for hedging in (False, True):
+        latencies, providers = asyncio.run(run(args, hedging))
+        mix = ", ".join(f"{name}={count}" for name, count in providers.most_common())
+        print(f"{'on' if hedging else 'off':>8} {percentile(latencies, 50):>7.2f} "
+              f"{percentile(latencies, 95):>7.2f} {percentile(latencies, 99):>7.2f}  {mix}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Quantized Backend Benchmark
+===========================
+
+Compares the fp32, int8 and onnx-int8 encoder backends on:
+- top-1 normalization agreement with fp32 over the KB symptom vocabulary
+- per-batch latency (batch of request-sized phrases)
+- weight size and process resident memory after loading
+
+Uses a real HuggingFace model when --model is given (needs the weights
+locally or network access); otherwise a small randomly initialized BERT so
+the script also runs offline. Random weights crowd the embedding space, so
+offline agreement numbers are not meaningful; use them for latency/memory
+ratios only and run parity against the real model before switching backends.
+
+Usage:
+    python benchmark_quantization.py
+    python benchmark_quantization.py --model cambridgeltl/SapBERT-from-PubMedBERT-fulltext
+"""
+
+import sys
+import os
+import io
+import csv
+import time
+import tempfile
+import argparse
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ai_service"))
+
+import torch
+
+import model_adapters.quantization as quantization
+from model_adapters.quantization import apply_backend, cls_encoder, parity_report, BACKENDS
+
+KB_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      "ai_service", "knowledge", "disease_symptom_trained.csv")
+
+
+def symptom_vocabulary():
+    with open(KB_CSV, newline="") as f:
+        return sorted({row["symptom"] for row in csv.DictReader(f) if row.get("symptom")})
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return float("nan")
+
+
+def weights_mb(model) -> float:
+    if isinstance(model, quantization.OnnxEncoder):
+        return model.path.stat().st_size / 2 ** 20
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 2 ** 20
+
+
+def load(model_name, vocabulary):
+    from transformers import AutoTokenizer, AutoModel, BertConfig, BertModel, BertTokenizer
+
+    if model_name:
+        return AutoModel.from_pretrained(model_name).eval(), AutoTokenizer.from_pretrained(model_name)
+
+    words = sorted({w for term in vocabulary for w in term.split()} | {"i", "have"})
+    vocab_file = os.path.join(tempfile.mkdtemp(), "vocab.txt")
+    with open(vocab_file, "w") as f:
+        f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words))
+    config = BertConfig(vocab_size=len(words) + 5, hidden_size=256, num_hidden_layers=4,
+                        num_attention_heads=4, intermediate_size=1024, initializer_range=0.2)
+    torch.manual_seed(0)
+    return BertModel(config).eval(), BertTokenizer(vocab_file)
+
+
+def latency_ms(encode, phrases, batch_size, repeats):
+    batches = [phrases[i:i + batch_size] for i in range(0, len(phrases), batch_size)][:repeats]
+    encode(batches[0])  # warm-up
+    start = time.perf_counter()
+    for batch in batches:
+        encode(batch)
+    return (time.perf_counter() - start) / len(batches) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quantized encoder backends")
+    parser.add_argument("--model", help="HuggingFace model name (default: tiny random BERT)")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    args = parser.parse_args()
+
+    vocabulary = symptom_vocabulary()
+    queries = [f"i have {term}" for term in vocabulary]
+    quantization.ONNX_CACHE_DIR = quantization.Path(tempfile.mkdtemp())
+
+    baseline_rss = rss_mb()
+    reference_model, tokenizer = load(args.model, vocabulary)
+    reference = cls_encoder(reference_model, tokenizer)
+    print(f"📊 {args.model or 'tiny random BERT'}: {len(vocabulary)} symptoms, "
+          f"batch {args.batch_size}, {torch.get_num_threads()} threads")
+
+    print(f"\n{'backend':>10} {'top1 agree':>10} {'cosine':>7} {'ms/batch':>9} {'weights MB':>10} {'RSS +MB':>8}")
+    for backend in args.backends.split(","):
+        before = rss_mb()
+        model = reference_model if backend == "fp32" else apply_backend(reference_model, backend, "benchmark")
+        loaded = rss_mb() - (baseline_rss if backend == "fp32" else before)
+        encode = cls_encoder(model, tokenizer)
+
+        report = parity_report(reference, encode, vocabulary, queries)
+        ms = latency_ms(encode, queries, args.batch_size, args.repeats)
+        print(f"{backend:>10} {report['top1_agreement']:>10.3f} {report['mean_cosine']:>7.4f} "
+              f"{ms:>9.2f} {weights_mb(model):>10.1f} {loaded:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()